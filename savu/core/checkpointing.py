@@ -22,6 +22,7 @@ import os
 import time
 import copy
 import logging
+import threading
 import numpy as np
 from mpi4py import MPI
 from shutil import copyfile
@@ -31,6 +32,82 @@ from savu.data.meta_data import MetaData
 from savu.plugins.savers.utils.hdf5_utils import Hdf5Utils
 
 
+class CheckpointIndex(object):
+    """ A compact record of the checkpoint position of all processes, kept in
+    a single file with a fixed size entry (completed plugins, transfer index,
+    process index) per process.  Each process only writes its own entry.
+    """
+
+    def __init__(self, folder, process):
+        self.path = os.path.join(folder, 'checkpoint_index.bin')
+        self._dtype = np.dtype('<i8')
+        self._offset = 3*self._dtype.itemsize*process
+
+    def write(self, values):
+        """ Write (and flush to disk) the entry for this process. """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, np.array(values, dtype=self._dtype).tobytes(),
+                      self._offset)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def read(self):
+        """ The entry for this process, or None if there isn't one. """
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                entry = f.read(3*self._dtype.itemsize)
+        except (IOError, OSError):
+            return None
+        if len(entry) < 3*self._dtype.itemsize:
+            return None
+        return [int(max(v, 0)) for v in np.frombuffer(entry, self._dtype)]
+
+
+class CheckpointWriter(threading.Thread):
+    """ Writes checkpoint positions in the background, so that the processing
+    loop is not held up by the file system.  Only the most recent position is
+    kept if a new one is submitted before the last one has been written. """
+
+    def __init__(self, index):
+        super(CheckpointWriter, self).__init__(name='CheckpointWriter')
+        self.daemon = True
+        self.index = index
+        self.cost = 0.0  # duration of the last write
+        self._pending = None
+        self._busy = False
+        self._cond = threading.Condition()
+
+    def submit(self, values):
+        with self._cond:
+            self._pending = values
+            self._cond.notify_all()
+
+    def flush(self):
+        """ Wait for all submitted positions to be written. """
+        with self._cond:
+            while self._pending is not None or self._busy:
+                self._cond.wait()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                values, self._pending, self._busy = self._pending, None, True
+            start = time.time()
+            try:
+                self.index.write(values)
+            except (IOError, OSError) as e:
+                logging.warning("Unable to write the checkpoint: %s", e)
+            with self._cond:
+                self.cost = time.time() - start
+                self._busy = False
+                self._cond.notify_all()
+
+
 class Checkpointing(object):
     """ Contains all checkpointing associated methods.
     """
@@ -47,6 +124,10 @@ class Checkpointing(object):
         self._trans_idx = 0
         self._comm = None
         self._timer = None
+        self._cost = 0.0
+        self._index = None
+        self._writer = None
+        self._position = (0, 0)
         self._set_timer()
         self.meta_data = MetaData()
 
@@ -57,6 +138,8 @@ class Checkpointing(object):
             self._create_dataset(f, 'process_idx', 0)
             self._create_dataset(
                     f, 'completed_plugins', self._completed_plugins)
+        self.__write_index(self._completed_plugins, 0, 0, wait=True)
+        self._position = (0, 0)
         msg = "%s initialise." % self.__class__.__name__
         self._exp._barrier(communicator=comm, msg=msg)
 
@@ -83,12 +166,15 @@ class Checkpointing(object):
         self.__does_file_exist(self._file, level)
 
         with self._h5._open_backing_h5(self._file, 'r', mpi=False) as f:
-            self._completed_plugins = \
-                f['completed_plugins'][...] if 'completed_plugins' in f else 0
-            self._proc_idx = f['process_idx'][...] if 'process_idx' in f and \
-                level == 'subplugin' else 0
-            self._trans_idx = f['transfer_idx'][...] if 'transfer_idx' in f \
-                and level == 'subplugin' else 0
+            # the position is taken from the checkpoint index, falling back
+            # to the values in the checkpoint file if there is no entry
+            entry = self.__get_index().read()
+            if entry is None:
+                entry = [f[k][...] if k in f else 0 for k in
+                         ['completed_plugins', 'transfer_idx', 'process_idx']]
+            self._completed_plugins = entry[0]
+            self._trans_idx = entry[1] if level == 'subplugin' else 0
+            self._proc_idx = entry[2] if level == 'subplugin' else 0
             # for testing
             self.__set_start_values(
                     self._completed_plugins, self._trans_idx, self._proc_idx)
@@ -149,29 +235,61 @@ class Checkpointing(object):
         return self._completed_plugins
 
     def is_time_to_checkpoint(self, transport, ti, pi):
-        interval = self._exp.meta_data.get(
-                ['system_params', 'checkpoint_interval'])
-        end = time.time()
-        if (end - self._get_timer()) > interval:
-            self.__write_subplugin_checkpoint(ti, pi)
-            self._set_timer()
-            transport._transport_checkpoint()
-            return transport._transport_kill_signal()
-        return False
+        if (time.time() - self._get_timer()) < self.__get_wait_time():
+            return False
+        start = time.time()
+        self.__write_subplugin_checkpoint(ti, pi)
+        transport._transport_checkpoint()
+        kill = transport._transport_kill_signal()
+        self._cost = time.time() - start
+        self._set_timer()
+        return kill
+
+    def __get_wait_time(self):
+        """ The time between checkpoints.  This is long enough that the cost
+        of checkpointing is at most 'checkpoint_cost_fraction' of the run
+        time, and lies between 'checkpoint_min_interval' and
+        'checkpoint_interval'. """
+        params = self._exp.meta_data.get('system_params')
+        fraction = params.get('checkpoint_cost_fraction', 0.01)
+        floor = params.get('checkpoint_min_interval', 10)
+        cost = self._cost + (self._writer.cost if self._writer else 0)
+        return min(params['checkpoint_interval'], max(cost/fraction, floor))
+
+    def __get_index(self):
+        if self._index is None:
+            self._index = CheckpointIndex(
+                os.path.dirname(self._file), self._exp.meta_data.get('process'))
+        return self._index
+
+    def __write_index(self, completed, ti, pi, wait=False):
+        """ Submit a new position to the background writer, optionally waiting
+        for it to be written. """
+        if self._writer is None:
+            self._writer = CheckpointWriter(self.__get_index())
+            self._writer.start()
+        self._writer.submit((completed, ti, pi))
+        if wait:
+            self._writer.flush()
 
     def _get_checkpoint_params(self):
         return self._level, self._completed_plugins
 
     def __write_subplugin_checkpoint(self, ti, pi):
-        with self._h5._open_backing_h5(self._file, 'a', mpi=False) as f:
-            f['transfer_idx'][...] = ti
-            f['process_idx'][...] = pi
+        # only the position is written, and only if it has changed
+        if (ti, pi) != self._position:
+            self._position = (ti, pi)
+            self.__write_index(self._completed_plugins, ti, pi)
 
     def __write_plugin_checkpoint(self):
+        # the checkpoint file is also kept up to date at plugin boundaries,
+        # as a fallback if the checkpoint index is missing
         with self._h5._open_backing_h5(self._file, 'a', mpi=False) as f:
             f['completed_plugins'][...] = self._completed_plugins
             f['transfer_idx'][...] = 0
             f['process_idx'][...] = 0
+        self.__write_index(self._completed_plugins, 0, 0, wait=True)
+        self._position = (0, 0)
 
     def _reset_indices(self):
         self._trans_idx = 0
@@ -0,0 +1,114 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: nexus_batch
+   :platform: Unix
+   :synopsis: Collects the NeXus file entries and links in memory and writes \
+       them to the NeXus file in a single batch.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import logging
+import threading
+import contextlib
+import h5py
+
+
+class NexusBatch(object):
+    """ The NeXus file entries of a run, held in an in-memory hdf5 file.
+
+    The metadata groups, attributes and links of each dataset are populated
+    by the single writer process in memory, without waiting for the other
+    processes.  :meth:`write` merges them into the NeXus file in a background
+    thread, so the writer can carry on to the next barrier, and :meth:`join`
+    waits for the merge to finish.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.batch = None
+        self.count = 0
+        self._thread = None
+        self._error = None
+
+    def open(self):
+        """ A context manager for the in-memory file, which is not closed on
+        exit. """
+        if self.batch is None:
+            name = '%s_batch_%i' % (self.filename, self.count)
+            self.batch = h5py.File(name, 'w', driver='core',
+                                   backing_store=False)
+            self.batch.create_group('entry')
+            self.count += 1
+        return contextlib.nullcontext(self.batch)
+
+    def write(self):
+        """ Start merging the batch of entries into the NeXus file, after any
+        earlier batch has been merged.  A new batch is started by the next
+        call to :meth:`open`. """
+        if self.batch is None:
+            return
+        self.join()
+        batch, self.batch = self.batch, None
+        self._thread = threading.Thread(
+            target=self.__write, args=(batch,), name='NexusBatchWriter')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def join(self):
+        """ Wait for the last batch to be merged into the NeXus file. """
+        if self._thread is None:
+            return
+        self._thread.join()
+        self._thread = None
+        error, self._error = self._error, None
+        if error:
+            raise error
+
+    def __write(self, batch):
+        logging.debug("Writing the batch of NeXus entries to %s",
+                      self.filename)
+        try:
+            with h5py.File(self.filename, 'a') as nxs_file:
+                self.__merge(batch, nxs_file)
+        except Exception as e:
+            self._error = e
+        finally:
+            batch.close()
+
+    def __merge(self, source, dest):
+        """ Merge the groups in source into dest, replacing any datasets,
+        links or NXdata groups (which were replaced in the batch). """
+        dest.attrs.update(source.attrs)
+        for name in source:
+            link = source.get(name, getlink=True)
+            exists = dest.get(name, getlink=True) is not None
+            if isinstance(link, (h5py.ExternalLink, h5py.SoftLink)):
+                if exists:
+                    del dest[name]
+                dest[name] = link
+                continue
+            obj = source[name]
+            if exists and isinstance(obj, h5py.Group) and \
+                    isinstance(dest.get(name, getlink=True), h5py.HardLink) \
+                    and isinstance(dest[name], h5py.Group) and \
+                    obj.attrs.get('NX_class') not in ['NXdata', b'NXdata']:
+                self.__merge(obj, dest[name])
+                continue
+            if exists:
+                del dest[name]
+            source.copy(obj, dest, name=name)
@@ -0,0 +1,190 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: placement
+   :platform: Unix
+   :synopsis: Detects the node topology and pins each process, and its \
+       threads, to a disjoint set of cores in a single memory (NUMA) domain.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import glob
+import ctypes
+import ctypes.util
+import logging
+import contextlib
+
+NODE_PATH = '/sys/devices/system/node'
+CPU_PATH = '/sys/devices/system/cpu'
+
+
+def parse_cpulist(cpulist):
+    """ Convert a kernel cpu list, e.g. '0-3,8,10-11', to a list of ints. """
+    cpus = []
+    for entry in cpulist.strip().split(','):
+        if not entry:
+            continue
+        start, _, stop = entry.partition('-')
+        cpus += list(range(int(start), int(stop or start) + 1))
+    return cpus
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def get_topology():
+    """ The cpus available to this process in each memory domain.
+
+    The cpus in a domain are ordered by core, so that hyperthreads of the
+    same core are adjacent.  If the topology is not available (e.g. not
+    Linux) all the available cpus are in a single domain.
+
+    :returns: A list of (domain number, list of cpus) tuples.
+    """
+    try:
+        allowed = os.sched_getaffinity(0)
+    except AttributeError:
+        allowed = set(range(os.cpu_count() or 1))
+
+    domains = []
+    for path in sorted(glob.glob(os.path.join(NODE_PATH, 'node[0-9]*'))):
+        try:
+            cpus = parse_cpulist(_read(os.path.join(path, 'cpulist')))
+        except (IOError, ValueError):
+            continue
+        cpus = [c for c in cpus if c in allowed]
+        if cpus:
+            number = int(os.path.basename(path)[len('node'):])
+            domains.append((number, sorted(cpus, key=_core_key)))
+
+    if not domains:
+        domains = [(0, sorted(allowed, key=_core_key))]
+    return domains
+
+
+def _core_key(cpu):
+    """ Sort key grouping the hyperthreads of each physical core. """
+    topology = os.path.join(CPU_PATH, 'cpu%i' % cpu, 'topology')
+    try:
+        return (int(_read(os.path.join(topology, 'physical_package_id'))),
+                int(_read(os.path.join(topology, 'core_id'))), cpu)
+    except (IOError, ValueError):
+        return (0, cpu, cpu)
+
+
+def assign(domains, n_local, local_rank):
+    """ Choose the domain and disjoint set of cpus of a process on a node.
+
+    The processes on a node are shared between the domains in proportion to
+    their number of cpus, and the cpus of each domain are split evenly
+    between its processes.  If there are more processes than cpus in a domain
+    the processes share cpus.
+
+    :param list domains: The output of :func:`get_topology`.
+    :param int n_local: The number of processes on the node.
+    :param int local_rank: The rank of this process on the node.
+    :returns: The domain number and list of cpus.
+    """
+    total = sum(len(cpus) for _, cpus in domains)
+    # the number of processes in each domain (largest remainder)
+    shares = [n_local*len(cpus)/float(total) for _, cpus in domains]
+    counts = [int(s) for s in shares]
+    order = sorted(range(len(domains)), key=lambda i: counts[i] - shares[i])
+    for i in order[:n_local - sum(counts)]:
+        counts[i] += 1
+
+    first = 0
+    for (number, cpus), count in zip(domains, counts):
+        if local_rank < first + count:
+            index = local_rank - first
+            if count > len(cpus):
+                return number, [cpus[index % len(cpus)]]
+            per_rank = len(cpus) // count
+            extra = len(cpus) % count
+            start = index*per_rank + min(index, extra)
+            stop = start + per_rank + (1 if index < extra else 0)
+            return number, cpus[start:stop]
+        first += count
+    raise ValueError("Local rank %i is not in the %i processes on the node"
+                     % (local_rank, n_local))
+
+
+def set_affinity(cpus):
+    """ Pin all the threads of this process, and any it creates, to cpus.
+
+    :returns: The previous cpus of this process.
+    """
+    previous = sorted(os.sched_getaffinity(0))
+    tasks = glob.glob('/proc/self/task/*')
+    for tid in [int(os.path.basename(t)) for t in tasks] or [0]:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:
+            # the thread has exited
+            pass
+    os.sched_setaffinity(0, cpus)
+    return previous
+
+
+@contextlib.contextmanager
+def affinity(cpus):
+    """ A context manager that pins the process to cpus, and then restores
+    the original cpus. """
+    previous = set_affinity(cpus)
+    try:
+        yield
+    finally:
+        set_affinity(previous)
+
+
+def set_preferred_memory_domain(number):
+    """ Prefer memory allocations from this domain, using libnuma if it is
+    available.  Otherwise memory is allocated in the domain of the cpu that
+    first touches it, which is the local domain of a pinned process.
+
+    :returns: The memory policy that is used.
+    """
+    name = ctypes.util.find_library('numa')
+    if name:
+        try:
+            libnuma = ctypes.CDLL(name)
+            if libnuma.numa_available() >= 0:
+                libnuma.numa_set_preferred(ctypes.c_int(number))
+                return 'preferred'
+        except (OSError, AttributeError) as e:
+            logging.debug("Unable to set the memory policy: %s", e)
+    return 'first-touch'
+
+
+def pin_process(n_local, local_rank):
+    """ Pin this process (and its threads) to its cpus and local memory
+    domain.
+
+    :returns: A dictionary describing the placement.
+    """
+    domains = get_topology()
+    number, cpus = assign(domains, n_local, local_rank)
+    set_affinity(cpus)
+    policy = set_preferred_memory_domain(number)
+    # limit the threads of libraries loaded after this point
+    os.environ.setdefault('OMP_NUM_THREADS', str(len(cpus)))
+    node_cpus = sorted(c for _, d in domains for c in d)
+    return {'domain': number, 'cpus': cpus, 'node_cpus': node_cpus,
+            'n_domains': len(domains), 'memory_policy': policy}
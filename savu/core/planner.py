@@ -0,0 +1,166 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: planner
+   :platform: Unix
+   :synopsis: Predicts the transfer blocks, memory and disk use of a process \
+       list from the plugin list check, without processing any data.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import copy
+import json
+import numpy as np
+
+import savu.core.utils as cu
+from savu.data.data_structures.data_add_ons import Padding
+
+
+class Planner(object):
+    """ A memory and I/O budget for a process list.
+
+    The plugin list check sets the frames transferred and processed by each
+    plugin (see :meth:`savu.plugins.plugin_datasets.PluginDatasets.\
+_finalise_plugin_datasets`) for the requested processes.  The planner reads
+    these values from each plugin, before it is cleaned up, and estimates:
+
+    * the transfer block shape and bytes of each dataset,
+    * the peak resident memory of a rank, which is the (padded) input and
+      (float32) output transfer blocks plus a copy of the frames passed to
+      process_frames,
+    * the bytes read and written by each plugin (reads include the overlap
+      of padded blocks) and the size of each dataset on disk.
+    """
+
+    def __init__(self, ranks_per_node):
+        self.ranks_per_node = ranks_per_node
+        self.plugins = []
+
+    def add_plugin(self, plugin, plugin_dict):
+        """ Add the budget of a plugin that has completed its setup. """
+        in_pData, out_pData = plugin.get_plugin_datasets()
+        entry = {'name': plugin.name, 'plugin_dict': plugin_dict,
+                 'in_datasets': [self.__get_dataset(p) for p in in_pData],
+                 'out_datasets': [self.__get_dataset(p, out=True)
+                                  for p in out_pData]}
+        datasets = entry['in_datasets'] + entry['out_datasets']
+        entry['peak_memory'] = \
+            sum(d['transfer_bytes'] + d['process_bytes'] for d in datasets)
+        entry['read'] = sum(d['read'] for d in entry['in_datasets'])
+        entry['written'] = sum(d['size'] for d in entry['out_datasets'])
+        entry['n_transfers'] = max([d['n_transfers'] for d in datasets] + [0])
+        self.plugins.append(entry)
+
+    def __get_dataset(self, pData, out=False):
+        data = pData.data_obj
+        # output transfer blocks are held as float32 by the transport layer
+        itemsize = 4 if out else data.get_itemsize()
+        shape = list(data.get_shape())
+        sdir = data.get_slice_dimensions()
+        mft = pData.meta_data.get('max_frames_transfer')
+        mfp = pData.meta_data.get('max_frames_process')
+        tshape = list(pData.get_shape_transfer())
+        pad = self.__get_padding(pData)
+        padded = [t + sum(pad.get(d, {}).values())
+                  for d, t in enumerate(tshape)]
+        pshape = [mfp if d == sdir[0] else t for d, t in enumerate(padded)
+                  if d in data.get_core_dimensions() or d == sdir[0]]
+
+        size = int(np.prod(shape))*data.get_itemsize()
+        # neighbouring frames are read again to fill the slice padding
+        n = shape[sdir[0]]
+        overlap = min(padded[sdir[0]], n)/float(min(tshape[sdir[0]], n))
+        nprocs = pData.meta_data.get('mpi_procs')
+        frames = pData.meta_data.get('total_frames')
+        return {'name': data.get_name(),
+                'pattern': list(pData.get_pattern().keys())[0],
+                'shape': shape, 'dtype': str(np.dtype(data.get_dtype())),
+                'max_frames_transfer': int(mft),
+                'max_frames_process': int(mfp),
+                'transfer_shape': padded,
+                'transfer_bytes': int(np.prod(padded))*itemsize,
+                'process_bytes': int(np.prod(pshape))*itemsize,
+                'n_transfers': int(np.ceil(frames/float(mft*nprocs))),
+                'size': size,
+                'read': 0 if out else int(size*overlap)}
+
+    def __get_padding(self, pData):
+        """ The padding directions, without converting the plugin padding
+        (which is done by the transport layer). """
+        padding = pData.padding
+        if not padding:
+            return {}
+        if isinstance(padding, Padding):
+            return padding._get_padding_directions()
+        pad = Padding(pData)
+        for key, value in copy.deepcopy(padding).items():
+            getattr(pad, key)(value)
+        return pad._get_padding_directions()
+
+    def get_results(self, exp):
+        """ The budget of the whole process list. """
+        processes = exp.meta_data.get('processes')
+        settings = exp.meta_data.get(['system_params',
+                                      'data_transfer_settings'])
+        # plugins removed from the list by the transport are not run
+        plist = exp.meta_data.plugin_list.plugin_list
+        plugins = [{k: v for k, v in p.items() if k != 'plugin_dict'}
+                   for p in self.plugins
+                   if any(p['plugin_dict'] is d for d in plist)]
+        peak = max([p['peak_memory'] for p in plugins] + [0])
+        return {'n_processes': len(processes),
+                'ranks_per_node': self.ranks_per_node,
+                'max_bytes': settings['max_bytes'],
+                'peak_memory_per_rank': peak,
+                'peak_memory_per_node': peak*self.ranks_per_node,
+                'total_read': sum(p['read'] for p in plugins),
+                'total_written': sum(p['written'] for p in plugins),
+                'plugins': plugins}
+
+    def write(self, filename, exp):
+        """ Output a summary of the budget and write it to a json file. """
+        results = self.get_results(exp)
+        self.__output_summary(results)
+        if exp.meta_data.get('process') == 0:
+            with open(filename, 'w') as f:
+                json.dump(results, f, indent=2)
+        return results
+
+    def __output_summary(self, results):
+        mb = lambda b: "%.1f MB" % (b/1e6)
+        cu.user_message("*" * 23)
+        cu.user_message("* Process list budget *")
+        cu.user_message("*" * 23)
+        cu.user_message("%i processes (%i per node), max_bytes %s" % (
+            results['n_processes'], results['ranks_per_node'],
+            results['max_bytes']))
+        for p in results['plugins']:
+            cu.user_message("%s: peak memory %s per rank, read %s, written "
+                            "%s, %i transfers" % (
+                                p['name'], mb(p['peak_memory']), mb(p['read']),
+                                mb(p['written']), p['n_transfers']))
+            for d in p['in_datasets'] + p['out_datasets']:
+                cu.user_message("    %s %s %s: transfer %s (%s), process %i "
+                                "frames" % (d['name'], d['pattern'],
+                                            d['shape'], d['transfer_shape'],
+                                            mb(d['transfer_bytes']),
+                                            d['max_frames_process']))
+        cu.user_message("Peak memory %s per rank, %s per node" % (
+            mb(results['peak_memory_per_rank']),
+            mb(results['peak_memory_per_node'])))
+        cu.user_message("Total read %s, total written %s" % (
+            mb(results['total_read']), mb(results['total_written'])))
@@ -19,10 +19,14 @@
 .. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
 """
 
+import time
 import logging
 
 import savu.core.utils as cu
 import savu.plugins.utils as pu
+from savu.core.timings import Timings
+from savu.core.planner import Planner
+from savu.core.staging import Stager
 from savu.data.experiment_collection import Experiment
 
 
@@ -42,57 +46,100 @@ class PluginRunner(object):
         # add all relevent locations to the path
         pu.get_plugins_paths()
         self.exp = Experiment(options)
+        if options.get('timings'):
+            self.timings = Timings()
+        self.planner = None
+        if options.get('plan'):
+            self.planner = \
+                Planner(len(options['process_names'].split(',')))
+        self.stager = None
 
     def _run_plugin_list(self):
         """ Create an experiment and run the plugin list.
         """
         self.exp._setup(self)
+        if self.options.get('stage_dir') and not self.planner:
+            self.stager = Stager(self.exp, self.options['stage_dir'])
 
-        plugin_list = self.exp.meta_data.plugin_list
-        logging.info('Running the plugin list check')
-        self._run_plugin_list_setup(plugin_list)
-
-        exp_coll = self.exp._get_collection()
-        n_plugins = plugin_list._get_n_processing_plugins()
-
-        #  ********* transport function ***********
-        logging.info('Running transport_pre_plugin_list_run()')
-        self._transport_pre_plugin_list_run()
+        try:
+            plugin_list = self.exp.meta_data.plugin_list
+            logging.info('Running the plugin list check')
+            start = time.time()
+            self._run_plugin_list_setup(plugin_list)
+            if self.timings:
+                self.timings.set_setup_time(time.time() - start)
 
-        cp = self.exp.checkpoint
-        checkpoint_plugin = cp.get_checkpoint_plugin()
-        for i in range(checkpoint_plugin, n_plugins):
-            self.exp._set_experiment_for_current_plugin(i)
-            memory_before = cu.get_memory_usage_linux()
+            if self.planner:
+                # a dry run: output the budget without processing any data
+                self.planner.write(self.exp.meta_data.get('plan'), self.exp)
+                return self.exp
 
-            plugin_name = self.__run_plugin(exp_coll['plugin_dict'][i])
+            exp_coll = self.exp._get_collection()
+            n_plugins = plugin_list._get_n_processing_plugins()
 
-            self.exp._barrier(msg='PluginRunner: plugin complete.')
+            #  ********* transport function ***********
+            logging.info('Running transport_pre_plugin_list_run()')
+            self._transport_pre_plugin_list_run()
+
+            cp = self.exp.checkpoint
+            checkpoint_plugin = cp.get_checkpoint_plugin()
+            for i in range(checkpoint_plugin, n_plugins):
+                self.exp._set_experiment_for_current_plugin(i)
+                memory_before = cu.get_memory_usage_linux()
+                if self.timings:
+                    self.timings.start_plugin(exp_coll['plugin_dict'][i]['name'])
+
+                plugin_name = self.__run_plugin(exp_coll['plugin_dict'][i])
+                # the nexus entries are written in the background, so the
+                # other processes are not held at the barrier
+                self.exp._write_nxs_batch()
+
+                self.exp._barrier(msg='PluginRunner: plugin complete.')
+                if self.timings:
+                    self.timings.end_plugin()
+
+                memory_after = cu.get_memory_usage_linux()
+                logging.debug("{} memory usage before: {} MB, after: {} MB, change: {} MB".format(
+                    plugin_name, memory_before, memory_after, memory_after - memory_before))
+
+                #  ********* transport functions ***********
+                # end the plugin run if savu has been killed
+                if self._transport_kill_signal():
+                    self._transport_cleanup(i + 1)
+                    break
+                self.exp._barrier(msg='PluginRunner: No kill signal... continue.')
+                # keep the nexus file up to date for a checkpoint restart
+                self.exp._join_nxs_batch()
+                cp.output_plugin_checkpoint()
+            self.exp._join_nxs_batch()
 
-            memory_after = cu.get_memory_usage_linux()
-            logging.debug("{} memory usage before: {} MB, after: {} MB, change: {} MB".format(
-                plugin_name, memory_before, memory_after, memory_after - memory_before))
+            #  ********* transport function ***********
+            logging.info('Running transport_post_plugin_list_run')
+            self._transport_post_plugin_list_run()
 
-            #  ********* transport functions ***********
-            # end the plugin run if savu has been killed
-            if self._transport_kill_signal():
-                self._transport_cleanup(i + 1)
-                break
-            self.exp._barrier(msg='PluginRunner: No kill signal... continue.')
-            cp.output_plugin_checkpoint()
+            # terminate any remaining datasets
+            for data in list(self.exp.index['in_data'].values()):
+                self._transport_terminate_dataset(data)
 
-        #  ********* transport function ***********
-        logging.info('Running transport_post_plugin_list_run')
-        self._transport_post_plugin_list_run()
+            if self.stager:
+                self.stager.clean_up()
+                self.stager = None
 
-        # terminate any remaining datasets
-        for data in list(self.exp.index['in_data'].values()):
-            self._transport_terminate_dataset(data)
+            if self.timings:
+                self.timings.write(self.exp.meta_data.get('timings'))
 
-        self.__output_final_message()
+            self.__output_final_message()
 
-        if self.exp.meta_data.get('email'):
-            cu.send_email(self.exp.meta_data.get('email'))
+            if self.exp.meta_data.get('email'):
+                cu.send_email(self.exp.meta_data.get('email'))
+        finally:
+            # a failed run: finish writing the entries of the completed plugins
+            self.exp._join_nxs_batch()
+            if self.stager:
+                # a failed run: remove the staged files without waiting for
+                # the other processes
+                self.stager.clean_up(collective=False)
+                self.stager = None
 
         return self.exp
 
@@ -144,6 +191,8 @@ class PluginRunner(object):
         # set loaders
         for i in range(n_loaders):
             pu.plugin_loader(self.exp, plist[i])
+            if self.stager:
+                self.stager.stage()
             self.exp._set_initial_datasets()
 
         # run all plugin setup methods and store information in experiment
@@ -173,6 +222,8 @@ class PluginRunner(object):
         plugin = pu.plugin_loader(self.exp, plugin_dict, check=True)
         plugin._revert_preview(plugin.get_in_datasets())
         plugin_dict['cite'] = plugin.tools.get_citations()
+        if self.planner:
+            self.planner.add_plugin(plugin, plugin_dict)
         plugin._clean_up()
         self.exp._merge_out_data_to_in(plugin_dict)
 
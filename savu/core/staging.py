@@ -0,0 +1,191 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: staging
+   :platform: Unix
+   :synopsis: Copies the raw input data to node-local storage before \
+       processing, and redirects the loader reads to the copy.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import logging
+import h5py
+import numpy as np
+from mpi4py import MPI
+
+import savu.core.utils as cu
+from savu.data.data_structures.data_types.data_plus_darks_and_flats import \
+    DataWithDarksAndFlats
+
+# the maximum size of each block of frames copied to the staged file
+COPY_BYTES = 2**27
+
+
+class Stager(object):
+    """ Stage the raw input datasets on node-local storage (e.g. an SSD or
+    tmpfs).
+
+    The region of each hdf5 input dataset that is read by the process list
+    (the bounding box of the loader preview, with all the darks and flats
+    along the image key dimension) is copied once per node, with the frames
+    shared between the processes on the node.  Each process writes its part
+    to a separate file and these are joined by a virtual dataset, with the
+    same shape and path as the original dataset, that replaces the original
+    in the loader data object.  The staged files are removed at the end of
+    the run.
+
+    Every node stages the whole region, not only the frames read by its own
+    processes, as the access pattern (and so the split of the frames between
+    the processes) is chosen later by each plugin and may change between
+    plugins.  The reads from the shared file system therefore grow with the
+    number of nodes, and the local storage on each node must be large enough
+    for the full region.
+    """
+
+    def __init__(self, exp, stage_dir):
+        self.exp = exp
+        self.stage_dir = stage_dir
+        self.files = []
+        self.h5files = []
+        self.staged = []
+        self.comm = MPI.COMM_WORLD.Split_type(MPI.COMM_TYPE_SHARED) \
+            if exp.meta_data.get('mpi') else None
+        self.rank = self.comm.rank if self.comm else 0
+        self.size = self.comm.size if self.comm else 1
+        if self.rank == 0 and not os.path.exists(stage_dir):
+            os.makedirs(stage_dir)
+        self.__barrier()
+
+    def stage(self):
+        """ Stage any input datasets that have not yet been staged. """
+        for name, data_obj in self.exp.index['in_data'].items():
+            if name in self.staged:
+                continue
+            self.staged.append(name)
+            dataset = self.__get_h5_dataset(data_obj)
+            if dataset is None:
+                logging.warning("Unable to stage the %s dataset, which is not "
+                                "a hdf5 dataset", name)
+                continue
+            box = self.__get_bounding_box(data_obj, dataset)
+            staged = self.__stage_dataset(name, dataset, box)
+            if isinstance(data_obj.data, DataWithDarksAndFlats):
+                data_obj.data._override_data_type(staged)
+            else:
+                data_obj.data = staged
+            cu.user_message("Staged the %s dataset %s in %s" % (
+                name, [s.stop - s.start for s in box], self.stage_dir))
+
+    def __get_h5_dataset(self, data_obj):
+        data = data_obj.data
+        if isinstance(data, DataWithDarksAndFlats):
+            data = data.data
+        return data if isinstance(data, h5py.Dataset) else None
+
+    def __get_bounding_box(self, data_obj, dataset):
+        """ The region of the dataset that is read, as a list of slices. """
+        shape = dataset.shape
+        box = [slice(0, s) for s in shape]
+        starts, stops, steps, chunks = \
+            data_obj.get_preview().get_starts_stops_steps()
+        if starts is None or len(starts) != len(shape):
+            return box
+
+        # the darks and flats are interleaved in the image key dimension
+        data = data_obj.data
+        key_dim = data.proj_dim if isinstance(data, DataWithDarksAndFlats) \
+            and data.image_key is not None else None
+        for dim in range(len(shape)):
+            if dim != key_dim:
+                box[dim] = slice(max(0, starts[dim]),
+                                 min(stops[dim], shape[dim]))
+        return box
+
+    def __stage_dataset(self, name, dataset, box):
+        """ Copy the region of the dataset in parallel and return the joined
+        virtual dataset. """
+        folder = self.exp.meta_data.get('out_folder')
+        prefix = os.path.join(self.stage_dir, "%s_%s_%s" % (
+            folder, MPI.Get_processor_name(), name))
+        n = box[0].stop - box[0].start
+        parts = np.array_split(np.arange(n) + box[0].start, self.size)
+        filenames = ["%s_%i.h5" % (prefix, i) for i in range(self.size)]
+
+        if len(parts[self.rank]):
+            self.__copy(dataset, box, parts[self.rank], filenames[self.rank])
+
+        vds_file = prefix + '.h5'
+        self.__barrier()
+        if self.rank == 0:
+            layout = h5py.VirtualLayout(shape=dataset.shape,
+                                        dtype=dataset.dtype)
+            for part, filename in zip(parts, filenames):
+                if not len(part):
+                    continue
+                region = [slice(part[0], part[-1] + 1)] + box[1:]
+                shape = [r.stop - r.start for r in region]
+                layout[tuple(region)] = \
+                    h5py.VirtualSource(filename, 'data', shape=shape)
+            with h5py.File(vds_file, 'w', libver='latest') as f:
+                # keep the original path, which is linked to the nexus file
+                f.create_virtual_dataset(dataset.name, layout)
+        self.__barrier()
+
+        self.files += filenames + [vds_file]
+        self.h5files.append(h5py.File(vds_file, 'r'))
+        return self.h5files[-1][dataset.name]
+
+    def __copy(self, dataset, box, frames, filename):
+        """ Copy the frames of the region in blocks of at most COPY_BYTES. """
+        shape = [len(frames)] + [b.stop - b.start for b in box[1:]]
+        frame_bytes = int(np.prod(shape[1:]))*dataset.dtype.itemsize
+        step = max(1, COPY_BYTES // max(frame_bytes, 1))
+        with h5py.File(filename, 'w') as f:
+            staged = f.create_dataset('data', shape, dataset.dtype)
+            for i in range(0, len(frames), step):
+                j = min(i + step, len(frames))
+                sl = slice(frames[0] + i, frames[0] + j)
+                staged[i:j] = dataset[tuple([sl] + box[1:])]
+
+    def clean_up(self, collective=True):
+        """ Remove the staged files and free the node communicator.
+
+        :keyword bool collective: Set to False if the run has failed, to
+            remove the files without waiting for the other processes.
+        """
+        for h5file in self.h5files:
+            if h5file.id.valid:
+                h5file.close()
+        self.h5files = []
+        if collective:
+            self.__barrier()
+        if self.rank == 0 or not collective:
+            for filename in self.files:
+                try:
+                    os.remove(filename)
+                except OSError:
+                    # not created, or removed by another process
+                    pass
+        self.files = []
+        if self.comm:
+            self.comm.Free()
+            self.comm = None
+
+    def __barrier(self):
+        if self.comm:
+            self.comm.barrier()
@@ -0,0 +1,111 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: timings
+   :platform: Unix
+   :synopsis: Records the time spent in each plugin and processing phase, \
+       the bytes moved and the peak memory, for benchmarking.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import json
+import time
+from mpi4py import MPI
+
+import savu.core.utils as cu
+
+
+class Timings(object):
+    """ Per-plugin and per-phase timings for a single process.  The phases
+    are recorded by the transport layer: 'transfer' (reading the input data),
+    'process' (the plugin process_frames calls) and 'return' (writing the
+    output data).
+
+    The memory recorded for each plugin is 'max_rss', the peak resident
+    memory of the process up to the end of the plugin, and 'max_rss_increase',
+    the amount by which the plugin raised it.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.setup = 0
+        self.plugins = []
+        self.current = None
+        self._max_rss = 0
+
+    def set_setup_time(self, seconds):
+        self.setup = seconds
+
+    def start_plugin(self, name):
+        self.current = {'name': name, 'time': time.time(), 'phases': {},
+                        'bytes': {}}
+        self._max_rss = cu.get_memory_usage_linux(kb=True)*1024
+
+    def add(self, phase, seconds, nbytes=0):
+        """ Add the time taken and bytes moved by a phase of the current
+        plugin. """
+        if self.current is None:
+            return
+        phases, nbytes_dict = self.current['phases'], self.current['bytes']
+        phases[phase] = phases.get(phase, 0) + seconds
+        if nbytes:
+            nbytes_dict[phase] = nbytes_dict.get(phase, 0) + int(nbytes)
+
+    def end_plugin(self):
+        self.current['time'] = time.time() - self.current['time']
+        max_rss = cu.get_memory_usage_linux(kb=True)*1024
+        self.current['max_rss'] = max_rss
+        self.current['max_rss_increase'] = max_rss - self._max_rss
+        self.plugins.append(self.current)
+        self.current = None
+
+    def get_results(self, comm=MPI.COMM_WORLD):
+        """ Combine the timings from all processes.  Times and memory are the
+        maximum over the processes and bytes are the total.  Returns None on
+        all but the first process. """
+        all_plugins = comm.gather(self.plugins, root=0)
+        setup = comm.reduce(self.setup, op=MPI.MAX, root=0)
+        total = comm.reduce(time.time() - self.start, op=MPI.MAX, root=0)
+        if comm.rank != 0:
+            return None
+
+        plugins = []
+        for entries in zip(*all_plugins):
+            entry = {'name': entries[0]['name'],
+                     'time': max(e['time'] for e in entries),
+                     'max_rss': max(e['max_rss'] for e in entries),
+                     'max_rss_increase':
+                         max(e['max_rss_increase'] for e in entries),
+                     'phases': {}, 'bytes': {}}
+            for e in entries:
+                for phase, value in e['phases'].items():
+                    entry['phases'][phase] = \
+                        max(entry['phases'].get(phase, 0), value)
+                for phase, value in e['bytes'].items():
+                    entry['bytes'][phase] = \
+                        entry['bytes'].get(phase, 0) + value
+            plugins.append(entry)
+        return {'n_processes': comm.size, 'total': total, 'setup': setup,
+                'plugins': plugins}
+
+    def write(self, filename, comm=MPI.COMM_WORLD):
+        """ Write the combined timings to a json file. """
+        results = self.get_results(comm=comm)
+        if results is not None:
+            with open(filename, 'w') as f:
+                json.dump(results, f, indent=2)
+        return results
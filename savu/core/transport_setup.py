@@ -26,6 +26,7 @@ import os
 
 from mpi4py import MPI
 import savu.core.utils as cu
+import savu.core.placement as placement
 
 
 class MPI_setup(object):
@@ -38,7 +39,13 @@ class MPI_setup(object):
         """
         processes = options["process_names"].split(',')
 
-        if len(processes) == 1:
+        if options.get('plan'):
+            # plan for the processes on every node from a single process
+            options["mpi"] = False
+            options["process"] = 0
+            options["processes"] = processes*options.get('plan_nodes', 1)
+            self.__set_logger_single(options)
+        elif len(processes) == 1:
             options["mpi"] = False
             options["process"] = 0
             options["processes"] = processes
@@ -47,8 +54,41 @@ class MPI_setup(object):
             options["mpi"] = True
             self.__mpi_setup(options)
 
+        if options.get('pin') and not options.get('plan'):
+            self.__pin_process(options)
+
         logging.debug(options)
 
+    def __pin_process(self, options):
+        """ Pin each process to a disjoint set of cores in one memory domain
+        of its node, and report the placement. """
+        if options['mpi']:
+            comm = MPI.COMM_WORLD.Split_type(MPI.COMM_TYPE_SHARED)
+            n_local, local_rank = comm.size, comm.rank
+            comm.Free()
+        else:
+            n_local, local_rank = 1, 0
+
+        try:
+            placed = placement.pin_process(n_local, local_rank)
+        except (AttributeError, OSError, ValueError) as e:
+            logging.warning("Unable to pin the process: %s", e)
+            placed = None
+        options['placement'] = placed
+
+        host = socket.gethostname()
+        all_placed = MPI.COMM_WORLD.gather((host, placed)) \
+            if options['mpi'] else [(host, placed)]
+        if options['process'] == 0:
+            for rank, (host, placed) in enumerate(all_placed):
+                if placed is None:
+                    cu.user_message("Rank %i (%s): not pinned" % (rank, host))
+                    continue
+                cu.user_message(
+                    "Rank %i (%s): memory domain %i of %i (%s), cpus %s" % (
+                        rank, host, placed['domain'], placed['n_domains'],
+                        placed['memory_policy'], placed['cpus']))
+
     def __mpi_setup(self, options):
         """ Set MPI process specific values and logging initialisation.
         """
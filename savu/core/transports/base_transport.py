@@ -29,10 +29,13 @@ import h5py
 import math
 import logging
 import numpy as np
+from mpi4py import MPI
 
 import savu.core.utils as cu
 import savu.plugins.utils as pu
 from savu.data.data_structures.data_types.base_type import BaseType
+from savu.data.data_structures.statistics import Statistics
+from savu.data.data_structures.resident_data import ResidentData
 
 NX_CLASS = 'NX_class'
 
@@ -46,6 +49,8 @@ class BaseTransport(object):
     def __init__(self):
         self.pDict = None
         self.no_processing = False
+        self.stats = None
+        self.timings = None
 
     def _transport_initialise(self, options):
         """
@@ -125,8 +130,10 @@ class BaseTransport(object):
         """
         logging.info("transport_process initialise")
         pDict, result, nTrans = self._initialise(plugin)
+        self.__check_resident_data(plugin)
         logging.info("transport_process get_checkpoint_params")
         cp, sProc, sTrans = self.__get_checkpoint_params(plugin)
+        self.__initialise_statistics(restart=bool(sProc or sTrans))
 
         prange = list(range(sProc, pDict['nProc']))
         kill = False
@@ -136,7 +143,9 @@ class BaseTransport(object):
 
             # get the transfer data
             logging.info("Transferring the data")
+            start = time.time()
             transfer_data = self._transfer_all_data(count)
+            self.__add_timing('transfer', start, transfer_data)
 
             if count == nTrans-1 and plugin.fixed_length == False:
                 shape = [data.shape for data in transfer_data]
@@ -144,17 +153,73 @@ class BaseTransport(object):
 
             # loop over the process data
             logging.info("process frames loop")
+            start = time.time()
             result, kill = self._process_loop(
                     plugin, prange, transfer_data, count, pDict, result, cp)
+            self.__add_timing('process', start)
 
             logging.info("Returning the data")
+            start = time.time()
             self._return_all_data(count, result, end)
+            self.__add_timing('return', start, result)
 
             if kill:
                 return 1
 
         if not kill:
             cu.user_message("%s - 100%% complete" % (plugin.name))
+            self._set_statistics(plugin)
+
+    def _transport_sweep(self, plugin, instances):
+        """ Process all instances of a plugin parameter sweep in a single pass
+        over the data.  Each block of data is transferred once and processed
+        by every instance, with the results written to the relevant index of
+        the extra (parameter) dimensions of the output datasets.
+
+        :param plugin plugin: The current plugin instance.
+        :param list(function) instances: Functions that switch the plugin to
+            each set of parameter values.
+        """
+        logging.info("transport_sweep initialise")
+        setups = []
+        for activate in instances:
+            activate()
+            pDict, result, nTrans = self._initialise(plugin)
+            setups.append([pDict, result, list(range(pDict['nProc']))])
+        self.__check_resident_data(plugin)
+        self.__initialise_statistics()
+
+        last = len(instances) - 1
+        for count in range(nTrans):
+            end = True if count == nTrans-1 else False
+            self._log_completion_status(count, nTrans, plugin.name)
+
+            logging.info("Transferring the data")
+            self.pDict = setups[0][0]
+            start = time.time()
+            transfer_data = self._transfer_all_data(count)
+            self.__add_timing('transfer', start, transfer_data)
+
+            logging.info("process frames loop for %d instances", last+1)
+            for i, activate in enumerate(instances):
+                activate()
+                self.pDict, result, prange = setups[i]
+                # plugins may modify the input data in place
+                data = transfer_data if i == last else \
+                    [d.copy() for d in transfer_data]
+                if end and plugin.fixed_length == False:
+                    shape = [d.shape for d in transfer_data]
+                    prange = self.remove_extra_slices(prange, shape)
+                start = time.time()
+                setups[i][1], _ = self._process_loop(
+                    plugin, prange, data, count, self.pDict, result, None)
+                self.__add_timing('process', start)
+                start = time.time()
+                self._return_all_data(count, setups[i][1], end)
+                self.__add_timing('return', start, setups[i][1])
+
+        cu.user_message("%s - 100%% complete" % (plugin.name))
+        self._set_statistics(plugin)
 
     def remove_extra_slices(self, prange, transfer_shape):
         # loop over datasets:
@@ -222,6 +287,65 @@ class BaseTransport(object):
         self.no_processing = True if not nTrans else False
         return pDict, result, nTrans
 
+    def __check_resident_data(self, plugin):
+        """ Input datasets held in memory (see ResidentData) can only be
+        read if every process reads back the blocks that it wrote.  If not,
+        write the blocks to file and read them from there instead. """
+        pDict = self.pDict
+        comm = plugin.get_communicator()
+        for i in pDict['nIn']:
+            data = pDict['in_data'][i].data
+            if not isinstance(data, ResidentData) or not data.resident:
+                continue
+            if not comm.allreduce(data._is_modified(), op=MPI.LOR):
+                continue  # the file is up to date
+            if 'transfer' in list(pDict['in_sl'].keys()):
+                slice_lists = pDict['in_sl']['transfer'][i]
+            else:
+                slice_lists = [[slice(None)]*len(data.shape)]
+            resident = all(data._is_resident(sl) for sl in slice_lists)
+            if not comm.allreduce(resident, op=MPI.LAND):
+                logging.info("Dataset %s is not resident on all processes, "
+                             "writing to file",
+                             pDict['in_data'][i].get_name())
+                data._set_resident(False)
+                data._sync()
+                self.exp._barrier(communicator=comm,
+                                  msg="Write resident data to file")
+
+    def __add_timing(self, phase, start, data=None):
+        """ Record the time since start, and the size of any data moved, if
+        timings have been requested (see savu.core.timings). """
+        if self.timings is None:
+            return
+        nbytes = sum(d.nbytes for d in data if d is not None) if data else 0
+        self.timings.add(phase, time.time() - start, nbytes)
+
+    def __initialise_statistics(self, restart=False):
+        """ Create a running statistics accumulator for each output dataset
+        if statistics have been requested. """
+        self.stats = None
+        self._stats_restart = restart
+        if self.exp.meta_data.get_dictionary().get('stats', False):
+            self.stats = [Statistics() for i in self.pDict['nOut']]
+
+    def _set_statistics(self, plugin):
+        """ Reduce the running statistics across all processes and add them
+        to the metadata of each output dataset, in the 'stats' entry with key
+        'global'.  Statistics are not recorded if the processing restarted
+        from a checkpoint, as the data processed before the restart is missing.
+        """
+        if not self.stats:
+            return
+        comm = plugin.get_communicator()
+        if comm.allreduce(self._stats_restart, op=MPI.LOR):
+            logging.info("Statistics not recorded after checkpoint restart")
+            return
+        for data, stats in zip(self.pDict['out_data'], self.stats):
+            stats.reduce(comm)
+            for key, value in stats.get_dictionary().items():
+                data.meta_data.set(['stats', key, 'global'], value)
+
     def _log_completion_status(self, count, nTrans, name):
         percent_complete: float = count / (nTrans * 0.01)
         cu.user_message("%s - %3i%% complete" % (name, percent_complete))
@@ -334,7 +458,10 @@ class BaseTransport(object):
                             data_list[idx], result[idx], slice_list[idx])
                     data_list[idx].data[slice_list[idx]] = temp
                 else:
-                    data_list[idx].data = result[idx]
+                    temp = result[idx]
+                    data_list[idx].data = temp
+                if self.stats:
+                    self.stats[idx].update(temp)
 
     def _set_global_frame_index(self, plugin, frame_list, nProc):
         """ Convert the transfer global frame index to a process global frame
@@ -494,9 +621,7 @@ class BaseTransport(object):
         return 'final_result'
 
     def _populate_nexus_file(self, data):
-        filename = self.exp.meta_data.get('nxs_filename')
-
-        with h5py.File(filename, 'a') as nxs_file:
+        with self.exp._open_nxs_file() as nxs_file:
             nxs_entry = nxs_file['entry']
             name = data.data_info.get('name')
             group_name = self.exp.meta_data.get(['group_name', name])
@@ -532,6 +657,7 @@ class BaseTransport(object):
 
     def __output_data_type(self, entry, data, name):
         data = data.data if 'data' in list(data.__dict__.keys()) else data
+        data = data.data if isinstance(data, ResidentData) else data
         if isinstance(data, h5py.Dataset):
             return
 
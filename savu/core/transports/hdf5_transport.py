@@ -35,6 +35,7 @@ class Hdf5Transport(BaseTransport):
         super(Hdf5Transport, self).__init__()
         os.environ['savu_mode'] = 'hdf5'
         self.count = 0
+        self._checkpoint_datasets = None
 
     def _transport_initialise(self, options):
         MPI_setup(options)
@@ -75,6 +76,9 @@ class Hdf5Transport(BaseTransport):
         self._set_file_details(self.files[count])
 
     def _transport_post_plugin(self):
+        if self.exp.nxs_batch is not None:
+            self.__post_plugin_nxs_batch()
+            return
         for data in list(self.exp.index['out_data'].values()):
             if not data.remove:
                 msg = self.__class__.__name__ + "_transport_post_plugin."
@@ -87,13 +91,36 @@ class Hdf5Transport(BaseTransport):
                 # reopen file as read-only
                 self.hdf5._reopen_file(data, 'r')
 
+    def __post_plugin_nxs_batch(self):
+        """ Reopen the files (collectively) before the writer process adds the
+        entries to the in-memory batch, so the other processes do not wait
+        for it. """
+        datasets = [d for d in list(self.exp.index['out_data'].values())
+                    if not d.remove]
+        for data in datasets:
+            # reopen file as read-only
+            self.hdf5._reopen_file(data, 'r')
+        if self.exp.meta_data.get('process') == \
+                len(self.exp.meta_data.get('processes'))-1:
+            for data in datasets:
+                self._populate_nexus_file(data)
+                self.hdf5._link_datafile_to_nexus_file(data)
+
     def _transport_terminate_dataset(self, data):
         self.hdf5._close_file(data)
 
     def _transport_checkpoint(self):
         """ The framework has determined it is time to checkpoint.  What
-        should this transport mechanism do?"""
+        should this transport mechanism do?  The dataset metadata is only
+        written at the first checkpoint of each plugin, as it does not change
+        during processing."""
         cp = self.exp.checkpoint
+        datasets = (self.exp.meta_data.get('nPlugin'),
+                    tuple(self.exp.index['in_data'].keys()),
+                    tuple(self.exp.index['out_data'].keys()))
+        if datasets == self._checkpoint_datasets:
+            return
+        self._checkpoint_datasets = datasets
         with self.hdf5._open_backing_h5(cp._file, 'a', mpi=False) as f:
             self._metadata_dump(f, 'in_data')
             self._metadata_dump(f, 'out_data')
@@ -234,10 +234,13 @@ def _savu_decoder(data):
 
 def get_memory_usage_linux(kb=False, mb=True):
     """
+    The peak resident memory (ru_maxrss) of this process since it started,
+    not its current memory usage.
+
     :param kb: Return the value in Kilobytes
     :param mb: Return the value in Megabytes
-    :return: The string of the value in either KB or MB
-    :rtype str
+    :return: The value in either KB or MB
+    :rtype int
     """
 
     try:
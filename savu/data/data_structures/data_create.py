@@ -27,6 +27,7 @@ import numpy as np
 
 from savu.core.utils import docstring_parameter
 import savu.data.data_structures.data_notes as notes
+import savu.data.data_structures.utils as dsu
 
 
 class DataCreate(object):
@@ -92,7 +93,7 @@ class DataCreate(object):
     def __create_dataset_from_object(self, data_obj):
         """ Create a dataset from an existing Data object.
         """
-        patterns = copy.deepcopy(data_obj.get_data_patterns())
+        patterns = dsu._copy_patterns(data_obj.get_data_patterns())
         self.__copy_labels(data_obj)
         self.__find_and_set_shape(data_obj)
         self._set_data_patterns(patterns)
@@ -120,12 +121,12 @@ class DataCreate(object):
     def __copy_patterns(self, copy_data):
         """ Copy patterns """
         if isinstance(copy_data, DataCreate):
-            patterns = copy.deepcopy(copy_data.get_data_patterns())
+            patterns = dsu._copy_patterns(copy_data.get_data_patterns())
         else:
             data = list(copy_data.keys())[0]
             pattern_list = copy_data[data]
 
-            all_patterns = copy.deepcopy(data.get_data_patterns())
+            all_patterns = dsu._copy_patterns(data.get_data_patterns())
             if len(pattern_list[0].split('.')) > 1:
                 patterns = self.__copy_patterns_removing_dimensions(
                     pattern_list, all_patterns, len(data.get_shape()))
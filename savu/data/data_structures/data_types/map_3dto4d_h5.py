@@ -23,9 +23,13 @@
 """
 
 import numpy as np
+from collections import OrderedDict
 
 from savu.data.data_structures.data_types.base_type import BaseType
 
+# the number of selection block patterns to cache
+BLOCK_CACHE_SIZE = 8
+
 
 class Map3dto4dh5(BaseType):
     """ This class converts a 3D dataset to a 4D dataset. """
@@ -43,31 +47,81 @@ class Map3dto4dh5(BaseType):
 
         new_shape = (n_angles, shape[1], shape[2], shape[0] // n_angles)
         self.shape = new_shape
+        self._blocks = OrderedDict()
 
     def clone_data_args(self, args, kwargs, extras):
         args = ['self', 'n_angles']
         return args, kwargs, extras
 
     def __getitem__(self, idx):
-        rot_dim = \
-            self.data_obj.get_data_dimension_by_axis_label('rotation_angle')
-        n_angles = self.shape[rot_dim]
-        idx_dim3 = np.arange(idx[3].start, idx[3].stop, idx[3].step)
-        idx_dim0 = np.arange(idx[0].start, idx[0].stop, idx[0].step)
-        idx_dim0 = np.ravel(idx_dim3.reshape(-1, 1)*n_angles + idx_dim0)
-
-        size = [len(np.arange(i.start, i.stop, i.step)) for i in idx]
-        data = np.empty(size)
-
-        change = np.where(idx_dim0[:-1] // n_angles != idx_dim0[1:] // n_angles)[0]
-        start = idx_dim0[np.append(0, change+1)]
-        stop = idx_dim0[np.append(change, len(idx_dim0)-1)] + 1
-        length = stop - start
-
-        for i in range(len(start)):
-            new_slice = (slice(start[i], stop[i], idx[0].step), idx[1], idx[2])
-            data[0:length[i], :, :, i] = self.data[new_slice]
-        return data
+        idx = [sl if isinstance(sl, slice) else slice(sl, sl+1)
+               for sl in idx]
+        blocks, nAngles, nScans = self.__get_blocks(idx[0], idx[3])
+        nY = len(range(*idx[1].indices(self.shape[1])))
+        nX = len(range(*idx[2].indices(self.shape[2])))
+
+        # read directly into a (scan, angle, y, x) buffer of the source dtype
+        data = np.empty((nScans, nAngles, nY, nX), dtype=self.data.dtype)
+        flat = data.reshape(nScans*nAngles, nY, nX)
+        for src, dest in blocks:
+            self.__read(flat, (src, idx[1], idx[2]), dest)
+        return np.moveaxis(data, 0, -1)
+
+    def __read(self, out, source_sel, dest_sel):
+        if hasattr(self.data, 'read_direct'):
+            self.data.read_direct(out, source_sel=source_sel,
+                                  dest_sel=dest_sel)
+        else:
+            out[dest_sel] = self.data[source_sel]
+
+    def __get_blocks(self, angle_sl, scan_sl):
+        """ Split the 4D (angle, scan) selection into slices of the 3D
+        dataset, merging neighbouring scans into a single hyperslab if the
+        stride between them is regular.
+
+        :returns: A list of (source slice, destination slice) pairs, the
+            number of angles and the number of scans.
+        """
+        angles = range(*angle_sl.indices(self.n_angles))
+        scans = range(*scan_sl.indices(self.shape[3]))
+        blocks, nAngles, nScans = self.__get_block_pattern(
+            len(angles), angles.step, len(scans), scans.step)
+        start = scans[0]*self.n_angles + angles[0]
+        blocks = [(slice(src.start + start, src.stop + start, src.step), dest)
+                  for src, dest in blocks]
+        return blocks, nAngles, nScans
+
+    def __get_block_pattern(self, nAngles, angle_step, nScans, scan_step):
+        """ The block decomposition of a selection, relative to its first
+        index.  This is the same for every frame of a transfer, so the most
+        recent patterns are cached.
+        """
+        key = (nAngles, angle_step, nScans, scan_step)
+        if key in self._blocks:
+            self._blocks.move_to_end(key)
+            return self._blocks[key]
+
+        first = [i*scan_step*self.n_angles for i in range(nScans)]
+        if nScans == 1 or nAngles == 1:
+            step = angle_step if nScans == 1 else scan_step*self.n_angles
+            merge = True
+        else:
+            step = angle_step
+            gap = scan_step*self.n_angles - (nAngles - 1)*angle_step
+            merge = gap == step
+
+        if merge:
+            stop = first[-1] + (nAngles - 1)*angle_step + 1
+            blocks = [(slice(0, stop, step), slice(None))]
+        else:
+            blocks = [(slice(f, f + (nAngles - 1)*step + 1, step),
+                       slice(i*nAngles, (i+1)*nAngles))
+                      for i, f in enumerate(first)]
+
+        self._blocks[key] = (blocks, nAngles, nScans)
+        if len(self._blocks) > BLOCK_CACHE_SIZE:
+            self._blocks.popitem(last=False)
+        return self._blocks[key]
 
     def get_shape(self):
         return self.shape
@@ -185,6 +185,35 @@ class Preview(object):
             vals = [[0]*len(shape), shape, [1]*len(shape), [1]*len(shape)]        
         return [':'.join(map(str, l)) for l in list(zip(*vals))]
 
+    def _get_reconnaissance_preview(self, preview_list, budget):
+        """ Stride a preview list so that no more than ``budget[label]``
+        indices, spread evenly over the original range, are selected in the
+        dimension with each axis label.  Dimensions that are not in the
+        budget, or have a chunk greater than one, are unchanged.
+
+        :param list preview_list: A Savu data preview list.
+        :param dict budget: The maximum number of indices for each axis label.
+        :returns: A Savu preview list containing integers.
+        :rtype: list(str)
+        """
+        preview_list = parse_str(preview_list) if \
+            isinstance(preview_list, str) else list(preview_list)
+        plist = self.get_integer_entries(self.__convert_nprocs(preview_list))
+        for label, n in budget.items():
+            dim = self.get_data_obj().get_data_dimension_by_axis_label(
+                label, exists=True)
+            if dim is False or not n:
+                continue
+            start, stop, step, chunk = [int(v) for v in plist[dim].split(':')]
+            length = len(range(start, stop, step))
+            if chunk != 1 or length <= n:
+                continue
+            stride = int(np.ceil(length / float(n)))
+            # centre the selected indices in the original range
+            start += ((length - 1) % stride) // 2 * step
+            plist[dim] = ':'.join(map(str, [start, stop, step*stride, 1]))
+        return plist
+
     def convert_indices(self, idx, dim):
         """ convert keywords to integers.
         """
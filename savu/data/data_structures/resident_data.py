@@ -0,0 +1,164 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: resident_data
+   :platform: Unix
+   :synopsis: A wrapper around a backing hdf5 dataset that keeps the blocks \
+       written by this process in memory.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import numpy as np
+
+
+class ResidentData(object):
+    """ Holds the blocks of a dataset written by this process in memory,
+    rather than writing them to the backing file.  Blocks are read back from
+    memory, so the dataset can be passed between iterations of a plugin
+    without any file access, provided each process only reads back the
+    blocks it wrote.
+
+    The backing file is only written when the dataset is flushed, or if
+    residency is switched off, when all subsequent writes go straight to file.
+    Both write independently of the other processes, so the backing file is
+    only flushed to disk by ``_sync``, which is collective under MPI-IO.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.shape = data.shape
+        self.dtype = data.dtype
+        self.resident = True
+        self._blocks = {}
+        self._modified = False
+
+    def __setitem__(self, idx, value):
+        key = self.__get_key(idx)
+        if not self.resident or key is None:
+            self._set_resident(False)
+            self.data[idx] = value
+            return
+        block = np.array(value, dtype=self.dtype).reshape(
+            [stop - start for start, stop in key])
+        for old in list(self._blocks.keys()):
+            if self.__contains(key, old):
+                del self._blocks[old]
+            elif self.__overlaps(key, old):
+                # keep partially overwritten blocks up to date
+                self._blocks[old][self.__relative(old, key)] = \
+                    block[self.__relative(key, old)]
+        self._blocks[key] = block
+        self._modified = True
+
+    def __getitem__(self, idx):
+        key = self.__get_key(idx)
+        block = self.__find_block(key) if key else None
+        if block is not None:
+            data = self._blocks[block][self.__relative(block, key)]
+            return data.reshape(self.__get_shape(idx, key))
+        if self._modified:
+            raise Exception("The requested slice of a resident dataset is "
+                            "not held by this process.")
+        return self.data[idx]
+
+    def _is_modified(self):
+        """ True if the dataset has been written since it was last flushed."""
+        return self._modified
+
+    def _is_resident(self, slice_list):
+        """ True if the region given by ``slice_list`` (which may extend past
+        the dataset boundaries) is held in memory by this process. """
+        slice_list = list(slice_list) + \
+            [slice(None)]*(len(self.shape) - len(slice_list))
+        clipped = []
+        for sl, dim in zip(slice_list, self.shape):
+            start = 0 if sl.start is None else max(sl.start, 0)
+            stop = dim if sl.stop is None else min(sl.stop, dim)
+            clipped.append(slice(start, stop, sl.step))
+        key = self.__get_key(tuple(clipped))
+        return key is not None and self.__find_block(key) is not None
+
+    def _flush(self):
+        """ Write the blocks held by this process to the backing file. """
+        if self._modified:
+            for key, block in self._blocks.items():
+                self.data[tuple(slice(*k) for k in key)] = block
+        self._modified = False
+
+    def _sync(self):
+        """ Flush the backing file to disk.  This must be called by all
+        processes together, as the file may be opened with the mpio driver.
+        """
+        self.data.file.flush()
+
+    def _set_resident(self, resident):
+        """ Switch residency on or off.  Switching off writes the blocks
+        held in memory to file and releases them. """
+        if not resident:
+            self._flush()
+            self._blocks = {}
+        self.resident = resident
+
+    def __get_key(self, idx):
+        """ The (start, stop) of each dimension of a unit step region, or None
+        if the region cannot be held in memory. """
+        idx = idx if isinstance(idx, tuple) else (idx,)
+        if any(i is Ellipsis for i in idx) or len(idx) > len(self.shape):
+            return None
+        idx = idx + (slice(None),)*(len(self.shape) - len(idx))
+        key = []
+        for i, dim in zip(idx, self.shape):
+            if isinstance(i, slice):
+                start, stop, step = i.indices(dim)
+                if step != 1 or stop <= start:
+                    return None
+                key.append((start, stop))
+            elif isinstance(i, (int, np.integer)):
+                i = int(i) + dim if i < 0 else int(i)
+                key.append((i, i + 1))
+            else:
+                return None
+        return tuple(key)
+
+    def __get_shape(self, idx, key):
+        """ The shape of the region with integer indexed dimensions removed.
+        """
+        idx = idx if isinstance(idx, tuple) else (idx,)
+        idx = idx + (slice(None),)*(len(self.shape) - len(idx))
+        return [stop - start for (start, stop), i in zip(key, idx)
+                if isinstance(i, slice)]
+
+    def __find_block(self, key):
+        if key in self._blocks:
+            return key
+        for block in self._blocks:
+            if self.__contains(block, key):
+                return block
+        return None
+
+    def __contains(self, outer, inner):
+        return all(o[0] <= i[0] and i[1] <= o[1]
+                   for o, i in zip(outer, inner))
+
+    def __overlaps(self, a, b):
+        return all(x[0] < y[1] and y[0] < x[1] for x, y in zip(a, b))
+
+    def __relative(self, block, key):
+        """ The slices of the intersection of ``key`` with ``block``, relative
+        to the start of ``block``. """
+        return tuple(slice(max(k[0], b[0]) - b[0], min(k[1], b[1]) - b[0])
+                     for b, k in zip(block, key))
@@ -0,0 +1,162 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: statistics
+   :platform: Unix
+   :synopsis: A class to accumulate global statistics of a dataset block by \
+       block, as the data is written to file.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import math
+import numpy as np
+
+
+class Statistics(object):
+    """ Running statistics (min, max, sum, sum of squares, NaN count and a
+    histogram) of a dataset, updated with each block of data that is written.
+
+    The histogram has a fixed number of bins whose width is a power of two and
+    whose edges are multiples of that width.  When a block falls outside the
+    current range the bin width is doubled (and neighbouring bins merged) as
+    many times as necessary, so that histograms accumulated on different
+    processes can always be combined exactly.
+    """
+
+    def __init__(self, n_bins=256):
+        self.n_bins = n_bins
+        self.count = 0
+        self.nan_count = 0
+        self.inf_count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.hist = None
+        self._exp = None  # the bin width is 2**self._exp
+        self._offset = None  # index of the first bin in units of bin width
+
+    def update(self, block):
+        """ Add a block of data to the running statistics.
+
+        :param ndarray block: The data block.
+        """
+        block = np.asarray(block)
+        finite = np.isfinite(block)
+        if finite.all():
+            values = block.ravel()
+        else:
+            nans = np.count_nonzero(np.isnan(block))
+            self.nan_count += nans
+            self.inf_count += block.size - np.count_nonzero(finite) - nans
+            values = block[finite]
+        if not values.size:
+            return
+
+        values = values.astype(np.float64, copy=False)
+        vmin, vmax = values.min(), values.max()
+        self.count += values.size
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+        self.sum += values.sum()
+        self.sum_sq += np.dot(values, values)
+
+        self.__rebin(self.__get_bin_exponent(self.min, self.max))
+        idx = np.floor(np.ldexp(values, -self._exp)).astype(np.int64)
+        self.hist += np.bincount(idx - self._offset, minlength=self.n_bins)
+
+    def merge(self, other):
+        """ Combine the statistics of another instance with this one.
+
+        :param Statistics other: Statistics of another part of the dataset.
+        """
+        self.nan_count += other.nan_count
+        self.inf_count += other.inf_count
+        if not other.count:
+            return
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sum += other.sum
+        self.sum_sq += other.sum_sq
+
+        exp = self.__get_bin_exponent(self.min, self.max, other._exp)
+        self.__rebin(exp)
+        self.hist += self.__rebin_counts(
+            other.hist, other._exp, other._offset, exp, self._offset)
+
+    def reduce(self, comm):
+        """ Combine the statistics from all processes in the communicator.
+
+        :param comm: An MPI communicator.
+        """
+        gathered = comm.allgather(self)
+        stats = Statistics(self.n_bins)
+        for s in gathered:
+            stats.merge(s)
+        self.__dict__.update(stats.__dict__)
+
+    def get_dictionary(self):
+        """ The statistics as a dictionary, with entries ``min``, ``max``,
+        ``sum``, ``sum_sq``, ``mean``, ``std``, ``count``, ``nan_count``,
+        ``inf_count``, ``histogram`` and ``bin_edges``.  Only the counts are
+        included if the dataset contains no finite values. """
+        stats = {'count': self.count, 'nan_count': self.nan_count,
+                 'inf_count': self.inf_count}
+        if not self.count:
+            return stats
+        mean = self.sum/self.count
+        stats.update({'min': self.min, 'max': self.max, 'sum': self.sum,
+                      'sum_sq': self.sum_sq, 'mean': mean,
+                      'std': math.sqrt(max(self.sum_sq/self.count - mean**2,
+                                           0.0)),
+                      'histogram': self.hist.copy(),
+                      'bin_edges': np.ldexp(
+                          np.arange(self._offset, self._offset+self.n_bins+1,
+                                    dtype=np.float64), self._exp)})
+        return stats
+
+    def __get_bin_exponent(self, vmin, vmax, exp=None):
+        """ The smallest bin width exponent, no smaller than the current one
+        (or ``exp``), for which [vmin, vmax] spans at most n_bins bins. """
+        exp = max(e for e in [self._exp, exp, -1074] if e is not None)
+        if self._exp is None and exp == -1074:
+            # initial estimate from the data range
+            span = vmax - vmin if vmax > vmin else (abs(vmax) or 1.0)
+            exp = max(int(math.floor(math.log2(span/self.n_bins))), -1074)
+        while math.floor(math.ldexp(vmax, -exp)) - \
+                math.floor(math.ldexp(vmin, -exp)) >= self.n_bins:
+            exp += 1
+        return exp
+
+    def __rebin(self, exp):
+        """ Change the bin width exponent to ``exp`` and shift the histogram
+        so that it starts at the bin containing the current minimum. """
+        offset = int(math.floor(math.ldexp(self.min, -exp)))
+        if self.hist is None:
+            self.hist = np.zeros(self.n_bins, dtype=np.int64)
+        elif exp != self._exp or offset != self._offset:
+            self.hist = self.__rebin_counts(
+                self.hist, self._exp, self._offset, exp, offset)
+        self._exp, self._offset = exp, offset
+
+    def __rebin_counts(self, hist, exp, offset, new_exp, new_offset):
+        """ Map histogram counts onto a coarser (or shifted) grid. """
+        idx = np.arange(offset, offset + len(hist), dtype=np.int64)
+        idx = (idx >> (new_exp - exp)) - new_offset
+        return np.bincount(idx, weights=hist, minlength=self.n_bins)[
+            :self.n_bins].astype(np.int64)
@@ -48,6 +48,7 @@ def _deepcopy_data_object(dObj, new_obj):
     """
     new_obj.meta_data = dObj.meta_data
     new_obj.pattern_list = copy.deepcopy(dObj.pattern_list)
+    # copied on write (see MetaData.__deepcopy__)
     new_obj.data_info = copy.deepcopy(dObj.data_info)
     new_obj.exp = dObj.exp
     new_obj._plugin_data_obj = dObj._plugin_data_obj
@@ -64,6 +65,13 @@ def _deepcopy_data_object(dObj, new_obj):
     return new_obj
 
 
+def _copy_patterns(patterns):
+    """ Copy a dictionary of patterns, or a single pattern, sharing the
+    (immutable) dimension tuples. """
+    return {k: _copy_patterns(v) if isinstance(v, dict) else copy.copy(v)
+            for k, v in patterns.items()}
+
+
 def get_available_pattern_types():
     return list(pattern_list.keys())
 
@@ -31,6 +31,7 @@ from savu.data.meta_data import MetaData
 from savu.data.plugin_list import PluginList
 from savu.data.data_structures.data import Data
 from savu.core.checkpointing import Checkpointing
+from savu.core.nexus_batch import NexusBatch
 from savu.plugins.savers.utils.hdf5_utils import Hdf5Utils
 import savu.plugins.loaders.utils.yaml_utils as yaml
 
@@ -54,6 +55,7 @@ class Experiment(object):
         self._transport = None
         self._barrier_count = 0
         self._dataset_names_complete = False
+        self.nxs_batch = None
 
     def get(self, entry):
         """ Get the meta data dictionary. """
@@ -108,6 +110,7 @@ class Experiment(object):
             # links the input data to the nexus file
             plugin_list._save_plugin_list(self.meta_data.get('nxs_filename'))
             self._add_input_data_to_nxs_file(self._get_transport())
+            self._write_nxs_batch()
         self._set_dataset_names_complete()
         self._save_command_log()
 
@@ -261,6 +264,26 @@ class Experiment(object):
                     log_folder.write(os.path.abspath(filename) + '\n')
 
         self._create_nxs_entry()
+        if self.meta_data.get_dictionary().get('nexus_batch'):
+            self.nxs_batch = NexusBatch(filename)
+
+    def _open_nxs_file(self):
+        """ Open the NeXus file to add entries, or the in-memory batch of
+        entries if they are written at the end of each plugin. """
+        if self.nxs_batch:
+            return self.nxs_batch.open()
+        return h5py.File(self.meta_data.get('nxs_filename'), 'a')
+
+    def _write_nxs_batch(self):
+        """ Start writing the batch of NeXus entries in the background (single
+        writer process only). """
+        if self.nxs_batch:
+            self.nxs_batch.write()
+
+    def _join_nxs_batch(self):
+        """ Wait for the batch of NeXus entries to be written. """
+        if self.nxs_batch:
+            self.nxs_batch.join()
 
     def _create_nxs_entry(self):  # what if the file already exists?!
         logging.debug("Testing nexus file")
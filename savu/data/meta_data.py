@@ -25,18 +25,61 @@
 
 import copy
 import logging
+import numpy as np
 from collections import OrderedDict
 
 
+def _share(value):
+    """ Copy the dictionaries and lists in a meta data entry, sharing any
+    arrays, so the array data is not copied. """
+    if isinstance(value, np.ndarray):
+        return value
+    if isinstance(value, dict):
+        return type(value)((k, _share(v)) for k, v in value.items())
+    if type(value) in (list, tuple):
+        return type(value)(_share(v) for v in value)
+    if isinstance(value, (str, bytes, int, float, complex, bool, type(None),
+                          np.generic)):
+        return value
+    return copy.deepcopy(value)
+
+
 class MetaData(object):
     """
     The MetaData class creates a dictionary of all meta data which can be \
     accessed using the get and set methods. It also holds an instance of \
     PluginList.
+
+    Meta data dictionaries are shared between datasets (see
+    :meth:`_set_dictionary` and :meth:`__deepcopy__`) and each entry is
+    copied when it is first set.  Entries that are dictionaries or lists are
+    also copied when they are first read, as they are often updated in
+    place.  Only the dictionaries and lists in an entry are copied: arrays
+    are shared and should be replaced, using :meth:`set`, rather than
+    updated in place.
     """
 
     def __init__(self, options={}, ordered=False):
         self.dict = OrderedDict(options) if ordered else options.copy()
+        self._shared = set()
+
+    def __deepcopy__(self, memo):
+        new = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new
+        for key, value in self.__dict__.items():
+            if key not in ['dict', '_shared']:
+                setattr(new, key, copy.deepcopy(value, memo))
+        new._set_dictionary(self._get_shared_dictionary())
+        return new
+
+    def __own(self, key, write=True):
+        """ Copy a shared entry before it is set, or before a dictionary or
+        list entry is read. """
+        if key in self._shared and key in self.dict:
+            value = self.dict[key]
+            if write or isinstance(value, (dict, list)):
+                self._shared.discard(key)
+                self.dict[key] = _share(value)
 
     def set(self, name, value):
         """ Create and set an entry in the meta data dictionary.
@@ -54,6 +97,11 @@ class MetaData(object):
             {'name1': {'name2': 3}}
         """
         maplist = name if isinstance(name, list) else [name]
+        if len(maplist) == 1:
+            self._shared.discard(maplist[0])
+            self.dict[maplist[0]] = value
+            return
+        self.__own(maplist[0])
         self.get(maplist[:-1], True)[maplist[-1]] = value
 
     def get(self, maplist, setFlag=False, value=True, units=False):
@@ -68,10 +116,11 @@ class MetaData(object):
         keys in a list.
         """
         if not maplist:
-            return self.dict
+            return self.get_dictionary()
 
         function = lambda k, d: d[k]
         maplist = (maplist if type(maplist) is list else [maplist])
+        self.__own(maplist[0], write=setFlag)
         it = iter(maplist)
         accum_value = self.dict
         for x in it:
@@ -100,23 +149,34 @@ class MetaData(object):
 
         :param str entry: The dictionary key entry to delete.
         """
+        self._shared.discard(entry)
         try:
-            del self.get_dictionary()[entry]
+            del self.dict[entry]
         except KeyError:
             logging.warning("Trying to delete a dictionary entry that doesn't "
                          "exist.")
 
     def get_dictionary(self):
-        """ Get the meta_data dictionary.
+        """ Get the meta_data dictionary.  Its entries may be shared with
+        other datasets, so use :meth:`set` to change them.
 
         :returns: A dictionary.
         :rtype: dict
         """
         return self.dict
 
+    def _get_shared_dictionary(self):
+        """ Get a copy of the meta data dictionary that shares its entries.
+        The entries are copied on write by both this and the new owner. """
+        self._shared = set(self.dict.keys())
+        return self.dict.copy()
+
     def _set_dictionary(self, ddict):
-        """ Set the meta data dictionary """
-        self.dict = copy.deepcopy(ddict)
+        """ Set the meta data dictionary, which shares its entries with
+        ``ddict``. """
+        self.dict = ddict.copy()
+        self._shared = set(self.dict.keys())
 
     def __getitem__(self, key):
+        self.__own(key, write=False)
         return self.dict[key]
\ No newline at end of file
@@ -16,7 +16,8 @@
 .. module:: projection_shift
    :platform: Unix
    :synopsis: Calculate horizontal and vertical shifts in the projection\
-       images over time, using template matching.
+       images over time, using phase correlation, template matching or \
+       feature matching.
 
 .. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
 
@@ -42,10 +43,10 @@ class ProjectionShift(BaseFilter, CpuPlugin):
     def __init__(self):
         logging.debug("initialising Sinogram Alignment")
         super(ProjectionShift, self).__init__("ProjectionShift")
-        self.template = None
         self.threshold = 0
 
     def pre_process(self):
+        self.template_params = None
         if self.parameters['method'] == 'template_matching':
             self.template_params = []
             for p in self.parameters['template']:
@@ -58,8 +59,6 @@ class ProjectionShift(BaseFilter, CpuPlugin):
         if self.parameters['threshold']:
             self.threshold = self.parameters['threshold']
 
-        self.sl = [slice(None)]*3
-        self.sl2 = [slice(None)]*3
         self.slice_dir = self.get_plugin_in_datasets()[0].get_slice_dimension()
         self.A = self._calculate_frame_matrix()
 
@@ -74,34 +73,58 @@ class ProjectionShift(BaseFilter, CpuPlugin):
         return A
 
     def process_frames(self, data):
-        data, nFrames, output, shift_array = self._initial_setup(data)
-        return self._sub_pixel_shift_adjustment(data)
-
-    def _initial_setup(self, data):
-        data = data[0]
-        shape = list(data.shape)
-        nFrames = data.shape[self.slice_dir]-2
-        shape[self.slice_dir] += -2
-        output = np.zeros(tuple(shape))
-        shift_array = np.zeros((nFrames, 2))
-        return data, nFrames, output, shift_array
-
-    def _get_shift(self, data, frame1, frame2):
-        self.sl[self.slice_dir] = frame1
-        self.sl2[self.slice_dir] = frame2
-
-        d1 = data[self.sl]
-        d2 = data[self.sl2]
-        if self.template:
-            self.template = data[self.sl][self.template_params]
-
+        frames = np.moveaxis(data[0], self.slice_dir, 0)
         if self.threshold:
-            d1[d1 > self.threshold[0]] = self.threshold[1]
-            d2[d2 > self.threshold[0]] = self.threshold[1]
-            if self.template:
-                self.template[self.template > self.threshold[0]] = \
-                    self.threshold[1]
-        return self._calculate_shift(d1, d2, self.template)
+            frames = np.where(frames > self.threshold[0], self.threshold[1],
+                              frames)
+        return self._sub_pixel_shift_adjustment(frames)
+
+    def _get_shift(self, frames, frame1, frame2):
+        template = frames[frame1][tuple(self.template_params)] \
+            if self.template_params else None
+        return self._calculate_shift(frames[frame1], frames[frame2], template)
+
+    def _phase_correlation_shifts(self, frames, pairs):
+        """ The shifts between pairs of frames, by phase correlation with
+        sub-pixel refinement.  The Fourier transform of each frame is
+        calculated once and all pairs are correlated together.
+
+        :param ndarray frames: The frames, stacked along the first axis.
+        :param ndarray pairs: An (n, 2) array of frame indices.
+        :returns: An (n, 2) array of the shift of the second frame of each
+            pair relative to the first.
+        """
+        frames = np.asarray(frames, dtype=np.float64)
+        frames = frames - frames.mean(axis=(1, 2), keepdims=True)
+        # taper the edges, which are not periodic
+        window = np.outer(np.hanning(frames.shape[1]),
+                          np.hanning(frames.shape[2]))
+        ft = np.fft.fft2(frames*window)
+        cross = ft[pairs[:, 1]]*np.conj(ft[pairs[:, 0]])
+        cross /= np.maximum(np.abs(cross), np.finfo(np.float64).tiny)
+        corr = np.fft.ifft2(cross).real
+
+        n = len(pairs)
+        peaks = np.array(np.unravel_index(
+            np.argmax(corr.reshape(n, -1), axis=1), corr.shape[1:])).T
+        shifts = peaks.astype(np.float64)
+        idx = np.arange(n)
+        for axis in range(2):
+            # fit a parabola through the peak and its neighbours
+            size = corr.shape[axis + 1]
+            before, after = peaks.copy(), peaks.copy()
+            before[:, axis] = (peaks[:, axis] - 1) % size
+            after[:, axis] = (peaks[:, axis] + 1) % size
+            c = corr[idx, peaks[:, 0], peaks[:, 1]]
+            b = corr[idx, before[:, 0], before[:, 1]]
+            a = corr[idx, after[:, 0], after[:, 1]]
+            denom = b - 2*c + a
+            with np.errstate(invalid='ignore', divide='ignore'):
+                offset = np.where(denom < 0, 0.5*(b - a)/denom, 0)
+            shifts[:, axis] += offset
+            # shifts greater than half the frame size are negative
+            shifts[:, axis] = (shifts[:, axis] + size/2.) % size - size/2.
+        return shifts
 
     def _orb_ransac_shift(self, im1, im2, template):
         descriptor_extractor = ORB() #n_keypoints=self.parameters['n_keypoints'])
@@ -139,16 +162,17 @@ class ProjectionShift(BaseFilter, CpuPlugin):
         shift = index[1] - index[0]
         return shift
 
-    def _sub_pixel_shift_adjustment(self, data):
-        frame_list = \
-            self._calculate_frame_list(np.arange(data.shape[self.slice_dir]))
+    def _sub_pixel_shift_adjustment(self, frames):
+        frame_list = self._calculate_frame_list(np.arange(len(frames)))
+        pairs = np.array([(f[0], f[-1]) for f in frame_list])
 
-        new_shift = []
-        for f in frame_list:
-            new_shift.append(
-                self._get_shift(data, f[0], f[-1]).astype(np.float64))
+        if self.parameters['method'] == 'phase_correlation':
+            new_shift = self._phase_correlation_shifts(frames, pairs)
+        else:
+            new_shift = np.array([self._get_shift(frames, *p)
+                                  for p in pairs], dtype=np.float64)
 
-        return self._calculate_new_shift_array(np.array(new_shift))
+        return self._calculate_new_shift_array(new_shift)
 
     def _calculate_frame_list(self, frames):
         sixes = list(zip(*(frames[i:] for i in range(6))))
@@ -158,10 +182,7 @@ class ProjectionShift(BaseFilter, CpuPlugin):
         return sixes + fives + fours + threes
 
     def _calculate_new_shift_array(self, shift):
-        new_shift = []
-        for i in range(2):
-            new_shift.append(lstsq(self.A, shift[:, i])[0])
-        return np.transpose(np.array(new_shift))[1:-1]
+        return lstsq(self.A, shift)[0][1:-1]
 
     def post_process(self):
         out_data = self.get_out_datasets()[0]
@@ -182,20 +203,18 @@ class ProjectionShift(BaseFilter, CpuPlugin):
         in_dataset, out_dataset = self.get_datasets()
 
         in_pData, out_pData = self.get_plugin_datasets()
-        in_pData[0].plugin_data_setup('PROJECTION', self.get_max_frames(),
-                                      fixed=True)
+        in_pData[0].plugin_data_setup('PROJECTION', self.get_max_frames())
 
         new_shape = (in_dataset[0].get_shape()[
-            in_dataset[0].get_slice_directions()[0]], 2)
+            in_dataset[0].get_slice_dimensions()[0]], 2)
 
         out_dataset[0].create_dataset(shape=new_shape,
                                       axis_labels=['x.pixels', 'y.pixels'],
                                       remove=True)
         out_dataset[0].add_pattern("METADATA", core_dims=(1,), slice_dims=(0,))
-        out_pData[0].plugin_data_setup('METADATA', self.get_max_frames(),
-                                       fixed=True)
+        out_pData[0].plugin_data_setup('METADATA', self.get_max_frames())
 
     def set_filter_padding(self, in_data, out_data):
-        pad_dim = in_data[0].get_slice_directions()[0]
+        pad_dim = in_data[0].data_obj.get_slice_dimensions()[0]
         in_data[0].padding = {'pad_directions': [str(pad_dim) + '.1']}
         #in_data[0].padding = {'pad_directions': [str(pad_dim) + '.before.1']}
@@ -6,11 +6,13 @@ class ProjectionShiftTools(PluginTools):
     using the ProjectionVerticalAlignment and SinogramAlignment (in 'shift'
     mode) plugins respectively.
 
-    Method: Uses either skimage template_matching or orb feature tracking plus
-    robust ransac matching to calculate the translation between different
-    combinations of 10 consecutive projection images. A least squares solution
-    to the shift values between images is calculated and returned for the
-    middle 8 images.
+    Method: Uses phase correlation, skimage template_matching or orb feature
+    tracking plus robust ransac matching to calculate the translation between
+    different combinations of 10 consecutive projection images. A least
+    squares solution to the shift values between images is calculated and
+    returned for the middle 8 images.  Phase correlation registers all the
+    image pairs together, with sub-pixel precision, and is much faster than
+    the other methods.
     """
 
     def define_parameters(self):
@@ -19,9 +21,11 @@ class ProjectionShiftTools(PluginTools):
               visibility: intermediate
               dtype: str
               description: Method used to calculate the shift between images.
-              default: orb_ransac
-              options: [template_matching,orb_ransac]        
+              default: phase_correlation
+              options: [phase_correlation,template_matching,orb_ransac]
         template:
+              dependency:
+                  method: template_matching
               visibility: basic
               dtype: [list[str],None]
               description: 'Position of the template to match (required)
@@ -47,5 +51,6 @@ class ProjectionShiftTools(PluginTools):
         """
 
     def config_warn(self):
-        """The template parameter is required and must not be None.
+        """The template parameter is required for the template_matching
+        method and must not be None.
         """
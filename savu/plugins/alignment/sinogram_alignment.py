@@ -23,8 +23,6 @@
 """
 
 import logging
-from scipy import ndimage
-from scipy.optimize import curve_fit
 import numpy as np
 
 from savu.plugins.utils import register_plugin
@@ -47,61 +45,57 @@ class SinogramAlignment(BaseFilter, CpuPlugin):
                 'proj_align_shift')[:, 1]
         self.com_x = \
             self.get_in_datasets()[0].meta_data.get('rotation_angle')
-        data = self.get_in_datasets()[0]
-        self.sl = [slice(None)]*len(data.get_shape())
         self.slice_dir = self.get_plugin_in_datasets()[0].get_slice_dimension()
 
     def process_frames(self, data):
-        """
-        Should be overloaded by filter classes extending this one
-
-        :param data: The data to filter
-        :type data: ndarray
-        :returns:  The filtered image
-        """
-        nFrames = data[0].shape[self.slice_dir]
-        result = np.empty_like(data[0])
-        for i in range(nFrames):
-            self.sl[self.slice_dir] = i
-            sino = data[0][tuple(self.sl)]
-            if self.parameters['threshold']:
-                a, b = self.parameters['threshold'].split('.')
-                sino[sino > a] = b
-            com_y = self.com_y if self.com_y is not None else self._com_y(sino)
-            shifted = self._shift(sino, self.com_x, com_y)
-            result[tuple(self.sl)] = shifted.reshape(
-                shifted.shape[0], shifted.shape[1])
-        return result
-
-    def _sinfunc(self, data, a, b, c):
-        return (a*np.sin(np.deg2rad(data-b)))+c
-
-    def _shift(self, sinogram, com_x, com_y):
-        fitpars, covmat = \
-            curve_fit(self._sinfunc, com_x, com_y, p0=tuple(self.parameters['p0']))
-        variances = covmat.diagonal()
-        #std_devs = np.sqrt(variances)
-        #residual = com_y - self._sinfunc(com_x, *fitpars)
-        residual = self._sinfunc(com_x, *fitpars) - com_y
-        centre_of_rotation_shift = residual
-        np.array_split(sinogram, sinogram.shape[0], axis=0)
-        n = 0
-        shifted_sinogram = []
-        for row in sinogram:
-            shifted_sinogram_row = \
-                ndimage.interpolation.shift(row, [centre_of_rotation_shift[n]],
-                                            mode='nearest')
-            shifted_sinogram.append(shifted_sinogram_row)
-            n += 1
-            output = np.vstack(shifted_sinogram)
-        return output
-
-    def _com_y(self, sinogram):
-        com_y = []
-        for row in sinogram:
-            com = ndimage.measurements.center_of_mass(row)
-            com_y.append(com[0])
-        return com_y
+        """ Align the rows of all the sinograms in the block at once. """
+        squeeze = data[0].ndim == 2
+        # (frames, rows, columns)
+        sinos = data[0][np.newaxis] if squeeze else \
+            np.moveaxis(data[0], self.slice_dir, 0)
+        if self.parameters['threshold']:
+            a, b = self.parameters['threshold'].split('.')
+            sinos = np.where(sinos > float(a), float(b), sinos)
+        com_y = self._com_y(sinos) if self.com_y is None else \
+            np.tile(self.com_y, (len(sinos), 1))
+        shifted = self._shift(sinos, self._fit(self.com_x, com_y))
+        shifted = shifted.astype(data[0].dtype, copy=False)
+        return shifted[0] if squeeze else \
+            np.moveaxis(shifted, 0, self.slice_dir)
+
+    def _fit(self, com_x, com_y):
+        """ Fit a sine function, a*sin(x - b) + c, through the centres of mass
+        of each sinogram and return the residuals.  The fit is linear in
+        p*sin(x) + q*cos(x) + c, so all the sinograms are solved together by
+        least squares. """
+        x = np.deg2rad(np.asarray(com_x, dtype=np.float64))
+        design = np.stack([np.sin(x), np.cos(x), np.ones_like(x)], axis=1)
+        com_y = np.asarray(com_y, dtype=np.float64)
+        coeffs = np.linalg.lstsq(design, com_y.T, rcond=None)[0]
+        return np.dot(design, coeffs).T - com_y
+
+    def _shift(self, sinograms, shifts):
+        """ Shift each row of each sinogram by a sub-pixel amount, in the
+        Fourier domain.  The rows are padded with their edge values so the
+        shift does not wrap around. """
+        pad = int(np.ceil(np.nanmax(np.abs(shifts)))) + 1 \
+            if np.isfinite(shifts).any() else 1
+        shifts = np.nan_to_num(shifts)
+        padded = np.pad(sinograms.astype(np.float64),
+                        ((0, 0), (0, 0), (pad, pad)), mode='edge')
+        n = padded.shape[-1]
+        freq = np.fft.rfftfreq(n)
+        phase = np.exp(-2j*np.pi*freq*shifts[..., np.newaxis])
+        shifted = np.fft.irfft(np.fft.rfft(padded, axis=-1)*phase, n=n,
+                               axis=-1)
+        return shifted[..., pad:n-pad]
+
+    def _com_y(self, sinograms):
+        """ The centre of mass of each row of each sinogram. """
+        sinograms = sinograms.astype(np.float64)
+        idx = np.arange(sinograms.shape[-1])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.dot(sinograms, idx)/sinograms.sum(axis=-1)
 
     def get_plugin_pattern(self):
         return 'SINOGRAM'
@@ -15,10 +15,10 @@ class SinogramAlignmentTools(PluginTools):
               description: e.g. a.b will set all values above a to b.
               default: None
         p0:
-              visibility: basic
+              visibility: hidden
               dtype: list[float,float,float]
-              description: Initial guess for the parameters of
-                scipy.optimize.curve_fit.
+              description: Not used. The sine function is fitted directly by
+                linear least squares, which needs no initial guess.
               default: [1, 1, 1]
         type:
               visibility: intermediate
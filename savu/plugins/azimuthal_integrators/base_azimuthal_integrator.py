@@ -136,8 +136,8 @@ class BaseAzimuthalIntegrator(Plugin, CpuPlugin):
 
         # ================== populate plugin datasets =========================
         in_pData, out_pData = self.get_plugin_datasets()
-        in_pData[0].plugin_data_setup('DIFFRACTION', 'single')
-        out_pData[0].plugin_data_setup('SPECTRUM', 'single')
+        in_pData[0].plugin_data_setup('DIFFRACTION', self.get_max_frames())
+        out_pData[0].plugin_data_setup('SPECTRUM', self.get_max_frames())
         # =====================================================================
 
     def get_max_frames(self):
@@ -0,0 +1,136 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: sparse_azimuthal_integrator
+   :platform: Unix
+   :synopsis: A plugin to integrate azimuthally "symmetric" signals i.e. SAXS,\
+       WAXS or XRD, using a precomputed sparse pixel-to-bin matrix.
+
+.. moduleauthor:: Aaron D. Parsons <scientificsoftware@diamond.ac.uk>
+"""
+
+import os
+import hashlib
+import logging
+
+import numpy as np
+import scipy.sparse as sp
+
+from savu.plugins.azimuthal_integrators.base_azimuthal_integrator import \
+    BaseAzimuthalIntegrator
+from savu.plugins.utils import register_plugin
+
+
+@register_plugin
+class SparseAzimuthalIntegrator(BaseAzimuthalIntegrator):
+
+    def __init__(self):
+        logging.debug("Starting 1D sparse azimuthal integration")
+        super(SparseAzimuthalIntegrator,
+              self).__init__("SparseAzimuthalIntegrator")
+        self.integrator = None
+
+    def pre_process(self):
+        super(SparseAzimuthalIntegrator, self).pre_process()
+        mask, npts, mData, ai = self.params
+        self.det_shape = mask.shape
+
+        key = self._get_geometry_hash(ai, mask)
+        cache_file = os.path.join(self._get_cache_dir(),
+                                  'azimuthal_integrator_%s.npz' % key)
+        if os.path.exists(cache_file):
+            logging.debug("Loading integration matrix from %s", cache_file)
+            self.integrator = sp.load_npz(cache_file).tocsr()
+        else:
+            self.integrator = self._build_integrator(ai, mask, mData.get('Q'))
+            self._save_integrator(cache_file)
+
+        self.in_slice_dir = \
+            self.get_plugin_in_datasets()[0].get_slice_dimension()
+        self.out_slice_dir = \
+            self.get_plugin_out_datasets()[0].get_slice_dimension()
+
+    def process_frames(self, data):
+        logging.debug('datashape=%s' % str(data[0].shape))
+        frames = np.moveaxis(data[0], self.in_slice_dir, 0)
+        frames = frames.reshape(frames.shape[0], -1).T
+        # one sparse-dense product integrates every frame in the block
+        remapped = self.integrator.dot(frames.astype(np.float32)).T
+        return np.moveaxis(remapped, 0, self.out_slice_dir)
+
+    def _build_integrator(self, ai, mask, q_axis):
+        """ Create a CSR matrix of shape (num_bins, n_pixels) that maps
+        detector pixels onto the q bins of ``q_axis``.  The mask, solid angle
+        and polarisation corrections are folded into the matrix weights so
+        that each row returns the normalised bin average. """
+        shape = mask.shape
+        q = ai.array_from_unit(shape=shape, typ='center',
+                               unit='q_A^-1').ravel()
+        edges = np.empty(len(q_axis) + 1)
+        edges[1:-1] = 0.5*(q_axis[1:] + q_axis[:-1])
+        edges[0] = q_axis[0] - 0.5*(q_axis[1] - q_axis[0])
+        edges[-1] = q_axis[-1] + 0.5*(q_axis[-1] - q_axis[-2])
+
+        bins = np.digitize(q, edges) - 1
+        valid = (bins >= 0) & (bins < len(q_axis)) & \
+            (np.asarray(mask).ravel() == 0)
+
+        norm = np.ones(q.size)
+        if self.parameters['solid_angle']:
+            norm *= ai.solidAngleArray(shape).ravel()
+        if self.parameters['polarisation_factor'] is not None:
+            norm *= ai.polarization(
+                shape, self.parameters['polarisation_factor']).ravel()
+
+        pixels = np.flatnonzero(valid)
+        bins = bins[pixels]
+        denom = np.bincount(bins, weights=norm[pixels],
+                            minlength=len(q_axis))
+        weights = 1.0/denom[bins]
+        matrix = sp.csr_matrix((weights.astype(np.float32), (bins, pixels)),
+                               shape=(len(q_axis), q.size))
+        logging.debug("Built integration matrix with %d non-zeros",
+                      matrix.nnz)
+        return matrix
+
+    def _save_integrator(self, cache_file):
+        if self.exp.meta_data.get('process') != 0:
+            return
+        try:
+            tmp_file = cache_file + '.%d.tmp' % os.getpid()
+            with open(tmp_file, 'wb') as f:
+                sp.save_npz(f, self.integrator)
+            os.rename(tmp_file, cache_file)
+        except (IOError, OSError) as e:
+            logging.warning("Unable to cache the integration matrix: %s", e)
+
+    def _get_cache_dir(self):
+        cache_dir = self.parameters['cache_dir']
+        if cache_dir is None:
+            cache_dir = self.exp.meta_data.get('out_path')
+        return cache_dir
+
+    def _get_geometry_hash(self, ai, mask):
+        """ A hash of everything that determines the integration matrix. """
+        geometry = [ai.dist, ai.poni1, ai.poni2, ai.rot1, ai.rot2, ai.rot3,
+                    ai.pixel1, ai.pixel2, ai.wavelength, self.npts,
+                    self.parameters['solid_angle'],
+                    self.parameters['polarisation_factor'], mask.shape]
+        md5 = hashlib.md5(repr(geometry).encode('ascii'))
+        md5.update(np.ascontiguousarray(mask).tobytes())
+        return md5.hexdigest()
+
+    def get_max_frames(self):
+        return 'multiple'
@@ -0,0 +1,31 @@
+from savu.plugins.plugin_tools import PluginTools
+
+class SparseAzimuthalIntegratorTools(PluginTools):
+    """1D azimuthal integrator that precomputes a sparse matrix mapping
+    detector pixels to q bins once per geometry, and integrates a block of
+    frames with a single sparse matrix multiplication.
+    """
+    def define_parameters(self):
+        """
+        solid_angle:
+            visibility: intermediate
+            dtype: bool
+            description: Apply the solid angle correction.
+            default: False
+
+        polarisation_factor:
+            visibility: intermediate
+            dtype: [None,float]
+            description: Polarisation factor between -1 and 1 to correct
+              for. Set to None to skip the polarisation correction.
+            default: None
+
+        cache_dir:
+            visibility: advanced
+            dtype: [None,dir]
+            description: Directory used to cache the integration matrix,
+              keyed by a hash of the geometry. Set to None to use the
+              output folder of the current run.
+            default: None
+
+        """
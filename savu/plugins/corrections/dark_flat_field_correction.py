@@ -47,32 +47,35 @@ class DarkFlatFieldCorrection(BaseCorrection, CpuPlugin):
         logging.debug('getting the flat data')
         self.flat = inData.data.flat_mean()
 
-        pData_shape = in_pData.get_shape()
-        tile = [1] * len(pData_shape)
+        self.flat_minus_dark = self.flat - self.dark
+        self.flat_minus_dark[self.flat_minus_dark == 0.0] = 1.0
+        # multiplying by the reciprocal is cheaper than dividing every block
+        self.inv_flat_minus_dark = \
+            (1.0 / self.flat_minus_dark).astype(self.flat_minus_dark.dtype)
+
         rot_dim = inData.get_data_dimension_by_axis_label('rotation_angle')
         self.slice_dir = in_pData.get_slice_dimension()
 
         if self.parameters['pattern'] == 'PROJECTION':
-            self._proj_pre_process(inData, pData_shape, tile, rot_dim)
+            self._proj_pre_process(rot_dim)
         elif self.parameters['pattern'] == 'SINOGRAM':
-            self._sino_pre_process(inData, tile, rot_dim)
+            self._sino_pre_process(inData, rot_dim)
 
-        self.flat_minus_dark = self.flat - self.dark
-        self.flat_minus_dark[self.flat_minus_dark == 0.0] = 1.0
         self.warn = self.parameters['warn_proportion']
         self.low = self.parameters['lower_bound']
         self.high = self.parameters['upper_bound']
         self.in_pData = in_pData
 
-    def _proj_pre_process(self, data, shape, tile, dim):
-        tile[dim] = shape[dim]
-        self.convert_size = lambda x: np.tile(x, tile)
+    def _proj_pre_process(self, dim):
+        # zero-stride views, broadcast across all frames in a block
+        self.dark_block = np.expand_dims(self.dark, dim)
+        self.scale_block = np.expand_dims(self.inv_flat_minus_dark, dim)
         self.process_frames = self.correct_proj
 
-    def _sino_pre_process(self, data, tile, dim):
+    def _sino_pre_process(self, data, dim):
         pData = data._get_plugin_data()
         full_shape = data.get_shape()
-        tile[dim] = full_shape[dim]
+        self.rot_dim = dim
         self.process_frames = self.correct_sino
         self.n_plugin_frames = pData.get_shape()[self.slice_dir]
 
@@ -80,48 +83,38 @@ class DarkFlatFieldCorrection(BaseCorrection, CpuPlugin):
         self.mfp = pData._get_max_frames_process()
         self.reps_at = int(np.ceil(self.length / float(self.mfp)))
 
-        if len(full_shape) == 3:
-            self.convert_size = lambda a, b, x, pad: np.pad(
-                np.tile(x[a:b], tile), pad, 'edge')
-        else:
-            nSino = \
-                full_shape[data.get_data_dimension_by_axis_label('detector_y')]
-            self.convert_size = \
-                lambda a, b, x, pad: np.pad(
-                    np.tile(x[a % nSino:b], tile), pad, 'edge')
+        # pad once so that the final (padded) block is a simple view
+        pad = [[0, 0] for i in range(self.dark.ndim)]
+        pad[0][1] = max(self.reps_at*self.mfp - self.length, 0)
+        self.dark_rows = np.pad(self.dark, pad, 'edge')
+        self.scale_rows = np.pad(self.inv_flat_minus_dark, pad, 'edge')
 
     def correct_proj(self, data):
-        data = data[0]
-        dark = self.convert_size(self.dark)
-        flat_minus_dark = self.convert_size(self.flat_minus_dark)
-        data = np.nan_to_num((data - dark) / flat_minus_dark)
-        self.__data_check(data)
-        return data
+        return self._correct(data[0], self.dark_block, self.scale_block)
 
     def correct_sino(self, data):
-        data = data[0]
         sl = self.get_current_slice_list()[0][self.slice_dir]
         count = self.get_process_frames_counter()
         current_idx = self.get_global_frame_index()[count]
 
         start = (current_idx % self.reps_at) * self.mfp
-        end = start + len(np.arange(sl.start, sl.stop, sl.step))
-        pad = self._get_pad_amount(end)
-
-        dark = self.convert_size(start, end, self.dark, pad)
-        flat_minus_dark = \
-            self.convert_size(start, end, self.flat_minus_dark, pad)
-
-        data = np.nan_to_num((data - dark) / flat_minus_dark)
+        end = start + len(range(sl.start, sl.stop, sl.step))
+        dark = np.expand_dims(self.dark_rows[start:end], self.rot_dim)
+        scale = np.expand_dims(self.scale_rows[start:end], self.rot_dim)
+        return self._correct(data[0], dark, scale)
+
+    def _correct(self, data, dark, scale):
+        """ Apply (data - dark) / (flat - dark), the nan handling and the
+        clipping in place, reusing the input buffer where possible. """
+        if data.dtype.kind == 'f' and data.flags.writeable:
+            data = np.subtract(data, dark, out=data)
+        else:
+            data = np.subtract(data, dark, dtype=np.float32)
+        np.multiply(data, scale, out=data)
+        np.nan_to_num(data, copy=False)
         self.__data_check(data)
         return data
 
-    def _get_pad_amount(self, end):
-        pad = [[0, 0] for i in range(3)]
-        if end > self.length:
-            pad[self.slice_dir][1] = end - self.length
-        return pad
-
     def fixed_flag(self):
         return self.parameters['pattern'] == 'PROJECTION'
 
@@ -132,17 +125,17 @@ class DarkFlatFieldCorrection(BaseCorrection, CpuPlugin):
             return
 
         if self.low:
-            low_crop = data < self.parameters['lower_bound']
-            if ((float(low_crop.sum()) / low_crop.size) > self.warn):
+            n_low = np.count_nonzero(data < self.low)
+            if ((float(n_low) / data.size) > self.warn):
                 self.flag_low_warning = True
             # Set all cropped values to the crop level
-            data[low_crop] = self.parameters['lower_bound']
+            np.maximum(data, self.low, out=data)
         if self.high:
-            high_crop = data > self.parameters['upper_bound']
-            if ((float(high_crop.sum()) / high_crop.size) > self.warn):
+            n_high = np.count_nonzero(data > self.high)
+            if ((float(n_high) / data.size) > self.warn):
                 self.flag_high_warning = True
             # Set all cropped values to the crop level
-            data[high_crop] = self.parameters['upper_bound']
+            np.minimum(data, self.high, out=data)
 
     def executive_summary(self):
         summary = []
@@ -25,8 +25,7 @@
 import os
 import logging
 import numpy as np
-from scipy.ndimage import map_coordinates
-from scipy import interpolate
+from scipy import sparse
 
 from savu.plugins.filters.base_filter import BaseFilter
 from savu.plugins.driver.cpu_plugin import CpuPlugin
@@ -74,7 +73,7 @@ class DistortionCorrection(BaseFilter, CpuPlugin):
     def setup(self):
         in_dataset, out_dataset = self.get_datasets()
         in_pData, out_pData = self.get_plugin_datasets()
-        in_pData[0].plugin_data_setup('PROJECTION', 'single')
+        in_pData[0].plugin_data_setup('PROJECTION', 'multiple')
         self.shape = list(in_dataset[0].get_shape())
         self.core_dims = in_pData[0].meta_data.get('core_dims')
         self.crop = self.parameters['crop_edges']
@@ -83,7 +82,7 @@ class DistortionCorrection(BaseFilter, CpuPlugin):
         out_dataset[0].create_dataset(patterns=in_dataset[0],
                                       axis_labels=in_dataset[0],
                                       shape=tuple(self.shape))
-        out_pData[0].plugin_data_setup('PROJECTION', 'single')
+        out_pData[0].plugin_data_setup('PROJECTION', 'multiple')
 
     def pre_process(self):
         in_pData = self.get_plugin_in_datasets()[0]
@@ -161,15 +160,48 @@ class DistortionCorrection(BaseFilter, CpuPlugin):
             cu.user_message(self.msg)
 
             raise ValueError(self.msg)
-        self.indices = np.reshape(yd_mat, (-1, 1)), \
-                       np.reshape(xd_mat, (-1, 1))
+        # only the pixels that remain after cropping are interpolated
+        crop = (slice(self.crop, self.height - self.crop),
+                slice(self.crop, self.width - self.crop))
+        self.out_shape = yd_mat[crop].shape
+        self.operator = self._get_bilinear_operator(
+            yd_mat[crop], xd_mat[crop], self.height, self.width)
+        self.dims = [in_pData.get_slice_dimension(),
+                     in_pData.get_data_dimension_by_axis_label('detector_y'),
+                     in_pData.get_data_dimension_by_axis_label('detector_x')]
+
+    def _get_bilinear_operator(self, yd_mat, xd_mat, height, width):
+        """ A sparse matrix that applies bilinear interpolation at the
+        (distorted) coordinates to a flattened frame, equivalent to
+        map_coordinates with order=1.  Each row has the four weights of the
+        neighbouring pixels. """
+        yd, xd = yd_mat.ravel().astype(np.float64), \
+            xd_mat.ravel().astype(np.float64)
+        # the coordinates are inside the frame, so the far neighbour of a
+        # coordinate on the last row/column only needs a weight of zero
+        y0 = np.clip(np.floor(yd).astype(np.intp), 0, max(height - 2, 0))
+        x0 = np.clip(np.floor(xd).astype(np.intp), 0, max(width - 2, 0))
+        y1 = np.minimum(y0 + 1, height - 1)
+        x1 = np.minimum(x0 + 1, width - 1)
+        wy, wx = yd - y0, xd - x0
+        rows = np.repeat(np.arange(yd.size), 4)
+        cols = np.stack([y0*width + x0, y0*width + x1, y1*width + x0,
+                         y1*width + x1], axis=1).ravel()
+        weights = np.stack([(1 - wy)*(1 - wx), (1 - wy)*wx, wy*(1 - wx),
+                            wy*wx], axis=1).ravel()
+        return sparse.csr_matrix((weights, (rows, cols)),
+                                 shape=(yd.size, height*width))
 
     def process_frames(self, data):
-        mat_corrected = np.reshape(map_coordinates(
-            data[0], self.indices, order=1, mode='reflect'),
-            (self.height, self.width))
-        return mat_corrected[self.crop:self.height - self.crop,
-               self.crop:self.width - self.crop]
+        """ Correct all the frames in the block with a single sparse matrix
+        product. """
+        # (frames, detector_y, detector_x)
+        frames = np.transpose(data[0], self.dims)
+        n = frames.shape[0]
+        corrected = self.operator.dot(frames.reshape(n, -1).T).T
+        corrected = corrected.reshape((n,) + self.out_shape)
+        return np.transpose(corrected.astype(data[0].dtype, copy=False),
+                            np.argsort(self.dims))
 
     def executive_summary(self):
         if self.msg != "":
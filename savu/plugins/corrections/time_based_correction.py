@@ -37,15 +37,9 @@ class TimeBasedCorrection(BaseCorrection, CpuPlugin):
         super(TimeBasedCorrection, self).__init__(name)
 
     def pre_process(self):
-        self.count = 0
         inData = self.get_in_datasets()[0]
         pData = self.get_plugin_in_datasets()[0]
-        self.mfp = inData._get_plugin_data()._get_max_frames_process()
-        self.proj_dim = \
-            inData.get_data_dimension_by_axis_label('rotation_angle')
         self.slice_dir = pData.get_slice_dimension()
-        nDims = len(pData.get_shape())
-        self.sslice = [slice(None)]*nDims
 
         self.image_key = inData.data.get_image_key()
         changes = np.where(np.diff(self.image_key) != 0)[0] + 1
@@ -59,6 +53,13 @@ class TimeBasedCorrection(BaseCorrection, CpuPlugin):
         inData.meta_data.set('multiple_dark', self.dark)
         inData.meta_data.set('multiple_flat', self.flat)
 
+        self.dark = np.array(self.dark)
+        self.flat = np.array(self.flat)
+        self.dark_frames, self.dark_weights = \
+            self.find_nearest_frames(self.dark_idx, self.data_key)
+        self.flat_frames, self.flat_weights = \
+            self.find_nearest_frames(self.flat_idx, self.data_key)
+
     def calc_average(self, data, key):
         im_key = np.where(self.image_key == key)[0]
         splits = np.where(np.diff(im_key) > 1)[0]+1
@@ -69,55 +70,51 @@ class TimeBasedCorrection(BaseCorrection, CpuPlugin):
         return mean_data, list_idx
 
     def process_frames(self, data):
+        frames = self.get_plugin_in_datasets()[0].get_current_frame_idx()
         proj = data[0]
-        frame = self.get_global_frame_index()[self.count]
-        flat = self.calculate_flat_field(frame, proj,
-                *self.find_nearest_frames(self.flat_idx, frame))
-        dark = self.calculate_dark_field(frame, proj,
-                *self.find_nearest_frames(self.dark_idx, frame))
+        flat = self.__interpolate(self.flat, self.flat_frames[frames],
+                                  self.flat_weights[frames])
+        dark = self.__interpolate(self.dark, self.dark_frames[frames],
+                                  self.dark_weights[frames])
 
         if self.parameters['in_range']:
-            proj = self.in_range(proj, flat)
+            proj = np.minimum(proj, flat)
 
-        self.count += 1
         return np.nan_to_num((proj-dark)/(flat-dark))
 
-    def in_range(self, data, flat):
-        data[data > flat] = flat[data > flat]
-        return data
-
-    def find_nearest_frames(self, idx_list, value):
-        """ Find the index of the two entries that 'value' lies between in \
-            'idx_list' and calculate the distance between each of them.
+    def __interpolate(self, images, frames, weights):
+        """ The weighted sum of the bracketing images for each frame, with
+        the frames along the slice dimension of the plugin data. """
+        ndim = images.ndim - 1
+        w = weights.reshape(weights.shape + (1,)*ndim)
+        block = images[frames[:, 0]]*w[:, 0] + images[frames[:, 1]]*w[:, 1]
+        return np.moveaxis(block, 0, self.slice_dir)
+
+    def find_nearest_frames(self, idx_list, values):
+        """ For each entry in 'values' (an index into the full image key),
+        find the two entries in 'idx_list' (the indices of the dark or flat
+        groups) before and after the group containing the value, and the
+        interpolation weight of each, given by the position of the value in
+        its group.  If there is no group before (or after) then the nearest
+        group is used for both.
+
+        :returns: Two (len(values), 2) arrays, of the positions in idx_list
+            and the weights.
         """
-        global_val = self.data_key[value]
-        # find which list (index) global_val belongs to
-        list_idx = [global_val in i for i in self.split_idx].index(True)
-        val_list = self.split_idx[list_idx]
-        # find length of list
-        length_list = len(val_list)
-        # find position of global_val in list and distance from each end
-        pos = np.where(val_list == global_val)[0][0]
-        dist = [(length_list-pos)/float(length_list), pos/float(length_list)]
-
-        # find closest before and after idx_list entries
-        new_list = list(np.sort(np.append(idx_list, list_idx)))
-        new_idx = new_list.index(list_idx)
-
-        entry1 = new_idx-1 if new_idx != 0 else new_idx+1
-        entry2 = new_idx+1 if new_idx != len(new_list)-1 else new_idx-1
-        before = idx_list.index(new_list[entry1])
-        after = idx_list.index(new_list[entry2])
-
-        return [before, after], dist
-
-    def calculate_flat_field(self, frame, data, frames, distance):
-        return self.flat[frames[0]]*distance[0] + \
-            self.flat[frames[1]]*distance[1]
-
-    def calculate_dark_field(self, frame, data, frames, distance):
-        return self.dark[frames[0]]*distance[0] + \
-            self.dark[frames[1]]*distance[1]
-
-    def get_max_frames(self):
-        return 'single'
+        lengths = np.array([len(i) for i in self.split_idx])
+        starts = np.array([i[0] for i in self.split_idx])
+        values = np.asarray(values)
+        # the group containing each value and its position in the group
+        group = np.searchsorted(starts, values, side='right') - 1
+        pos = (values - starts[group]).astype(np.float64)
+        length = lengths[group].astype(np.float64)
+        weights = np.stack([(length - pos)/length, pos/length], axis=1)
+
+        after = np.searchsorted(np.asarray(idx_list), group)
+        n = len(idx_list)
+        frames = np.stack([np.clip(after - 1, 0, n - 1),
+                           np.clip(after, 0, n - 1)], axis=1)
+        # a single bracketing group is used for both
+        frames[after == 0, 0] = frames[after == 0, 1]
+        frames[after == n, 1] = frames[after == n, 0]
+        return frames, weights
@@ -24,6 +24,7 @@ import sys
 import re
 
 import savu.plugins.loaders.utils.yaml_utils as yu
+from savu.plugins.plugin_cache import get_cached_docstring
 
 
 def find_synopsis(dclass):
@@ -88,7 +89,8 @@ def change_dtype_to_str(doc):
     return doc
 
 def load_yaml_doc(doc):
-    """Load in the yaml format. Call yaml_utils.py
+    """Load in the yaml format. Call yaml_utils.py, or reuse the result of
+    parsing an identical docstring previously.
 
     Parameters
     ----------
@@ -103,7 +105,7 @@ def load_yaml_doc(doc):
     """
     all_params = ""
     try:
-        all_params = yu.read_yaml_from_doc(doc)
+        all_params = get_cached_docstring(doc, yu.read_yaml_from_doc)
     except Exception as e:
         print("\nError reading the yaml structure from Yaml Utils.\n %s" % e)
     return all_params
@@ -21,7 +21,16 @@
 
 """
 
+import os
+import time
+import logging
+
+import h5py
+import numpy as np
+from mpi4py import MPI
+
 from savu.plugins.driver.plugin_driver import PluginDriver
+from savu.data.data_structures.resident_data import ResidentData
 
 
 class IterativePlugin(PluginDriver):
@@ -39,16 +48,21 @@ class IterativePlugin(PluginDriver):
         self._ip_pattern_dict = {}
         self._ip_data_dict['iterating'] = {}
         self._ip_pattern_dict['iterating'] = {}
+        self._ip_resident = True
+        self._ip_memory_fraction = 0.5
+        self._ip_flush_time = None
 
     def _run_plugin(self, exp, transport):
         """ Runs the pre_process, process and post_process methods.
         """
         self.__set_original_datasets()
+        self.__set_resident_datasets()
 
         while not self._ip_complete:
             print ("Iteration", self._ip_iteration, "...")
             self.__set_datasets()  # change the pattern in this function?
             self._run_plugin_instances(transport, self.get_communicator())
+            self.__checkpoint_resident_datasets()
             if transport.no_processing:
                 self.set_processing_complete()
             if self._ip_fixed_iterations and \
@@ -92,6 +106,8 @@ class IterativePlugin(PluginDriver):
             final_dataset = s1 if s1 in self.parameters['out_datasets'] else s2
             obsolete = s1 if s1 is not final_dataset else s2
             obsolete.remove = True
+            self.__release_resident_data(final_dataset, flush=True)
+            self.__release_resident_data(obsolete, flush=False)
             # switch names if necessary
             if final_dataset.get_name() != name:
                 temp = obsolete
@@ -107,6 +123,12 @@ class IterativePlugin(PluginDriver):
         else:
             raise Exception('nIterations should be an integer.')
 
+    def set_resident_datasets(self, resident):
+        """ Keep the alternating datasets in memory between iterations, if
+        they fit (True by default).  Only the final result is written to file.
+        """
+        self._ip_resident = resident
+
     def set_iteration_datasets(self, itr, in_data, out_data, pattern=None):
         self._ip_data_dict[itr] = [in_data, out_data]
         self._ip_pattern_dict[itr] = pattern
@@ -142,3 +164,58 @@ class IterativePlugin(PluginDriver):
 
     def get_original_datasets(self):
         return self.in_data, self.out_data
+
+    def __get_resident_communicator(self):
+        comm = self.get_communicator()
+        return comm if comm is not None else MPI.COMM_WORLD
+
+    def __set_resident_datasets(self):
+        """ Hold the alternating datasets in memory, instead of passing them
+        through the backing files at every iteration, if the blocks written
+        by each process fit in the memory available to it. """
+        datasets = [d for pair in self._ip_data_dict['iterating'].items()
+                    for d in pair if isinstance(d.data, h5py.Dataset)]
+        if not self._ip_resident or not datasets:
+            return
+
+        comm = self.__get_resident_communicator()
+        nbytes = sum(np.prod(d.data.shape)*d.data.dtype.itemsize
+                     for d in datasets)/float(comm.size)
+        node_comm = comm.Split_type(MPI.COMM_TYPE_SHARED)
+        node_procs = node_comm.size
+        node_comm.Free()
+        available = os.sysconf('SC_AVPHYS_PAGES') * \
+            os.sysconf('SC_PAGE_SIZE')/float(node_procs)
+        fits = nbytes < self._ip_memory_fraction*available
+        if not comm.allreduce(fits, op=MPI.LAND):
+            logging.info("Iterating datasets do not fit in memory, passing "
+                         "them through the backing files.")
+            return
+        for data in datasets:
+            data.data = ResidentData(data.data)
+        self._ip_flush_time = time.time()
+
+    def __checkpoint_resident_datasets(self):
+        """ When checkpointing, write the latest iteration to file at most
+        once per checkpoint interval.  The processes decide together, as
+        flushing the backing files is collective. """
+        if self._ip_flush_time is None or \
+                not self.exp.meta_data.get('checkpoint'):
+            return
+        interval = self.exp.meta_data.get(
+            ['system_params', 'checkpoint_interval'])
+        due = time.time() - self._ip_flush_time >= interval
+        if not self.__get_resident_communicator().allreduce(due, op=MPI.LOR):
+            return
+        for pair in self._ip_data_dict['iterating'].items():
+            for data in [d.data for d in pair]:
+                if isinstance(data, ResidentData):
+                    data._flush()
+                    data._sync()
+        self._ip_flush_time = time.time()
+
+    def __release_resident_data(self, data, flush=True):
+        if isinstance(data.data, ResidentData):
+            if flush:
+                data.data._flush()
+            data.data = data.data.data
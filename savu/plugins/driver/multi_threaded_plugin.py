@@ -20,8 +20,10 @@
 .. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
 
 """
+import contextlib
 from mpi4py import MPI
 
+import savu.core.placement as placement
 from savu.plugins.driver.plugin_driver import PluginDriver
 
 
@@ -44,9 +46,18 @@ class MultiThreadedPlugin(PluginDriver):
         self.exp._barrier()
 
         if process in masters:
+            # a pinned process runs the threads on all the cores of its node
+            placed = exp.meta_data.get_dictionary().get('placement')
+            if placed:
+                nCores = len(placed['node_cpus'])
+                pinning = placement.affinity(placed['node_cpus'])
+            else:
+                pinning = contextlib.nullcontext()
             self.parameters['available_CPUs'] = nCores
             self.parameters['available_GPUs'] = len([p for p in self.processes if 'GPU' in p]) // self.nNodes
-            self._run_plugin_instances(transport, communicator=self.new_comm)
+            with pinning:
+                self._run_plugin_instances(transport,
+                                           communicator=self.new_comm)
             self.__free_communicator()
 
         self.exp._barrier()
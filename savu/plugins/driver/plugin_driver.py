@@ -51,24 +51,91 @@ class PluginDriver(BasicDriver):
         if extra_dims:
             init_vars = self.__get_local_dict()
 
-        for i in range(repeat):
-            if extra_dims:
-                self.__reset_local_vars(init_vars)
-                self.get_plugin_tools()._set_parameters_this_instance(
-                    param_idx[i])
-                for j in range(len(out_data)):
-                    out_data[j]._get_plugin_data()\
-                        .set_fixed_dimensions(param_dims[j], param_idx[i])
-
-            super(PluginDriver, self).\
-                _run_plugin_instances(transport, communicator=communicator)
-            self._reset_process_frames_counter()
+        if extra_dims and self.__sweep_in_memory():
+            self.__run_sweep(transport, init_vars, param_idx, param_dims)
+        else:
+            for i in range(repeat):
+                if extra_dims:
+                    self.__reset_local_vars(init_vars)
+                    self.get_plugin_tools()._set_parameters_this_instance(
+                        param_idx[i])
+                    for j in range(len(out_data)):
+                        out_data[j]._get_plugin_data()\
+                            .set_fixed_dimensions(param_dims[j], param_idx[i])
+
+                super(PluginDriver, self).\
+                    _run_plugin_instances(transport, communicator=communicator)
+                self._reset_process_frames_counter()
 
         self._revert_preview(self.parameters['in_datasets'])
 
         for j in range(len(out_data)):
             out_data[j].set_shape(out_data[j].data.shape)
 
+    def sweep_in_memory(self):
+        """ Override and return False if the instances of a parameter sweep
+        cannot exist at the same time (e.g. due to device memory), in which
+        case the plugin is run once for each set of parameter values. """
+        return True
+
+    def __sweep_in_memory(self):
+        # a checkpoint restart cannot resume part way through a sweep
+        return self.sweep_in_memory() and \
+            not self.exp.meta_data.get('checkpoint')
+
+    def __run_sweep(self, transport, init_vars, param_idx, param_dims):
+        """ Runs every set of parameter values in a single pass over the data.
+
+        Each instance of the plugin (a set of parameter values) is
+        pre-processed in turn and its state stored.  The transport then reads
+        each block of data once and passes it to every instance, switching
+        between the stored states, before each instance is post-processed.
+        """
+        tools = self.get_plugin_tools()
+        out_data = self.get_out_datasets()
+        states = [None]*len(param_idx)
+        current = [None]
+
+        def activate(i):
+            if current[0] is not None:
+                states[current[0]] = \
+                    [self.__get_local_dict(), self.get_process_frames_counter()]
+            self.__reset_local_vars(states[i][0])
+            self.pcount = states[i][1]
+            tools._set_parameters_this_instance(param_idx[i])
+            for j in range(len(out_data)):
+                out_data[j]._get_plugin_data()\
+                    .set_fixed_dimensions(param_dims[j], param_idx[i])
+            current[0] = i
+
+        for i in range(len(param_idx)):
+            states[i] = [init_vars, 0]
+            current[0] = None
+            activate(i)
+            logging.info("%s.%s", self.__class__.__name__, 'pre_process')
+            self.base_pre_process()
+            self.pre_process()
+            states[i] = [self.__get_local_dict(), 0]
+        current[0] = None
+
+        msg = "Pre-process completed for %s" % self.__class__.__name__
+        self.plugin_barrier(msg=msg)
+
+        logging.info("%s.%s sweep over %d parameter sets",
+                     self.__class__.__name__, 'process_frames', len(states))
+        transport._transport_sweep(
+            self, [lambda i=i: activate(i) for i in range(len(states))])
+
+        msg = "Process_frames completed for %s" % self.__class__.__name__
+        self.plugin_barrier(msg=msg)
+
+        for i in range(len(states)):
+            activate(i)
+            logging.info("%s.%s", self.__class__.__name__, 'post_process')
+            self.post_process()
+            self.base_post_process()
+        self._reset_process_frames_counter()
+
     def __get_local_dict(self):
         """ Gets the local variables of the class minus those from the Plugin
         class. """
@@ -0,0 +1,182 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: batch_simple_fit
+   :platform: Unix
+   :synopsis: A plugin to fit peaks in a block of spectra at once
+
+.. moduleauthor:: Aaron Parsons <scientificsoftware@diamond.ac.uk>
+
+"""
+import logging
+import time
+import numpy as np
+
+from savu.plugins.utils import register_plugin
+from savu.plugins.fitters.simple_fit import SimpleFit
+
+
+@register_plugin
+class BatchSimpleFit(SimpleFit):
+
+    def __init__(self):
+        super(BatchSimpleFit, self).__init__("BatchSimpleFit")
+
+    def pre_process(self):
+        super(BatchSimpleFit, self).pre_process()
+        self.model = self.get_batch_fit_function(
+            str(self.parameters['peak_shape']))
+        self.in_slice_dir = \
+            self.get_plugin_in_datasets()[0].get_slice_dimension()
+        self.out_slice_dirs = [p.get_slice_dimension()
+                               for p in self.get_plugin_out_datasets()]
+
+    def process_frames(self, data):
+        t1 = time.time()
+        # spectra are stacked along the first axis: (nSpectra, nChannels)
+        spectra = np.moveaxis(data[0], self.in_slice_dir, 0)
+        spectra = spectra.reshape(-1, spectra.shape[-1]).astype(np.float64)
+        npeaks = len(self.positions)
+
+        p = np.empty((spectra.shape[0], 2*npeaks))
+        p[:, :npeaks] = spectra[:, self.peakindex]
+        p[:, npeaks:] = self.parameters["width_guess"]
+
+        params = self.batch_leastsq(p, spectra)
+        nan_rows = np.isnan(params).any(axis=1)
+        if nan_rows.any():
+            logging.debug('Nans were detected in %d spectra', nan_rows.sum())
+            params[nan_rows] = 0
+
+        weights, widths = params[:, :npeaks], params[:, npeaks:]
+        peaks = self.model(weights, widths, self.axis, self.positions)[0]
+        areas = peaks.sum(axis=-1)
+        residuals = spectra - self.model(np.abs(weights), np.abs(widths),
+                                         self.axis, self.positions)[0].sum(1)
+
+        out = [weights, widths, areas, residuals]
+        out = [np.moveaxis(o.reshape(o.shape[0], -1), 0, sdir)
+               for o, sdir in zip(out, self.out_slice_dirs)]
+        t2 = time.time()
+        logging.debug("Batch simple fit of %d spectra took: %s ms",
+                      spectra.shape[0], str((t2-t1)*1e3))
+        return out
+
+    def batch_leastsq(self, p, y):
+        """ Fit the peak model to every row of ``y`` simultaneously.
+
+        :param ndarray p: Initial parameters, one row per spectrum, ordered
+            as [weights, widths].
+        :param ndarray y: Spectra, one row per spectrum.
+        :returns: The fitted parameters, with the same shape as ``p``.
+        """
+        max_iter = self.parameters['max_iterations']
+        tol = self.parameters['tolerance']
+        p = p.copy()
+        nspectra, nparams = p.shape
+        lam = np.ones(nspectra)
+        resid = y - self._batch_spectrum(p)
+        cost = np.einsum('ij,ij->i', resid, resid)
+        active = np.ones(nspectra, dtype=bool)
+        eye = np.eye(nparams)
+
+        for _ in range(max_iter):
+            idx = np.flatnonzero(active)
+            if not idx.size:
+                break
+            jac = self._batch_jacobian(p[idx])
+            jtj = np.einsum('kxi,kxj->kij', jac, jac)
+            grad = np.einsum('kxi,kx->ki', jac, resid[idx])
+            diag = np.maximum(np.einsum('kii->ki', jtj), np.finfo(float).eps)
+            lhs = jtj + lam[idx, None, None]*diag[:, :, None]*eye
+            delta = self._batch_solve(lhs, grad)
+
+            trial = p[idx] + delta
+            trial_resid = y[idx] - self._batch_spectrum(trial)
+            trial_cost = np.einsum('ij,ij->i', trial_resid, trial_resid)
+            better = trial_cost < cost[idx]
+
+            # per-spectrum convergence masks
+            small_step = np.all(np.abs(delta) <= tol*(np.abs(p[idx]) + tol),
+                                axis=1)
+            small_gain = (cost[idx] - trial_cost) <= tol*cost[idx]
+            done = (better & (small_gain | small_step)) | ~np.isfinite(
+                trial_cost) | (lam[idx] > 1e16)
+
+            accept = idx[better]
+            p[accept] = trial[better]
+            resid[accept] = trial_resid[better]
+            cost[accept] = trial_cost[better]
+            lam[idx] = np.where(better, lam[idx]/10., lam[idx]*10.)
+            active[idx[done]] = False
+
+        if active.any():
+            logging.debug('%d spectra did not converge in %d iterations',
+                          active.sum(), max_iter)
+        return p
+
+    def _batch_solve(self, lhs, rhs):
+        try:
+            return np.linalg.solve(lhs, rhs[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            return np.einsum('kij,kj->ki', np.linalg.pinv(lhs), rhs)
+
+    def _batch_spectrum(self, p):
+        npeaks = p.shape[1] // 2
+        rest = np.abs(p)
+        peaks = self.model(rest[:, :npeaks], rest[:, npeaks:], self.axis,
+                           self.positions)[0]
+        return peaks.sum(axis=1)
+
+    def _batch_jacobian(self, p):
+        """ Derivatives of the model spectra with respect to the (signed)
+        parameters, with shape (nSpectra, nChannels, nParams). """
+        npeaks = p.shape[1] // 2
+        sign = np.where(p < 0, -1.0, 1.0)
+        rest = np.abs(p)
+        _, da, dw = self.model(rest[:, :npeaks], rest[:, npeaks:], self.axis,
+                               self.positions)
+        jac = np.concatenate([da, dw], axis=1)*sign[:, :, None]
+        return jac.transpose(0, 2, 1)
+
+    def get_batch_fit_function(self, key):
+        lookup = {"lorentzian": batch_lorentzian, "gaussian": batch_gaussian}
+        return lookup[key]
+
+    def get_max_frames(self):
+        return 'multiple'
+
+
+def batch_lorentzian(a, w, x, c):
+    """ Lorentzian peaks and their derivatives with respect to ``a`` and
+    ``w``, each of shape (nSpectra, nPeaks, nChannels). """
+    a, w = a[:, :, None], w[:, :, None]
+    d2 = (np.asarray(x)[None, None, :] - np.asarray(c)[None, :, None])**2
+    denom = 1.0 + 4.0*d2/w**2
+    da = 1.0/denom
+    peaks = a*da
+    dw = 8.0*a*d2/(w**3*denom**2)
+    return peaks, da, dw
+
+
+def batch_gaussian(a, w, x, c):
+    """ Gaussian peaks and their derivatives with respect to ``a`` and
+    ``w``, each of shape (nSpectra, nPeaks, nChannels). """
+    a, w = a[:, :, None], w[:, :, None]
+    d2 = (np.asarray(x)[None, None, :] - np.asarray(c)[None, :, None])**2
+    da = np.exp(-d2/(2.0*w**2))
+    peaks = a*da
+    dw = peaks*d2/w**3
+    return peaks, da, dw
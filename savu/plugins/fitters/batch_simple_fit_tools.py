@@ -0,0 +1,26 @@
+from savu.plugins.plugin_tools import PluginTools
+
+class BatchSimpleFitTools(PluginTools):
+    """A multiple-frames version of SimpleFit. All spectra in a transfer
+    block are fitted together by a vectorised Levenberg-Marquardt solver
+    with analytic Jacobians, and each spectrum stops iterating as soon as
+    it has converged.
+    """
+    def define_parameters(self):
+        """
+        max_iterations:
+            visibility: intermediate
+            dtype: int
+            description: The maximum number of Levenberg-Marquardt
+              iterations applied to each spectrum.
+            default: 200
+
+        tolerance:
+            visibility: advanced
+            dtype: float
+            description: Relative tolerance on the change in the sum of
+              squared residuals, and on the parameter step, at which a
+              spectrum is considered converged.
+            default: 1.49012e-08
+
+        """
@@ -31,8 +31,8 @@ import math
 @register_plugin
 class SimpleFit(BaseFitter):
 
-    def __init__(self):
-        super(SimpleFit, self).__init__("SimpleFit")
+    def __init__(self, name="SimpleFit"):
+        super(SimpleFit, self).__init__(name)
 
     def pre_process(self):
         in_meta_data = self.get_in_meta_data()[0]
@@ -21,6 +21,7 @@
 
 """
 
+import savu.core.utils as cu
 from savu.plugins.plugin import Plugin
 
 class BaseLoader(Plugin):
@@ -45,7 +46,16 @@ class BaseLoader(Plugin):
     def set_data_reduction_params(self, data_obj):
         pDict = self.parameters
         self.data_mapping()
-        data_obj.get_preview().set_preview(pDict['preview'], load=True)
+        preview = data_obj.get_preview()
+        preview_list = pDict['preview']
+        budget = self.__get_reconnaissance_budget()
+        if budget:
+            preview_list = \
+                preview._get_reconnaissance_preview(preview_list, budget)
+            if self.exp.meta_data.get('process') == 0:
+                cu.user_message("Reconnaissance mode: previewing %s with %s"
+                                % (data_obj.get_name(), preview_list))
+        preview.set_preview(preview_list, load=True)
         # update axis labels
         #data_obj.amend_axis_label_values()
         # set previewing for Related datasets
@@ -55,6 +65,15 @@ class BaseLoader(Plugin):
         # update axis labels for Related datasets
         self.reduction_flag = True
 
+    def __get_reconnaissance_budget(self):
+        """ The maximum number of detector rows (slices) and projections to
+        process in reconnaissance mode, which is the same for all loaders in
+        the process list. """
+        options = self.exp.meta_data.get_dictionary()
+        budget = {'detector_y': options.get('reconnaissance'),
+                  'rotation_angle': options.get('reconnaissance_angles')}
+        return {k: v for k, v in budget.items() if v}
+
     def get_NXapp(self, ltype, nx_file, entry):
         '''
         finds an application definition in a nexus file
@@ -30,6 +30,7 @@ from savu.data.chunking import Chunking
 from savu.plugins.utils import register_plugin
 from savu.plugins.loaders.base_loader import BaseLoader
 from savu.plugins.savers.utils.hdf5_utils import Hdf5Utils
+import savu.plugins.loaders.utils.synthetic_data_utils as synth
 
 import tomophantom
 from tomophantom import TomoP2D, TomoP3D
@@ -106,31 +107,24 @@ class BaseTomophantomLoader(BaseLoader):
 
         self.exp._barrier()
 
+        # each process generates whole chunks, a block of slices at a time
         slice_dirs = list(nnext.values())[0]['slice_dims']
-        nDims = len(dset.shape)
-        total_frames = np.prod([dset.shape[i] for i in slice_dirs])
-        sub_size = \
-            [1 if i in slice_dirs else dset.shape[i] for i in range(nDims)]
-
-        # need an mpi barrier after creating the file before populating it
-        idx = 0
-        sl, total_frames = \
-            self.__get_start_slice_list(slice_dirs, dset.shape, total_frames)
-        # calculate the first slice
-        for i in range(total_frames):
+        gen_dim = slice_dirs[0]
+        blocks = synth.get_blocks(
+            dset.shape, dset.chunks, slice_dirs, dset.dtype.itemsize)
+        blocks = synth.get_process_blocks(
+            blocks, len(self.exp.get('processes')), self.exp.get('process'))
+        for sl in blocks:
+            gen_range = (sl[gen_dim].start, sl[gen_dim].stop)
             if (file_name == 'synth_proj_data'):
                 #generate projection data
-                gen_data = TomoP3D.ModelSinoSub(self.tomo_model, proj_data_dims[1], proj_data_dims[2], proj_data_dims[1], (i, i+1), -self.angles, self.path_library3D)
+                gen_data = TomoP3D.ModelSinoSub(self.tomo_model, proj_data_dims[1], proj_data_dims[2], proj_data_dims[1], gen_range, -self.angles, self.path_library3D)
             else:
                 #generate phantom data
-                gen_data = TomoP3D.ModelSub(self.tomo_model, proj_data_dims[1], (i, i+1), self.path_library3D)
-            dset[tuple(sl)] = np.swapaxes(gen_data,0,1)
-            if sl[slice_dirs[idx]].stop == dset.shape[slice_dirs[idx]]:
-                idx += 1
-                if idx == len(slice_dirs):
-                    break
-            tmp = sl[slice_dirs[idx]]
-            sl[slice_dirs[idx]] = slice(tmp.start+1, tmp.stop+1)
+                gen_data = TomoP3D.ModelSub(self.tomo_model, proj_data_dims[1], gen_range, self.path_library3D)
+            dset[tuple(sl)] = np.swapaxes(gen_data,0,1)[tuple(
+                slice(None) if d == gen_dim else sl[d]
+                for d in range(len(sl)))]
 
         self.exp._barrier()
 
@@ -141,22 +135,6 @@ class BaseTomophantomLoader(BaseLoader):
 
         return self.hdf5._open_backing_h5(fname, 'r')
 
-    def __get_start_slice_list(self, slice_dirs, shape, n_frames):
-        n_processes = len(self.exp.get('processes'))
-        rank = self.exp.get('process')
-        frames = np.array_split(np.arange(n_frames), n_processes)[rank]
-        f_range = list(range(0, frames[0])) if len(frames) else []
-        sl = [slice(0, 1) if i in slice_dirs else slice(None)
-              for i in range(len(shape))]
-        idx = 0
-        for i in f_range:
-            if sl[slice_dirs[idx]] == shape[slice_dirs[idx]]-1:
-                idx += 1
-            tmp = sl[slice_dirs[idx]]
-            sl[slice_dirs[idx]] = slice(tmp.start+1, tmp.stop+1)
-
-        return sl, len(frames)
-
     def __convert_patterns(self, data_obj, object_type):
         if (object_type == 'synth_proj_data'):
             pattern_list = self.parameters['patterns']
@@ -0,0 +1,126 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: nxtomo_stream_loader
+   :platform: Unix
+   :synopsis: A class for loading tomography data in Nexus format while the \
+       scan is still being written.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import numpy as np
+
+from savu.plugins.loaders.full_field_loaders.nxtomo_loader import NxtomoLoader
+from savu.plugins.loaders.utils.growing_file import GrowingFile
+from savu.plugins.utils import register_plugin
+
+from savu.data.data_structures.data_types.data_plus_darks_and_flats \
+    import ImageKey
+
+
+@register_plugin
+class NxtomoStreamLoader(NxtomoLoader):
+    """
+    """
+    def __init__(self, name='NxtomoStreamLoader'):
+        super(NxtomoStreamLoader, self).__init__(name)
+        self.gfile = None
+        self.image_key = None
+
+    def _get_data_file(self):
+        self.gfile = GrowingFile(
+            self.exp.meta_data.get("data_file"),
+            swmr=self.parameters['swmr'],
+            poll_interval=self.parameters['poll_interval'],
+            timeout=self.parameters['timeout'],
+            complete_path=self.parameters['complete_path'])
+        # read entries through the GrowingFile, as it may reopen the file
+        return self.gfile
+
+    def _get_h5_entry(self, filename, path):
+        if path != self.parameters['data_path']:
+            return super(NxtomoStreamLoader, self)._get_h5_entry(
+                filename, path)
+        if path not in self.gfile.file:
+            self.gfile.wait(lambda: path in self.gfile.file, lambda: 0,
+                            "the dataset %s" % path)
+        n_frames = self.__get_n_projections()
+        if not self.__separate_dark_and_flat():
+            self.image_key = self.__get_image_key(n_frames)
+            n_frames = len(self.image_key)
+        return self.gfile.get_dataset(path, n_frames=n_frames)
+
+    def _set_dark_and_flat(self, data_obj):
+        if self.__separate_dark_and_flat():
+            super(NxtomoStreamLoader, self)._set_dark_and_flat(data_obj)
+            return
+        ignore = self.parameters['ignore_flats'] if \
+            self.parameters['ignore_flats'] else None
+        data_obj.data = ImageKey(data_obj, self.image_key, 0, ignore=ignore)
+        data_obj.data._set_dark_and_flat()
+
+    def _set_rotation_angles(self, data_obj):
+        if self.parameters['angles'] is not None:
+            return super(NxtomoStreamLoader, self)._set_rotation_angles(
+                data_obj)
+        # the angles are only used if they have all been written already
+        path = 'entry1/tomo_entry/data/rotation_angle'
+        n_frames = data_obj.data.data.shape[0]
+        ffile = self.gfile.file
+        if path in ffile and ffile[path].shape[0] >= n_frames:
+            angles = ffile[path][:n_frames]
+            if self.image_key is not None:
+                angles = angles[data_obj.data.get_image_key() == 0]
+        else:
+            self.log_warning("The rotation angles are not yet available, so "
+                             "evenly distributing them between 0 and 180 "
+                             "degrees")
+            angles = np.linspace(0, 180, data_obj.get_shape()[0])
+        data_obj.meta_data.set("rotation_angle", angles)
+        return len(angles)
+
+    def __separate_dark_and_flat(self):
+        return all(self.parameters[key][0] not in (None, 'None', '')
+                   for key in ['flat', 'dark'])
+
+    def __get_n_projections(self):
+        if self.parameters['n_projections'] is not None:
+            return self.parameters['n_projections']
+        if self.parameters['angles'] is not None:
+            try:
+                angles = eval(self.parameters['angles'],
+                              {"builtins": None, "np": np})
+                return np.array(angles).shape[0]
+            except Exception:
+                pass
+        raise Exception("Please specify the number of projections in the "
+                        "scan, via the n_projections or angles parameters.")
+
+    def __get_image_key(self, n_projections):
+        """ Wait for the darks and flats at the start of the scan and return
+        the image key for the whole scan, with any darks and flats at the end
+        of the scan excluded. """
+        path = self.parameters['image_key_path']
+        self.gfile.wait(lambda: path in self.gfile.file, lambda: 0,
+                        "the image key %s" % path)
+        key = self.gfile.get_dataset(path)
+        self.gfile.wait(lambda: (key.data[...] == 0).any(),
+                        key.get_available, "the first projection")
+        image_key = key.data[...]
+        start = np.where(image_key == 0)[0][0]
+        return np.concatenate(
+            [image_key[:start], np.zeros(n_projections, dtype=int)])
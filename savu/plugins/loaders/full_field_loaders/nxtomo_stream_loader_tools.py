@@ -0,0 +1,43 @@
+from savu.plugins.plugin_tools import PluginTools
+
+class NxtomoStreamLoaderTools(PluginTools):
+    """A class to load tomography data from a hdf5 file that is still being
+    written. Processing starts as soon as the darks and flats at the start of
+    the scan have arrived, and reads wait for the frames they require.
+    """
+    def define_parameters(self):
+        """
+        n_projections:
+            visibility: basic
+            dtype: [int, None]
+            description: The number of projections in the complete scan. If
+              None, the number of values in the angles parameter is used.
+            default: None
+        swmr:
+            visibility: intermediate
+            dtype: bool
+            description: Open the file in single writer multiple reader
+              mode. If the file was not written in this mode, the file is
+              polled by reopening it instead.
+            default: True
+        poll_interval:
+            visibility: intermediate
+            dtype: float
+            description: Time in seconds between checks for new frames.
+            default: 1.0
+        timeout:
+            visibility: intermediate
+            dtype: float
+            description: Time in seconds to wait for new frames before
+              giving up.
+            default: 600.0
+        complete_path:
+            visibility: intermediate
+            dtype: [h5path, None]
+            description: Path to an entry inside the nxs file that marks the
+              end of the scan. The scan is complete when the entry exists and,
+              if it is a numeric dataset, is non-zero. An error is raised if
+              the scan completes before all the frames have arrived.
+            default: entry1/end_time
+
+        """
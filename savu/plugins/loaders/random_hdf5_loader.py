@@ -26,11 +26,13 @@ import os
 import h5py
 import logging
 import numpy as np
+from mpi4py import MPI
 
 from savu.data.chunking import Chunking
 from savu.plugins.utils import register_plugin
 from savu.plugins.loaders.base_loader import BaseLoader
 from savu.plugins.savers.utils.hdf5_utils import Hdf5Utils
+import savu.plugins.loaders.utils.synthetic_data_utils as synth
 
 
 @register_plugin
@@ -85,26 +87,24 @@ class RandomHdf5Loader(BaseLoader):
         self.exp._barrier()
 
         slice_dirs = list(nnext.values())[0]['slice_dims']
-        nDims = len(dset.shape)
-        total_frames = np.prod([dset.shape[i] for i in slice_dirs])
-        sub_size = \
-            [1 if i in slice_dirs else dset.shape[i] for i in range(nDims)]
-
-        # need an mpi barrier after creating the file before populating it
-        idx = 0
-        sl, total_frames = \
-            self.__get_start_slice_list(slice_dirs, dset.shape, total_frames)
-        # calculate the first slice
-        for i in range(total_frames):
-            low, high = self.parameters['range']
-            dset[tuple(sl)] = np.random.randint(
-                low, high=high, size=sub_size, dtype=self.parameters['dtype_'])
-            if sl[slice_dirs[idx]].stop == dset.shape[slice_dirs[idx]]:
-                idx += 1
-                if idx == len(slice_dirs):
-                    break
-            tmp = sl[slice_dirs[idx]]
-            sl[slice_dirs[idx]] = slice(tmp.start+1, tmp.stop+1)
+        sub_size = [1 if i in slice_dirs else dset.shape[i]
+                    for i in range(len(dset.shape))]
+        low, high = self.parameters['range']
+        seed = self.__get_seed()
+
+        # each process generates whole chunks, seeded by frame
+        blocks = synth.get_blocks(
+            dset.shape, dset.chunks, slice_dirs, dset.dtype.itemsize)
+        blocks = synth.get_process_blocks(
+            blocks, len(self.exp.get('processes')), self.exp.get('process'))
+        for sl in blocks:
+            block = np.empty([s.stop - s.start for s in sl], dtype=dset.dtype)
+            for local, state in synth.get_frame_seeds(
+                    sl, dset.shape, slice_dirs, seed):
+                block[local] = state.randint(
+                    low, high=high, size=sub_size,
+                    dtype=self.parameters['dtype_'])
+            dset[tuple(sl)] = block
 
         self.exp._barrier()
 
@@ -115,21 +115,14 @@ class RandomHdf5Loader(BaseLoader):
 
         return self.hdf5._open_backing_h5(fname, 'r')
 
-    def __get_start_slice_list(self, slice_dirs, shape, n_frames):
-        n_processes = len(self.exp.get('processes'))
-        rank = self.exp.get('process')
-        frames = np.array_split(np.arange(n_frames), n_processes)[rank]
-        f_range = list(range(0, frames[0])) if len(frames) else []
-        sl = [slice(0, 1) if i in slice_dirs else slice(None)
-              for i in range(len(shape))]
-        idx = 0
-        for i in f_range:
-            if sl[slice_dirs[idx]] == shape[slice_dirs[idx]]-1:
-                idx += 1
-            tmp = sl[slice_dirs[idx]]
-            sl[slice_dirs[idx]] = slice(tmp.start+1, tmp.stop+1)
-
-        return sl, len(frames)
+    def __get_seed(self):
+        seed = self.parameters['seed']
+        if seed is None:
+            seed = np.random.randint(2**31) if self.exp.get('process') == 0 \
+                else None
+            if self.exp.meta_data.get('mpi') is True:
+                seed = MPI.COMM_WORLD.bcast(seed, root=0)
+        return seed
 
     def __convert_patterns(self, data_obj):
         pattern_list = self.parameters['patterns']
@@ -61,5 +61,13 @@ class RandomHdf5LoaderTools(PluginTools):
               dtype: list[float,float]
               description: Set the distribution interval.
               default: [1, 10]
+        seed:
+              visibility: intermediate
+              dtype: [None,int]
+              description: Seed for the random number generator. Each frame
+                is seeded from this value and its index, so the data does
+                not depend on the number of processes. If None, a random
+                seed is used.
+              default: None
 
         """
\ No newline at end of file
@@ -0,0 +1,191 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: growing_file
+   :platform: Unix
+   :synopsis: Access to an hdf5 file that is still being written, with reads \
+       that wait for the requested frames to arrive.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import time
+import logging
+
+import h5py
+import numpy as np
+
+
+class GrowingFile(object):
+    """ An hdf5 file that is still being written to.
+
+    The file is opened for SWMR (single writer multiple reader) access if
+    possible, in which case the datasets are refreshed to find new frames.
+    Otherwise the file is closed and reopened each time it is polled.  Entries
+    are read through the GrowingFile, as with an h5py.File, so it can be used
+    as a backing file whose handle stays valid when the file is reopened.
+
+    :param str filename: The hdf5 file.
+    :keyword bool swmr: Attempt to open the file in SWMR mode.
+    :keyword float poll_interval: Seconds between checks for new frames.
+    :keyword float timeout: Seconds to wait for new frames before giving up.
+    :keyword str complete_path: An entry in the file that marks the end of
+        the scan.  The scan is complete when the entry exists and, if it is a
+        numeric dataset, is non-zero.
+    """
+
+    def __init__(self, filename, swmr=True, poll_interval=1.0, timeout=600,
+                 complete_path=None):
+        self.filename = filename
+        self.swmr = swmr
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.complete_path = complete_path
+        self.file = None
+        self.datasets = []
+        self.__open()
+
+    def __open(self):
+        if self.swmr:
+            try:
+                self.file = h5py.File(
+                    self.filename, 'r', libver='latest', swmr=True)
+            except (IOError, OSError, ValueError) as e:
+                logging.warning("Unable to open %s in SWMR mode (%s), polling "
+                                "the file instead.", self.filename, e)
+                self.swmr = False
+        if not self.swmr:
+            self.file = h5py.File(self.filename, 'r')
+        for dataset in self.datasets:
+            dataset.data = self.file[dataset.path]
+
+    def __getitem__(self, path):
+        return self.file[path]
+
+    def __contains__(self, path):
+        return path in self.file
+
+    def close(self):
+        self.file.close()
+
+    def get_dataset(self, path, n_frames=None, dim=0):
+        """ Get a dataset whose reads wait for data that has not arrived.
+
+        :param str path: Path to the dataset inside the file.
+        :keyword int n_frames: The final length of the growing dimension.
+        :keyword int dim: The dimension the dataset grows along.
+        """
+        dataset = GrowingDataset(self, path, n_frames=n_frames, dim=dim)
+        self.datasets.append(dataset)
+        return dataset
+
+    def refresh(self):
+        """ Update the datasets with any data written since the last call.
+        """
+        if self.swmr:
+            for dataset in self.datasets:
+                dataset.data.refresh()
+        else:
+            self.file.close()
+            self.__open()
+
+    def is_complete(self):
+        """ True if the scan-complete marker has been written. """
+        if not self.complete_path or self.complete_path not in self.file:
+            return False
+        entry = self.file[self.complete_path]
+        if isinstance(entry, h5py.Dataset):
+            if self.swmr:
+                entry.refresh()
+            value = np.asarray(entry[()])
+            if np.issubdtype(value.dtype, np.number) or \
+                    value.dtype == np.bool_:
+                return bool(value.any())
+        return True
+
+    def wait(self, condition, length, msg):
+        """ Poll the file until ``condition()`` is True.
+
+        :param function condition: Returns True when the data has arrived.
+        :param function length: The current length of the data, used to
+            check that the file is still growing.
+        :param str msg: A description of the data, for error messages.
+        """
+        last = (length(), time.time())
+        while not condition():
+            if self.is_complete():
+                self.refresh()
+                if condition():
+                    return
+                raise Exception("The scan completed before %s arrived in %s."
+                                % (msg, self.filename))
+            if time.time() - last[1] > self.timeout:
+                raise Exception("Timed out after %s seconds waiting for %s in"
+                                " %s." % (self.timeout, msg, self.filename))
+            time.sleep(self.poll_interval)
+            self.refresh()
+            if length() != last[0]:
+                last = (length(), time.time())
+
+
+class GrowingDataset(object):
+    """ A dataset in a GrowingFile, that appears to have its final shape.
+    Reads block until the frames they require have been written. """
+
+    def __init__(self, gfile, path, n_frames=None, dim=0):
+        self.gfile = gfile
+        self.path = path
+        self.dim = dim
+        self.data = gfile.file[path]
+        shape = list(self.data.shape)
+        if n_frames is not None:
+            shape[dim] = n_frames
+        self.shape = tuple(shape)
+        self.dtype = self.data.dtype
+        self.ndim = len(shape)
+
+    def __getitem__(self, idx):
+        self.wait_for(self.__get_last_frame(idx) + 1)
+        return self.data[idx]
+
+    def get_available(self):
+        """ The number of frames currently in the file. """
+        return self.data.shape[self.dim]
+
+    def wait_for(self, n_frames):
+        """ Wait until at least ``n_frames`` frames are in the file. """
+        if self.get_available() >= n_frames:
+            return
+        logging.debug("Waiting for frame %d of %s", n_frames - 1, self.path)
+        self.gfile.wait(lambda: self.get_available() >= n_frames,
+                        self.get_available,
+                        "frame %d of %s" % (n_frames - 1, self.path))
+
+    def __get_last_frame(self, idx):
+        idx = idx if isinstance(idx, tuple) else (idx,)
+        if any(i is Ellipsis for i in idx[:self.dim + 1]):
+            return self.shape[self.dim] - 1
+        if len(idx) <= self.dim:
+            return self.shape[self.dim] - 1
+        idx = idx[self.dim]
+        if isinstance(idx, slice):
+            frames = range(*idx.indices(self.shape[self.dim]))
+            return max(frames) if len(frames) else -1
+        frames = np.asarray(idx)
+        if frames.dtype == np.bool_:
+            frames = np.flatnonzero(frames)
+        frames = np.where(frames < 0, frames + self.shape[self.dim], frames)
+        return int(frames.max()) if frames.size else -1
@@ -0,0 +1,84 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: synthetic_data_utils
+   :platform: Unix
+   :synopsis: Utilities for loaders that generate synthetic data in parallel.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import itertools
+import numpy as np
+
+# the approximate size of a block of generated data
+BLOCK_BYTES = 64*1024**2
+
+
+def get_blocks(shape, chunks, slice_dims, itemsize, max_bytes=BLOCK_BYTES):
+    """ Split a dataset into blocks that are aligned with its chunks.
+
+    Each block spans all the core dimensions and a whole number of chunks
+    along each slice dimension.  The block grows along the first slice
+    dimension, up to ``max_bytes``.
+
+    :param tuple shape: The dataset shape.
+    :param tuple chunks: The dataset chunks.
+    :param tuple slice_dims: The slice dimensions of the generation pattern.
+    :param int itemsize: The number of bytes per data item.
+    :returns: A list of slice lists, one per block.
+    """
+    chunks = chunks if chunks else shape
+    block = [chunks[d] if d in slice_dims else shape[d]
+             for d in range(len(shape))]
+    first = slice_dims[0]
+    nbytes = itemsize*np.prod(block)
+    block[first] *= max(1, int(max_bytes // nbytes))
+    block[first] = min(block[first], shape[first])
+
+    starts = [range(0, shape[d], block[d]) if d in slice_dims else [0]
+              for d in range(len(shape))]
+    return [[slice(s, min(s + block[d], shape[d]))
+             for d, s in enumerate(start)]
+            for start in itertools.product(*starts)]
+
+
+def get_process_blocks(blocks, n_processes, rank):
+    """ Split the blocks into contiguous groups, one per process, and return
+    the group belonging to this process. """
+    idx = np.array_split(np.arange(len(blocks)), n_processes)[rank]
+    return [blocks[i] for i in idx]
+
+
+def get_frame_seeds(block, shape, slice_dims, seed):
+    """ Get a random number generator for each frame in a block.
+
+    Seeding by frame index, rather than by block, makes the generated data
+    independent of the chunking and the number of processes.
+
+    :returns: A list of (slice list relative to the block, RandomState)
+        pairs.
+    """
+    frame_shape = [shape[d] for d in slice_dims]
+    ranges = [range(block[d].start, block[d].stop) for d in slice_dims]
+    frames = []
+    for frame in itertools.product(*ranges):
+        idx = int(np.ravel_multi_index(frame, frame_shape))
+        local = [slice(None)]*len(shape)
+        for d, f in zip(slice_dims, frame):
+            local[d] = slice(f - block[d].start, f - block[d].start + 1)
+        frames.append((tuple(local), np.random.RandomState([seed, idx])))
+    return frames
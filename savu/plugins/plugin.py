@@ -21,11 +21,11 @@
 
 """
 
-import copy
 import logging
 import numpy as np
 
 import savu.plugins.utils as pu
+import savu.data.data_structures.utils as dsu
 from savu.plugins.plugin_datasets import PluginDatasets
 
 
@@ -195,21 +195,21 @@ class Plugin(PluginDatasets):
         in_meta_data, out_meta_data = self.get()
         copy_dict = {}
         for mData in in_meta_data:
-            temp = copy.deepcopy(mData.get_dictionary())
-            copy_dict.update(temp)
+            # entries are shared and copied on write
+            copy_dict.update(mData._get_shared_dictionary())
 
         for i in range(len(out_meta_data)):
             temp = copy_dict.copy()
             for key in remove_keys[i]:
                 if temp.get(key, None) is not None:
                     del temp[key]
-            temp.update(out_meta_data[i].get_dictionary())
+            temp.update(out_meta_data[i]._get_shared_dictionary())
             out_meta_data[i]._set_dictionary(temp)
 
     def __set_previous_patterns(self):
         for data in self.get_out_datasets():
             data._set_previous_pattern(
-                copy.deepcopy(data._get_plugin_data().get_pattern()))
+                dsu._copy_patterns(data._get_plugin_data().get_pattern()))
 
     def __remove_axis_data(self):
         """
@@ -0,0 +1,255 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: plugin_cache
+   :platform: Unix
+   :synopsis: A persistent index of the available plugins and a cache of the \
+       parsed plugin tools docstrings, to avoid importing every plugin module \
+       and parsing every parameter docstring at start up.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import sys
+import copy
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+
+import savu
+from savu.version import __version__
+
+# increment if the layout of the plugin index, or the output of the docstring
+# parser, changes
+INDEX_VERSION = 2
+DOCSTRING_VERSION = 1
+
+_docstrings = {}
+
+
+def get_cache_dir():
+    """ The folder containing the plugin index and docstring cache, given by
+    the SAVU_CACHE_DIR environment variable (~/.cache/savu by default).
+    Returns None, and caching is switched off, if SAVU_CACHE_DIR is set to an
+    empty string or the folder cannot be created. """
+    path = os.getenv("SAVU_CACHE_DIR",
+                     os.path.join(os.path.expanduser("~"), ".cache", "savu"))
+    if not path:
+        return None
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path
+
+
+def _atomic_write(path, data, mode='wb'):
+    """ Write to a temporary file and rename, so that concurrent processes
+    never see a partially written file. """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.debug("Unable to write to the plugin cache %s: %s", path, e)
+
+
+def get_cached_docstring(doc, parser):
+    """ Parse a docstring with ``parser``, reusing the result of a previous
+    parse of an identical docstring, by the same parser and Savu version, in
+    this or an earlier session.
+
+    :param str doc: The docstring.
+    :param function parser: Function to parse the docstring.
+    :returns: A copy of the parsed docstring.
+    """
+    parser_name = '%s.%s' % (parser.__module__, parser.__qualname__)
+    key = hashlib.sha1('\0'.join(
+        [__version__, str(DOCSTRING_VERSION), parser_name, doc]
+    ).encode('utf-8')).hexdigest()
+    if key not in _docstrings:
+        cache_dir = get_cache_dir()
+        path = os.path.join(cache_dir, 'docstrings', key + '.pickle') \
+            if cache_dir else None
+        try:
+            with open(path, 'rb') as f:
+                _docstrings[key] = pickle.load(f)
+        except Exception:
+            parsed = parser(doc)
+            if not parsed:
+                # don't cache failures, so that the errors are reported again
+                return parsed
+            _docstrings[key] = parsed
+            if path:
+                _atomic_write(path, pickle.dumps(parsed))
+    return copy.deepcopy(_docstrings[key])
+
+
+class LazyPlugin(object):
+    """ A placeholder for a plugin class that is listed in the plugin index
+    but whose module has not yet been imported. """
+
+    def __init__(self, name, module):
+        self.__name__ = name
+        self.__module__ = module
+
+    def load(self):
+        __import__(self.__module__)
+        return getattr(sys.modules[self.__module__], self.__name__)
+
+
+class PluginRegister(dict):
+    """ A dictionary of plugin classes keyed by class name.  Plugins added
+    from the plugin index are only imported when they are first accessed. """
+
+    def __getitem__(self, name):
+        value = super(PluginRegister, self).__getitem__(name)
+        if isinstance(value, LazyPlugin):
+            try:
+                cls = value.load()
+            except Exception:
+                del self[name]
+                raise
+            # importing the module registers the class
+            super(PluginRegister, self).__setitem__(name, cls)
+            return cls
+        return value
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def values(self):
+        return [self[k] for k in list(self.keys())]
+
+    def items(self):
+        return [(k, self[k]) for k in list(self.keys())]
+
+    def add_lazy(self, name, module):
+        """ Add a plugin without importing its module. """
+        if name not in self or self.get_module(name) != module:
+            super(PluginRegister, self).__setitem__(
+                name, LazyPlugin(name, module))
+
+    def get_module(self, name):
+        """ The module containing the plugin, without importing it. """
+        return super(PluginRegister, self).__getitem__(name).__module__
+
+    def is_loaded(self, name):
+        return not isinstance(
+            super(PluginRegister, self).__getitem__(name), LazyPlugin)
+
+
+class PluginIndex(object):
+    """ An on-disk index of the plugin classes defined in each plugin module,
+    and their entries in the other plugin registers (filled by decorators
+    such as dawn_compatible when the module is imported).  An entry is valid
+    while the modification times (or, failing that, the contents) of the
+    plugin module and its tools module are unchanged.  There is an index for
+    each Savu installation, Savu version and Python interpreter. """
+
+    def __init__(self):
+        cache_dir = get_cache_dir()
+        self.key = {'version': INDEX_VERSION, 'savu': savu.__path__[0],
+                    'savu_version': __version__, 'python': sys.executable,
+                    'python_version': sys.version}
+        name = hashlib.sha1(json.dumps(self.key, sort_keys=True).encode(
+            'utf-8')).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, 'plugin_index_%s.json' % name) \
+            if cache_dir else None
+        self.modules = {}
+        self.changed = False
+        self.__load()
+
+    def __load(self):
+        try:
+            with open(self.path, 'r') as f:
+                index = json.load(f)
+        except Exception:
+            return
+        if index.get('key') == self.key:
+            self.modules = index['modules']
+
+    def save(self):
+        """ Write the index to file if it has been modified. """
+        if self.path and self.changed:
+            index = {'key': self.key, 'modules': self.modules}
+            _atomic_write(self.path, json.dumps(index, indent=1), mode='w')
+            self.changed = False
+
+    def get_plugins(self, module_name):
+        """ The plugin classes in a module, if its index entry is up to date.
+
+        :returns: A list of class names, or None if the module is not indexed
+            or has changed.
+        """
+        entry = self.modules.get(module_name)
+        if entry is None:
+            return None
+        for path, stamp in entry['files'].items():
+            current = self.__get_stamp(path, stamp)
+            if current is None or current[2] != stamp[2]:
+                return None
+            if current != stamp:
+                entry['files'][path] = current
+                self.changed = True
+        return entry['plugins']
+
+    def get_registers(self, module_name):
+        """ The register entries of the plugin classes in an indexed module.
+
+        :returns: A dictionary of {register name: {class name: entry}}.
+        """
+        return copy.deepcopy(self.modules[module_name].get('registers', {}))
+
+    def add(self, module_name, plugins, registers=None):
+        """ Add a successfully imported module to the index.
+
+        :param str module_name: The module name.
+        :param list(str) plugins: Names of the plugin classes in the module.
+        :param dict registers: The other registers the plugin classes are
+            added to on import, as {register name: register}.
+        """
+        files = {}
+        for name in [module_name, module_name + '_tools']:
+            mod = sys.modules.get(name)
+            path = getattr(mod, '__file__', None)
+            if path:
+                files[path] = self.__get_stamp(path)
+        registers = {name: {k: copy.deepcopy(v) for k, v in reg.items()
+                            if k in plugins}
+                     for name, reg in (registers or {}).items()}
+        self.modules[module_name] = {'plugins': plugins, 'files': files,
+                                     'registers': registers}
+        self.changed = True
+
+    def __get_stamp(self, path, previous=None):
+        """ The modification time, size and hash of a file.  The hash is only
+        recalculated if the modification time or size differ from
+        ``previous``. """
+        try:
+            stat = os.stat(path)
+            if previous and previous[:2] == [stat.st_mtime_ns, stat.st_size]:
+                return previous
+            with open(path, 'rb') as f:
+                sha = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size, sha]
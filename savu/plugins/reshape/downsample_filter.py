@@ -155,6 +155,10 @@ class DownsampleFilter(Plugin, CpuPlugin):
     def get_min_and_max(self):
         data = self.get_in_datasets()[0]
         pattern = 'VOLUME_XZ'
+        stats = data.meta_data.get_dictionary().get('stats', {})
+        if pattern not in stats.get('min', {}):
+            # fall back to statistics accumulated when the data was written
+            pattern = 'global'
         try:
             self.the_min = np.min(
                 data.meta_data.get(['stats', 'min', pattern]))
@@ -111,6 +111,10 @@ class ImageSaver(BaseImageSaver, CpuPlugin):
     def _get_min_and_max(self):
         data = self.get_in_datasets()[0]
         pattern = self.parameters['pattern']
+        stats = data.meta_data.get_dictionary().get('stats', {})
+        if pattern not in stats.get('min', {}):
+            # fall back to statistics accumulated when the data was written
+            pattern = 'global'
         try:
             self.the_min = np.min(
                 data.meta_data.get(['stats', 'min', pattern]))
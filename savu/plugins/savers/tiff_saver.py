@@ -21,20 +21,109 @@
 
 """
 
+import collections
+import numpy as np
 import tifffile as tf
+from concurrent.futures import ThreadPoolExecutor
 
 from savu.plugins.savers.base_image_saver import BaseImageSaver
 from savu.plugins.utils import register_plugin
 from savu.plugins.driver.cpu_plugin import CpuPlugin
+import savu.core.utils as cu
 
 
 @register_plugin
 class TiffSaver(BaseImageSaver, CpuPlugin):
     def __init__(self, name='TiffSaver'):
         super(TiffSaver, self).__init__(name)
+        self.pool = None
+        self.n_writers = None
+        self.pending = None
+        self.data_range = None
+
+    def setup(self):
+        if self.parameters['multipage']:
+            # one file per block of frames
+            self.max_files = np.inf
+        super(TiffSaver, self).setup()
+
+    def pre_process(self):
+        super(TiffSaver, self).pre_process()
+        self.pData = self.get_plugin_in_datasets()[0]
+        self.sdim = self.pData.get_slice_dimension()
+        self.data_range = self._get_min_and_max()
+        self.n_writers = max(1, self.parameters['n_writers'])
+        self.pool = ThreadPoolExecutor(max_workers=self.n_writers)
+        self.pending = collections.deque()
 
     def process_frames(self, data):
-        frame = self.get_global_frame_index()[self.count]
-        filename = '%s%05i.tiff' % (self.filename, frame)
-        tf.imsave(filename, data[0])
-        self.count += 1
+        index, first = np.unique(
+            self.pData.get_current_frame_idx(), return_index=True)
+        # frames are stacked along the first axis, with any padding removed
+        frames = np.moveaxis(data[0], self.sdim, 0)[first]
+        frames = self._rescale(frames)
+
+        if self.parameters['multipage']:
+            self.__submit('%s%05i.tiff' % (self.filename, index[0]), frames)
+        else:
+            for i, frame in zip(index, frames):
+                self.__submit('%s%05i.tiff' % (self.filename, i), frame)
+
+    def __submit(self, filename, data):
+        # limit the number of frames waiting to be written
+        while len(self.pending) > 2*self.n_writers:
+            self.pending.popleft().result()
+        self.pending.append(self.pool.submit(
+            tf.imsave, filename, data, bigtiff=self.parameters['bigtiff']))
+
+    def post_process(self):
+        try:
+            while self.pending:
+                self.pending.popleft().result()
+        finally:
+            self.pool.shutdown()
+
+    def _rescale(self, frames):
+        """ Downcast the frames to the requested bit depth, using the global
+        data range if it is known and the range of each frame otherwise. """
+        num_bit = self.parameters['num_bit']
+        if num_bit == 32:
+            return np.array(frames, dtype=np.float32)
+        frames = np.nan_to_num(frames)
+        if self.data_range is not None:
+            fmin, fmax = self.data_range
+        else:
+            axes = tuple(range(1, frames.ndim))
+            fmin = frames.min(axis=axes, keepdims=True)
+            fmax = frames.max(axis=axes, keepdims=True)
+        scale = np.where(fmax > fmin, fmax - fmin, 1)
+        frames = np.clip((frames - fmin)/scale, 0, 1)
+        dtype = np.uint16 if num_bit == 16 else np.uint8
+        return (frames*np.iinfo(dtype).max).astype(dtype)
+
+    def _get_min_and_max(self):
+        """ The global range used to downcast the data, from the parameters
+        or the statistics stored with the data. """
+        if self.parameters['num_bit'] == 32:
+            return None
+        data = self.get_in_datasets()[0]
+        stats = data.meta_data.get_dictionary().get('stats', {})
+        pattern = self.parameters['pattern']
+        if pattern not in stats.get('min', {}):
+            pattern = 'global'
+        the_min, the_max = self.parameters['min'], self.parameters['max']
+        if the_min is None and pattern in stats.get('min', {}):
+            the_min = np.min(stats['min'][pattern])
+        if the_max is None and pattern in stats.get('max', {}):
+            the_max = np.max(stats['max'][pattern])
+        if the_min is None or the_max is None:
+            cu.user_message(
+                "No global maximum and minimum found for the data, so each "
+                "frame is rescaled to its own range.  Run the MaxAndMin "
+                "plugin before the TiffSaver, or set the min and max "
+                "parameters, to use a global range.")
+            return None
+        return the_min, the_max
+
+    def get_max_frames(self):
+        return 'multiple'
@@ -15,6 +15,43 @@ class TiffSaverTools(PluginTools):
             dtype: [None,str]
             description: Override the default output tiff file prefix.
             default: None
+        multipage:
+            visibility: intermediate
+            dtype: bool
+            description: Write each block of frames to a single multi-page
+              tiff file, named by the index of its first frame, instead of
+              writing one file per frame.
+            default: False
+        bigtiff:
+            visibility: intermediate
+            dtype: bool
+            description: Write BigTIFF files, which are required for files
+              larger than 4 GB.
+            default: False
+        num_bit:
+            visibility: intermediate
+            dtype: int
+            description: Bit depth of the tiff files (8, 16 or 32). 8 and 16
+              bit data is rescaled using the min and max parameters, or the
+              global range from the MaxAndMin plugin if these are None.
+            default: 32
+            options: [8,16,32]
+        max:
+            visibility: intermediate
+            dtype: [None,float]
+            description: Global max for rescaling the data.
+            default: None
+        min:
+            visibility: intermediate
+            dtype: [None,float]
+            description: Global min for rescaling the data.
+            default: None
+        n_writers:
+            visibility: advanced
+            dtype: int
+            description: The number of background threads writing files
+              while the next block of data is processed.
+            default: 4
         """
     def config_warn(self):
         """Do not use this plugin if the raw data is greater than 100 GB.
@@ -70,9 +70,7 @@ class Hdf5Utils(object):
         return backing_file
 
     def _link_datafile_to_nexus_file(self, data):
-        filename = self.exp.meta_data.get('nxs_filename')
-
-        with h5py.File(filename, 'a') as nxs_file:
+        with self.exp._open_nxs_file() as nxs_file:
             # entry path in nexus file
             name = data.get_name()
             group_name = self.exp.meta_data.get(['group_name', name])
@@ -0,0 +1,197 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: zarr_utils
+   :platform: Unix
+   :synopsis: A chunked directory store, in the Zarr (version 2) format, \
+       that can be written by many processes without any collective \
+       operations.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import bz2
+import json
+import zlib
+import itertools
+import numpy as np
+
+COMPRESSORS = {'zlib': (zlib.compress, zlib.decompress),
+               'bz2': (bz2.compress, bz2.decompress)}
+
+
+def create_group(path, attrs=None):
+    """ Create a zarr group directory, with optional attributes. """
+    if not os.path.exists(path):
+        os.makedirs(path)
+    with open(os.path.join(path, '.zgroup'), 'w') as f:
+        json.dump({'zarr_format': 2}, f)
+    if attrs:
+        with open(os.path.join(path, '.zattrs'), 'w') as f:
+            json.dump(attrs, f, indent=2)
+
+
+class ZarrArray(object):
+    """ A chunked array stored as one file per chunk.
+
+    Each chunk is written independently, so processes writing different
+    chunks need no synchronisation.  The array metadata (.zarray) is only
+    written by :meth:`create`.
+
+    :param str path: The array directory.
+    :param tuple shape: The array shape.
+    :param tuple chunks: The chunk shape.
+    :param dtype: The data type.
+    :keyword str compressor: None, 'zlib' or 'bz2'.
+    :keyword int level: The compression level.
+    """
+
+    def __init__(self, path, shape, chunks, dtype, compressor=None, level=1):
+        if compressor is not None and compressor not in COMPRESSORS:
+            raise Exception("Unknown compressor %s, choose from %s."
+                            % (compressor, list(COMPRESSORS.keys())))
+        self.path = path
+        self.shape = tuple(int(s) for s in shape)
+        self.chunks = tuple(int(min(c, s)) if s else 1
+                            for c, s in zip(chunks, self.shape))
+        self.dtype = np.dtype(dtype)
+        self.compressor = compressor
+        self.level = level
+
+    def create(self):
+        """ Create the array directory and write the array metadata. """
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        compressor = {'id': self.compressor, 'level': self.level} \
+            if self.compressor else None
+        meta = {'zarr_format': 2, 'shape': list(self.shape),
+                'chunks': list(self.chunks), 'dtype': self.dtype.str,
+                'compressor': compressor, 'fill_value': 0, 'order': 'C',
+                'filters': None}
+        with open(os.path.join(self.path, '.zarray'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def get_nchunks(self):
+        """ The number of chunks along each dimension. """
+        return tuple(-(-s // c) for s, c in zip(self.shape, self.chunks))
+
+    def __setitem__(self, sl, data):
+        """ Write data to the region described by a list of slices. """
+        sl = self.__get_region(sl)
+        data = np.asarray(data, dtype=self.dtype).reshape(
+            [s.stop - s.start for s in sl])
+        for idx in self.__get_chunk_indices(sl):
+            csl = self.__get_chunk_slice(idx)
+            overlap = [slice(max(a.start, b.start), min(a.stop, b.stop))
+                       for a, b in zip(sl, csl)]
+            src = tuple(slice(o.start - s.start, o.stop - s.start)
+                        for o, s in zip(overlap, sl))
+            if all(o.stop - o.start == min(c.stop, n) - c.start
+                   for o, c, n in zip(overlap, csl, self.shape)):
+                # the whole chunk is written, so the old values are unused
+                chunk = np.zeros(self.chunks, dtype=self.dtype)
+            else:
+                chunk = self.read_chunk(idx)
+            dst = tuple(slice(o.start - c.start, o.stop - c.start)
+                        for o, c in zip(overlap, csl))
+            chunk[dst] = data[src]
+            self.write_chunk(idx, chunk)
+
+    def __getitem__(self, sl):
+        """ Read the region described by a list of slices. """
+        sl = self.__get_region(sl)
+        out = np.zeros([s.stop - s.start for s in sl], dtype=self.dtype)
+        for idx in self.__get_chunk_indices(sl):
+            csl = self.__get_chunk_slice(idx)
+            overlap = [slice(max(a.start, b.start), min(a.stop, b.stop))
+                       for a, b in zip(sl, csl)]
+            src = tuple(slice(o.start - c.start, o.stop - c.start)
+                        for o, c in zip(overlap, csl))
+            dst = tuple(slice(o.start - s.start, o.stop - s.start)
+                        for o, s in zip(overlap, sl))
+            out[dst] = self.read_chunk(idx)[src]
+        return out
+
+    def write_chunk(self, idx, chunk):
+        """ Write a complete (edge chunks are padded) chunk to file. """
+        buf = np.ascontiguousarray(chunk, dtype=self.dtype).tobytes()
+        if self.compressor:
+            buf = COMPRESSORS[self.compressor][0](buf, self.level)
+        fname = self.__get_chunk_file(idx)
+        # write to a temporary file so a partial chunk is never read
+        with open(fname + '.part', 'wb') as f:
+            f.write(buf)
+        os.rename(fname + '.part', fname)
+
+    def read_chunk(self, idx):
+        """ Read a chunk, or the fill value if it has not been written. """
+        fname = self.__get_chunk_file(idx)
+        if not os.path.exists(fname):
+            return np.zeros(self.chunks, dtype=self.dtype)
+        with open(fname, 'rb') as f:
+            buf = f.read()
+        if self.compressor:
+            buf = COMPRESSORS[self.compressor][1](buf)
+        return np.frombuffer(buf, dtype=self.dtype).reshape(
+            self.chunks).copy()
+
+    def __get_chunk_file(self, idx):
+        return os.path.join(self.path, '.'.join(str(i) for i in idx))
+
+    def __get_chunk_slice(self, idx):
+        return [slice(i*c, (i+1)*c) for i, c in zip(idx, self.chunks)]
+
+    def __get_region(self, sl):
+        sl = sl if isinstance(sl, (list, tuple)) else [sl]
+        sl = list(sl) + [slice(None)]*(len(self.shape) - len(sl))
+        region = []
+        for s, n in zip(sl, self.shape):
+            start, stop, step = s.indices(n)
+            if step != 1:
+                raise Exception("Strided access is not supported.")
+            region.append(slice(start, stop))
+        return region
+
+    def __get_chunk_indices(self, sl):
+        ranges = [range(s.start // c, -(-s.stop // c))
+                  for s, c in zip(sl, self.chunks)]
+        return itertools.product(*ranges)
+
+
+def downsample(array, out, n_processes=1, rank=0):
+    """ Write a 2x downsampled (block mean) copy of one array to another.
+    The output chunks are shared between the processes. """
+    nchunks = out.get_nchunks()
+    for i, idx in enumerate(itertools.product(*[range(n) for n in nchunks])):
+        if i % n_processes != rank:
+            continue
+        osl = [slice(j*c, min((j+1)*c, s))
+               for j, c, s in zip(idx, out.chunks, out.shape)]
+        isl = [slice(2*o.start, min(2*o.stop, s))
+               for o, s in zip(osl, array.shape)]
+        data = array[isl].astype(np.float64)
+        # pad odd lengths by repeating the edge
+        pad = [(0, 2*(o.stop - o.start) - (n.stop - n.start))
+               for o, n in zip(osl, isl)]
+        data = np.pad(data, pad, mode='edge')
+        shape = []
+        for o in osl:
+            shape += [o.stop - o.start, 2]
+        data = data.reshape(shape).mean(axis=tuple(range(1, len(shape), 2)))
+        if np.issubdtype(out.dtype, np.integer):
+            data = np.round(data)
+        out[osl] = data.astype(out.dtype)
@@ -0,0 +1,147 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: zarr_saver
+   :platform: Unix
+   :synopsis: A class to save output to a chunked directory store in the \
+       Zarr format.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import logging
+import numpy as np
+
+from savu.plugins.savers.base_saver import BaseSaver
+from savu.plugins.driver.cpu_plugin import CpuPlugin
+from savu.plugins.utils import register_plugin
+import savu.plugins.savers.utils.zarr_utils as zarr
+
+
+@register_plugin
+class ZarrSaver(BaseSaver, CpuPlugin):
+    def __init__(self, name='ZarrSaver'):
+        super(ZarrSaver, self).__init__(name)
+        self.in_data = None
+        self.data_name = None
+        self.filename = None
+        self.levels = None
+        self.preview = None
+
+    def pre_process(self):
+        self.in_data = self.get_in_datasets()[0]
+        self.data_name = self.in_data.get_name()
+        self.preview = self.__get_preview()
+        self.filename = self.__get_file_name()
+        shape = self.in_data.get_shape()
+        chunks = self.__get_chunks(shape)
+        dtype = self.in_data.data.dtype
+
+        self.levels = []
+        for level in range(self.parameters['pyramid_levels'] + 1):
+            path = os.path.join(self.filename, str(level))
+            self.levels.append(zarr.ZarrArray(
+                path, shape, chunks, dtype,
+                compressor=self.parameters['compression'],
+                level=self.parameters['compression_level']))
+            shape = [-(-s // 2) for s in shape]
+
+        # the metadata is written once, and each process writes its own chunks
+        if self.exp.meta_data.get('process') == 0:
+            logging.debug("creating the directory store %s", self.filename)
+            zarr.create_group(self.filename, self.__get_multiscales())
+            for array in self.levels:
+                array.create()
+        self.exp._barrier(msg='ZarrSaver: directory store created.')
+
+    def process_frames(self, data):
+        self.levels[0][self.__resolve(self.get_current_slice_list()[0])] = \
+            data[0]
+
+    def post_process(self):
+        n_processes = len(self.exp.meta_data.get('processes'))
+        rank = self.exp.meta_data.get('process')
+        for array, out in zip(self.levels[:-1], self.levels[1:]):
+            self.exp._barrier(msg='ZarrSaver: creating %s.' % out.path)
+            zarr.downsample(array, out, n_processes=n_processes, rank=rank)
+        self.exp._barrier(msg='ZarrSaver: finished.')
+
+    def __get_preview(self):
+        """ The preview starts, stops and steps of the input dataset, used
+        to map its slice lists to the indices of the output array. """
+        starts, stops, steps, chunks = \
+            self.in_data.get_preview().get_starts_stops_steps()
+        if any(c != 1 for c in chunks):
+            raise ValueError("The ZarrSaver does not support previews with "
+                             "a chunk greater than one: %s" % chunks)
+        return starts, stops, steps
+
+    def __resolve(self, slice_list):
+        """ Convert a slice list of the input dataset to the slices of the
+        output array. """
+        starts, stops, steps = self.preview
+        resolved = []
+        for dim, sl in enumerate(slice_list):
+            idx = range(*sl.indices(stops[dim]))
+            start = (idx.start - starts[dim]) // steps[dim]
+            resolved.append(slice(start, start + len(idx),
+                                  idx.step // steps[dim]))
+        return tuple(resolved)
+
+    def __get_chunks(self, shape):
+        """ Chunks along the first slice dimension are a whole number of
+        times smaller than the frames transferred and processed together,
+        whose blocks start at multiples of these, so each chunk is written by
+        a single process. """
+        pData = self.get_plugin_in_datasets()[0]
+        slice_dims = self.in_data.get_slice_dimensions()
+        mft = pData.meta_data.get('max_frames_transfer')
+        mfp = pData.meta_data.get('max_frames_process')
+        core = self.parameters['core_chunks']
+        chunks = [min(s, core) for s in shape]
+        for dim in slice_dims:
+            chunks[dim] = 1
+        chunks[slice_dims[0]] = int(np.gcd(mft, mfp))
+        return chunks
+
+    def __get_multiscales(self):
+        axes = [{'name': name} for name in self.in_data.get_axis_label_keys()]
+        datasets = [{'path': str(level), 'coordinateTransformations': [
+            {'type': 'scale', 'scale': [2.0**level]*len(axes)}]}
+            for level in range(len(self.levels))]
+        return {'multiscales': [{'version': '0.4', 'name': self.data_name,
+                                 'axes': axes, 'datasets': datasets}]}
+
+    def get_pattern(self):
+        if self.parameters['pattern'] != 'optimum':
+            return self.parameters['pattern']
+        previous_pattern = self.get_in_datasets()[0].get_previous_pattern()
+        if previous_pattern:
+            return list(previous_pattern.keys())[0]
+        return list(self.get_in_datasets()[0].get_data_patterns().keys())[0]
+
+    def get_max_frames(self):
+        return 'multiple'
+
+    def __get_file_name(self):
+        nPlugin = self.exp.meta_data.get('nPlugin')
+        plugin_dict = \
+            self.exp._get_collection()['plugin_dict'][nPlugin]
+        fname = self.data_name + '_p' + str(nPlugin) + '_' + \
+            plugin_dict['id'].split('.')[-1] + '.zarr'
+        out_path = self.exp.meta_data.get('out_path')
+        return os.path.join(out_path, fname)
@@ -0,0 +1,41 @@
+from savu.plugins.plugin_tools import PluginTools
+
+class ZarrSaverTools(PluginTools):
+    """A class to save data to a chunked directory store in the Zarr
+    format, with one file per chunk.  Each process writes its own chunks,
+    so no parallel hdf5 (MPI-IO) is required.
+    """
+    def define_parameters(self):
+        """
+        pattern:
+            visibility: basic
+            dtype: str
+            description: Optimise data storage to this access pattern.
+              'optimum' will automate this process by choosing the output
+              pattern from the previous plugin, if it exists, else the
+              first pattern.
+            default: 'optimum'
+        compression:
+            visibility: intermediate
+            dtype: [None,str]
+            description: Compress each chunk.
+            default: None
+            options: [None,zlib,bz2]
+        compression_level:
+            visibility: intermediate
+            dtype: int
+            description: The compression level (1 is fastest, 9 is
+              smallest).
+            default: 1
+        pyramid_levels:
+            visibility: intermediate
+            dtype: int
+            description: The number of additional 2x downsampled copies of
+              the data to create, for multiscale visualisation.
+            default: 0
+        core_chunks:
+            visibility: advanced
+            dtype: int
+            description: The maximum chunk length along the core dimensions.
+            default: 256
+        """
@@ -34,11 +34,12 @@ from collections import OrderedDict
 import numpy as np
 
 from savu.plugins.loaders.utils.my_safe_constructor import MySafeConstructor
+from savu.plugins.plugin_cache import PluginRegister
 
 # can I remove these from here?
 
 load_tools = {}
-plugins = {}
+plugins = PluginRegister()
 plugins_path = {}
 dawn_plugins = {}
 count = 0
@@ -30,7 +30,7 @@ from shutil import copyfile
 import shutil
 
 from savu.core.plugin_runner import PluginRunner
-from savu.core.checkpointing import Checkpointing
+from savu.core.checkpointing import Checkpointing, CheckpointIndex
 from savu.core.utils import ensure_string
 from savu.data.experiment_collection import Experiment
 
@@ -225,6 +225,9 @@ class BaseCheckpointTest(object):
             self._create_dataset(f, 'transfer_idx', tidx)
             self._create_dataset(f, 'process_idx', pidx)
             self._create_dataset(f, 'completed_plugins', p_no)
+        # the checkpoint index takes precedence over the checkpoint file
+        index = CheckpointIndex(os.path.dirname(self.cfile), 0)
+        index.write([v if v is not None else 0 for v in [p_no, tidx, pidx]])
 
     def _create_dataset(self, f, name, data):
         if name in list(f.keys()):
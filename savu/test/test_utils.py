@@ -27,6 +27,8 @@ import os
 import copy
 import glob
 import shutil
+import h5py
+import numpy as np
 
 from savu.core.plugin_runner import PluginRunner
 from savu.data.experiment_collection import Experiment
@@ -176,6 +178,15 @@ def set_options(path, **kwargs):
     options['email'] = None
     options['template'] = None
     options['checkpoint'] = None
+    options['stats'] = kwargs.get('stats', False)
+    options['timings'] = kwargs.get('timings', None)
+    options['plan'] = kwargs.get('plan', None)
+    options['stage_dir'] = kwargs.get('stage_dir', None)
+    options['nexus_batch'] = kwargs.get('nexus_batch', False)
+    options['pin'] = kwargs.get('pin', False)
+    options['reconnaissance'] = kwargs.get('reconnaissance', None)
+    options['reconnaissance_angles'] = \
+        kwargs.get('reconnaissance_angles', None)
     options['system_params'] = None
     options['nPlugin'] = 0
     options['command'] = ''
@@ -204,12 +215,75 @@ def load_random_data(loader, params, system_params=None, fake=False):
     return plugin_runner(options)
 
 
+def set_random_data_options(size, patterns='tomo', dtype='int16',
+                            params=None, **kwargs):
+    """ Set the options to process random data created by the random hdf5
+    loader.  Any other keyword arguments are passed to set_options.
+
+    :param list size: The shape of the (3D) data.
+    :keyword str patterns: 'tomo' for sinogram and projection patterns, or
+        'volume' for the VOLUME_XZ pattern.
+    :keyword str dtype: The data type.
+    :keyword dict params: Any other loader parameters.
+    :returns: The options and the loader parameters, for set_plugin_list.
+    """
+    options = set_options(get_test_data_path('kinematics_data.nxs'), **kwargs)
+    options['loader'] = 'savu.plugins.loaders.random_hdf5_loader'
+    if patterns == 'tomo':
+        loader = {'axis_labels': ['rotation_angle.degrees',
+                                  'detector_y.pixels', 'detector_x.pixels'],
+                  'patterns': ['SINOGRAM.0c.1s.2c', 'PROJECTION.0s.1c.2c']}
+    else:
+        loader = {'axis_labels': ['x.u', 'z.u', 'y.u'],
+                  'patterns': ['VOLUME_XZ.0c.1s.2c']}
+    loader.update({'size': size, 'dtype_': dtype})
+    loader.update(params if params else {})
+    return options, loader
+
+
 def load_test_data(exp_type):
     options = set_experiment(exp_type)
     _add_loader_to_plugin_list(options)
     return plugin_runner(options)
 
 
+def write_nxtomo_file(path, seed=0):
+    """ Write a small NXtomo file of random data, with darks and flats
+    before, and flats after, the 21 projections. """
+    image_key = np.zeros(30, dtype=int)
+    image_key[:3] = 2
+    image_key[3:6] = 1
+    image_key[-3:] = 1
+    state = np.random.RandomState(seed)
+    data = state.randint(10, 1000, (30, 12, 16)).astype(np.uint16)
+    with h5py.File(path, 'w') as f:
+        f['entry1/tomo_entry/data/data'] = data
+        f['entry1/tomo_entry/instrument/detector/image_key'] = image_key
+        f['entry1/tomo_entry/data/rotation_angle'] = np.linspace(0, 180, 30)
+    return path
+
+
+def run_nxtomo_dark_flat_correction(path, **kwargs):
+    """ Run a dark and flat field correction, with a preview, of a file
+    written by write_nxtomo_file.
+
+    :returns: The corrected data and rotation angles.
+    """
+    options = set_options(path, **kwargs)
+    options['loader'] = \
+        'savu.plugins.loaders.full_field_loaders.nxtomo_loader'
+    loader = {'preview': '[:, 2:10, 3:15]', 'dark': [None, None, 1.0],
+              'flat': [None, None, 1.0]}
+    plugin = 'savu.plugins.corrections.dark_flat_field_correction'
+    set_plugin_list(options, plugin, [loader, {}, {}])
+    exp = plugin_runner(options)
+    with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+        result = f['entry/final_result_tomo/data'][...]
+        angles = f['entry/final_result_tomo/rotation_angle'][...]
+    cleanup(options)
+    return result, angles
+
+
 def get_data_object(exp):
     data = exp.index['in_data'][list(exp.index['in_data'].keys())[0]]
     data._set_plugin_data(PluginData(data))
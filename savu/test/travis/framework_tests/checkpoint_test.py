@@ -21,9 +21,20 @@
 
 """
 
+import os
+import h5py
+import shutil
+import tempfile
 import unittest
+from unittest import mock
+import numpy as np
+
 from savu.test import test_utils as tu
 from savu.test.base_checkpoint_test import BaseCheckpointTest
+from savu.core.checkpointing import Checkpointing, CheckpointIndex
+from savu.plugins.basic_operations.no_process_plugin import NoProcessPlugin
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
 
 
 class CheckpointTest(BaseCheckpointTest, unittest.TestCase):
@@ -46,5 +57,84 @@ class CheckpointTest(BaseCheckpointTest, unittest.TestCase):
             tu.get_test_process_path('checkpoint_process2.nxs')
         return options
 
+
+class CheckpointRestartTest(unittest.TestCase):
+
+    def __get_options(self, out_path, checkpoint=None):
+        options, loader = tu.set_random_data_options(
+            [10, 6, 8], params={'seed': 0}, out_path=out_path)
+        options['checkpoint'] = checkpoint
+        plugin = 'savu.plugins.basic_operations.no_process_plugin'
+        tu.set_plugin_list(options, [plugin]*3, [loader, {}, {}, {}, {}])
+        return options
+
+    def __run(self, options):
+        exp = run_protected_plugin_runner(options)
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            return exp, f['entry/final_result_tomo/data'][...]
+
+    def __kill(self, out_path):
+        """ Run the plugin list, killing the run at the end of the second
+        plugin. """
+        killsignal = os.path.join(out_path, 'killsignal')
+        calls = []
+
+        def post_process():
+            calls.append(None)
+            if len(calls) == 2:
+                open(killsignal, 'w').close()
+
+        with mock.patch.object(NoProcessPlugin, 'post_process',
+                               side_effect=post_process):
+            run_protected_plugin_runner(self.__get_options(out_path))
+        self.assertEqual(len(calls), 2)
+        os.remove(killsignal)
+
+    def test_kill_and_restart(self):
+        out_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_path, ignore_errors=True)
+        expected = self.__run(self.__get_options(out_path))[1]
+        shutil.rmtree(out_path)
+
+        for index in [True, False]:
+            os.makedirs(out_path)
+            self.__kill(out_path)
+            # only the first plugin completed before the kill signal
+            folder = os.path.join(out_path, 'checkpoint')
+            self.assertEqual(CheckpointIndex(folder, 0).read(), [1, 0, 0])
+            with h5py.File(os.path.join(
+                    folder, 'process0_checkpoint.h5'), 'r') as f:
+                self.assertEqual(f['completed_plugins'][()], 1)
+            if not index:
+                # restart from the checkpoint file
+                os.remove(CheckpointIndex(folder, 0).path)
+
+            exp, result = self.__run(
+                self.__get_options(out_path, checkpoint='plugin'))
+            self.assertEqual(exp.checkpoint.get_start_values(), (1, 0, 0))
+            np.testing.assert_array_equal(result, expected)
+            shutil.rmtree(out_path)
+
+
+class CheckpointWaitTimeTest(unittest.TestCase):
+
+    def __get_wait_time(self, cost):
+        params = {'checkpoint_interval': 600, 'checkpoint_cost_fraction': 0.01,
+                  'checkpoint_min_interval': 10, 'mpi-io_settings': {}}
+        exp = mock.MagicMock()
+        exp.meta_data.get.side_effect = lambda key: \
+            params[key[1]] if isinstance(key, list) else params
+        checkpoint = Checkpointing(exp)
+        checkpoint._cost = cost
+        return checkpoint._Checkpointing__get_wait_time()
+
+    def test_wait_time(self):
+        # the cost of checkpointing sets the rate...
+        self.assertAlmostEqual(self.__get_wait_time(0.5), 50)
+        # ...between the minimum and maximum intervals
+        self.assertEqual(self.__get_wait_time(0.01), 10)
+        self.assertEqual(self.__get_wait_time(10), 600)
+
+
 if __name__ == "__main__":
     unittest.main()
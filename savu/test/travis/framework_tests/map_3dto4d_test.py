@@ -0,0 +1,90 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: map_3dto4d_test
+   :platform: Unix
+   :synopsis: unittest test class for the Map3dto4dh5 data type
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import unittest
+import numpy as np
+
+import savu.data.data_structures.data_types.map_3dto4d_h5 as map_3dto4d
+from savu.data.data_structures.data_types.map_3dto4d_h5 import Map3dto4dh5
+
+
+class Dataset(object):
+    """ A 3D dataset read from an array. """
+    def __init__(self, array):
+        self.array = array
+        self.shape = array.shape
+        self.dtype = array.dtype
+
+    def __getitem__(self, idx):
+        return self.array[idx]
+
+
+class DataObj(object):
+    def __init__(self, data):
+        self.data = data
+
+
+class Map3dto4dTest(unittest.TestCase):
+
+    def setUp(self):
+        self.n_angles, self.n_scans = 6, 5
+        self.data = np.arange(self.n_angles*self.n_scans*4*3).reshape(
+            self.n_angles*self.n_scans, 4, 3)
+        # the 4D (angle, y, x, scan) view of the 3D data
+        self.expected = np.moveaxis(self.data.reshape(
+            self.n_scans, self.n_angles, 4, 3), 0, -1)
+        self.mapped = Map3dto4dh5(DataObj(Dataset(self.data)), self.n_angles)
+
+    def __check(self, idx):
+        np.testing.assert_array_equal(self.mapped[idx], self.expected[idx])
+
+    def test_getitem(self):
+        for angle_sl in [slice(0, 6), slice(1, 5, 2), slice(3, 4)]:
+            for scan_sl in [slice(0, 5), slice(1, 5, 3), slice(2, 3)]:
+                self.__check((angle_sl, slice(0, 4), slice(1, 3), scan_sl))
+        # integer indices keep their dimension
+        np.testing.assert_array_equal(
+            self.mapped[2, slice(0, 4), slice(0, 3), 1],
+            self.expected[2:3, :, :, 1:2])
+
+    def test_block_patterns_reused(self):
+        # the frames of a transfer share one block pattern
+        for frame in range(self.n_scans):
+            self.__check((slice(0, 6), slice(0, 4), slice(0, 3),
+                          slice(frame, frame + 1)))
+        for frame in range(self.n_angles - 1):
+            self.__check((slice(frame, frame + 2), slice(0, 4), slice(0, 3),
+                          slice(0, 5, 2)))
+        self.assertEqual(len(self.mapped._blocks), 2)
+
+    def test_block_cache_size(self):
+        for n in range(1, self.n_angles + 1):
+            for step in range(1, 4):
+                self.__check((slice(0, n, step), slice(0, 4), slice(0, 3),
+                              slice(0, self.n_scans, step)))
+        self.assertEqual(len(self.mapped._blocks),
+                         map_3dto4d.BLOCK_CACHE_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
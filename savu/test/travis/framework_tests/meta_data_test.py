@@ -0,0 +1,104 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: meta_data_test
+   :platform: Unix
+   :synopsis: unittest test class for the copy-on-write sharing of meta data
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import copy
+import unittest
+import numpy as np
+
+from savu.data.meta_data import MetaData
+
+
+class MetaDataTest(unittest.TestCase):
+
+    def __get_meta_data(self):
+        mData = MetaData()
+        mData.set('rotation_angle', np.arange(10.0))
+        mData.set(['axis_labels', 0], {'rotation_angle': 'degrees'})
+        mData.set('name', 'tomo')
+        return mData
+
+    def test_copy_on_write(self):
+        mData = self.__get_meta_data()
+        new = copy.deepcopy(mData)
+        new.set(['axis_labels', 1], {'detector_x': 'pixels'})
+        new.set('name', 'new')
+        new.get('axis_labels')[0]['rotation_angle'] = 'radians'
+
+        self.assertEqual(mData.get('name'), 'tomo')
+        self.assertEqual(list(mData.get('axis_labels').keys()), [0])
+        self.assertEqual(mData.get(['axis_labels', 0, 'rotation_angle']),
+                         'degrees')
+        self.assertEqual(new.get(['axis_labels', 0, 'rotation_angle']),
+                         'radians')
+
+        # the source is also copied on write
+        mData.set(['axis_labels', 2], {'detector_y': 'pixels'})
+        self.assertNotIn(2, new.get('axis_labels'))
+
+    def test_shared_arrays(self):
+        mData = self.__get_meta_data()
+        angles = mData.get('rotation_angle')
+        new = MetaData()
+        new._set_dictionary(mData._get_shared_dictionary())
+
+        # the array data is stored once and is not copied on read
+        self.assertIs(new.get('rotation_angle'), angles)
+        self.assertTrue(angles.flags.writeable)
+
+        new.set('rotation_angle', angles + 1)
+        np.testing.assert_array_equal(mData.get('rotation_angle'),
+                                      np.arange(10.0))
+        self.assertEqual(new.get('rotation_angle')[0], 1)
+
+    def test_copy_on_write_only(self):
+        mData = self.__get_meta_data()
+        new = copy.deepcopy(mData)
+        shared = {'rotation_angle', 'axis_labels', 'name'}
+
+        # reading the dictionary or an array entry does not copy
+        new.get_dictionary()
+        new.get('rotation_angle')
+        self.assertEqual(new._shared, shared)
+
+        # a top-level set only replaces that entry
+        new.set('angles', 1)
+        self.assertEqual(new._shared, shared)
+        new.set('name', 'new')
+        self.assertEqual(new._shared, shared - {'name'})
+        self.assertIs(new.get('rotation_angle'), mData.get('rotation_angle'))
+
+        # a nested set only copies its top-level entry
+        new.set(['axis_labels', 1], {'detector_x': 'pixels'})
+        self.assertEqual(new._shared, {'rotation_angle'})
+        self.assertNotIn(1, mData.get('axis_labels'))
+
+    def test_delete(self):
+        mData = self.__get_meta_data()
+        new = copy.deepcopy(mData)
+        new.delete('rotation_angle')
+        self.assertNotIn('rotation_angle', new.get_dictionary())
+        self.assertIn('rotation_angle', mData.get_dictionary())
+
+
+if __name__ == "__main__":
+    unittest.main()
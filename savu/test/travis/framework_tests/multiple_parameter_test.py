@@ -23,10 +23,14 @@
 
 """
 
+import h5py
 import unittest
+import numpy as np
 
 import savu.plugins.utils as pu
 import savu.test.test_utils as tu
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
 
 
 class MultipleParameterTest(unittest.TestCase):
@@ -108,5 +112,22 @@ class MultipleParameterTest(unittest.TestCase):
         out_dataset = plugin.get_out_datasets()[0]
         self.assertEqual((160, 1, 160, 2, 3), out_dataset.get_shape())
 
+    def test_parameter_sweep(self):
+        options, loader = tu.set_random_data_options([6, 10, 8], 'volume')
+        params = {'in_datasets': ['tomo'], 'out_datasets': ['tomo'],
+                  'scalar_value': '2.0;3.0;5.0', 'metadata_value': 'max',
+                  'operation': 'multiplication'}
+        plugin = 'savu.plugins.basic_operations.arithmetic_operations'
+        tu.set_plugin_list(options, plugin, [loader, params, {}])
+        exp = run_protected_plugin_runner(options)
+
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            data = f['entry/final_result_tomo/data'][...]
+        self.assertEqual((6, 10, 8, 3), data.shape)
+        # every parameter value is applied to the same input
+        np.testing.assert_allclose(data[..., 1], data[..., 0]*1.5)
+        np.testing.assert_allclose(data[..., 2], data[..., 0]*2.5)
+        tu.cleanup(options)
+
 if __name__ == "__main__":
     unittest.main()
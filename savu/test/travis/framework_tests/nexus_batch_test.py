@@ -0,0 +1,133 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: nexus_batch_test
+   :platform: Unix
+   :synopsis: unittest test class for writing the NeXus file entries in a \
+       single batch
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import h5py
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+
+import savu.test.test_utils as tu
+from savu.core.nexus_batch import NexusBatch
+from savu.data.experiment_collection import Experiment
+from savu.plugins.basic_operations.no_process_plugin import NoProcessPlugin
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+
+class NexusBatchTest(unittest.TestCase):
+
+    def __get_options(self, nexus_batch, **kwargs):
+        options, loader = tu.set_random_data_options(
+            [10, 6, 8], params={'seed': 0}, nexus_batch=nexus_batch, **kwargs)
+        plugin = 'savu.plugins.basic_operations.no_process_plugin'
+        tu.set_plugin_list(options, [plugin, plugin], [loader, {}, {}, {}])
+        return options
+
+    def __run(self, nexus_batch):
+        options = self.__get_options(nexus_batch)
+        exp = run_protected_plugin_runner(options)
+
+        entries = {}
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            f.visit(lambda name: entries.update(
+                {name: self.__describe(f, name)}))
+            result = f['entry/final_result_tomo/data'][...]
+        tu.cleanup(options)
+        return entries, result
+
+    def __describe(self, f, name):
+        link = f.get(name, getlink=True)
+        if isinstance(link, h5py.ExternalLink):
+            return (os.path.basename(link.filename), link.path)
+        attrs = {k: str(v) for k, v in f[name].attrs.items()}
+        if isinstance(f[name], h5py.Dataset) and f[name].dtype.kind != 'O':
+            return attrs, f[name].shape
+        return attrs
+
+    def test_nexus_batch(self):
+        entries, result = self.__run(False)
+        batch_entries, batch_result = self.__run(True)
+        self.assertIn('entry/intermediate', batch_entries)
+        self.assertIn('entry/final_result_tomo/meta_data', batch_entries)
+        self.assertEqual(sorted(batch_entries.keys()), sorted(entries.keys()))
+        for name, value in entries.items():
+            self.assertEqual(batch_entries[name], value, name)
+        np.testing.assert_array_equal(batch_result, result)
+
+    def test_nexus_batch_in_background(self):
+        # the entries of each plugin are not written until the writer has
+        # reached the barrier at the end of the plugin, which would hang if
+        # the other processes were waiting for them
+        write = NexusBatch._NexusBatch__write
+        barrier = Experiment._barrier
+        released = [threading.Event() for i in range(2)]
+        written = []
+        at_barrier = []
+
+        def delayed_write(nxs_batch, batch):
+            plugin = 'input_data' not in batch['entry']
+            if plugin:
+                self.assertTrue(released[len(written)].wait(5))
+            write(nxs_batch, batch)
+            if plugin:
+                written.append(None)
+
+        def plugin_barrier(exp, *args, **kwargs):
+            if kwargs.get('msg') == 'PluginRunner: plugin complete.':
+                at_barrier.append(len(written))
+                released[len(at_barrier) - 1].set()
+            barrier(exp, *args, **kwargs)
+
+        with mock.patch.object(NexusBatch, '_NexusBatch__write',
+                               delayed_write), \
+                mock.patch.object(Experiment, '_barrier', plugin_barrier):
+            entries, result = self.__run(True)
+        self.assertEqual(at_barrier, [0, 1])
+        self.assertEqual(len(written), 2)
+        self.assertIn('entry/final_result_tomo/meta_data', entries)
+
+    def test_nexus_batch_failed_run(self):
+        out_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_path, ignore_errors=True)
+        options = self.__get_options(True, out_path=out_path)
+        # the second plugin fails
+        with mock.patch.object(NoProcessPlugin, 'pre_process',
+                               side_effect=[None, RuntimeError("failed")]):
+            self.assertRaises(RuntimeError, run_protected_plugin_runner,
+                              options)
+
+        # the entries of the input and the completed plugin are written
+        nxs_file = os.path.join(out_path, 'test_processed.nxs')
+        with h5py.File(nxs_file, 'r') as f:
+            self.assertIn('entry/input_data/tomo', f)
+            self.assertIn('entry/intermediate', f)
+            self.assertIn('entry/plugin', f)
+
+
+if __name__ == "__main__":
+    unittest.main()
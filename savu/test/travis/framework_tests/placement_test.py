@@ -0,0 +1,89 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: placement_test
+   :platform: Unix
+   :synopsis: unittest test class for the placement of processes on cores \
+       and memory domains
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import unittest
+
+import savu.test.test_utils as tu
+import savu.core.placement as placement
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+
+class PlacementTest(unittest.TestCase):
+
+    def test_parse_cpulist(self):
+        self.assertEqual(placement.parse_cpulist('0-3,8,10-11\n'),
+                         [0, 1, 2, 3, 8, 10, 11])
+        self.assertEqual(placement.parse_cpulist('5'), [5])
+
+    def test_assign(self):
+        # two sockets with 12 and 8 cpus
+        domains = [(0, list(range(12))), (1, list(range(12, 20)))]
+        self.assertEqual(placement.assign(domains, 1, 0),
+                         (0, list(range(12))))
+        for n_local in [2, 5, 10, 20]:
+            placed = [placement.assign(domains, n_local, r)
+                      for r in range(n_local)]
+            cpus = [c for _, p in placed for c in p]
+            # disjoint, covering all cpus, and each set within one domain
+            self.assertEqual(sorted(cpus), list(range(20)))
+            for number, p in placed:
+                self.assertTrue(set(p).issubset(domains[number][1]))
+        self.assertEqual([p[0] for p in [placement.assign(domains, 5, r)
+                                         for r in range(5)]], [0, 0, 0, 1, 1])
+
+    def test_assign_oversubscribed(self):
+        domains = [(0, [0, 1])]
+        placed = [placement.assign(domains, 3, r)[1] for r in range(3)]
+        self.assertEqual(placed, [[0], [1], [0]])
+        self.assertRaises(ValueError, placement.assign, domains, 3, 3)
+
+    def test_affinity(self):
+        cpus = sorted(os.sched_getaffinity(0))
+        with placement.affinity(cpus[:1]):
+            self.assertEqual(os.sched_getaffinity(0), set(cpus[:1]))
+        self.assertEqual(sorted(os.sched_getaffinity(0)), cpus)
+
+    def test_pinned_run(self):
+        cpus = os.sched_getaffinity(0)
+        environ = os.environ.copy()
+        process_list = 'loaders/random_hdf5_loader_test.nxs'
+        options = tu.initialise_options(
+            'kinematics_data.nxs', None, process_list)
+        options['pin'] = True
+        try:
+            exp = run_protected_plugin_runner(options)
+            placed = exp.meta_data.get('placement')
+            self.assertEqual(os.sched_getaffinity(0), set(placed['cpus']))
+            self.assertEqual(placed['cpus'], placed['node_cpus'])
+        finally:
+            placement.set_affinity(cpus)
+            os.environ.clear()
+            os.environ.update(environ)
+            tu.cleanup(options)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: planner_test
+   :platform: Unix
+   :synopsis: unittest test class for the process list memory and I/O \
+       budget planner
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+
+import savu.test.test_utils as tu
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+
+class PlannerTest(unittest.TestCase):
+
+    def __plan(self, process_names):
+        process_list = 'loaders/random_hdf5_loader_test.nxs'
+        options = tu.initialise_options(
+            'kinematics_data.nxs', None, process_list)
+        fd, filename = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        options['plan'] = filename
+        options['process_names'] = process_names
+        exp = run_protected_plugin_runner(options)
+        with open(filename, 'r') as f:
+            plan = json.load(f)
+        os.remove(filename)
+        return options, exp, plan
+
+    def test_plan(self):
+        options, exp, plan = self.__plan('CPU0,CPU1,CPU2')
+        self.assertEqual(plan['n_processes'], 3)
+        self.assertEqual(len(plan['plugins']), 1)
+        plugin = plan['plugins'][0]
+
+        for d in plugin['in_datasets'] + plugin['out_datasets']:
+            self.assertEqual(d['transfer_bytes'],
+                             np.prod(d['transfer_shape'])*4)
+            self.assertLessEqual(d['transfer_shape'][0], d['shape'][0])
+        self.assertEqual(plugin['read'], plugin['written'])
+        self.assertEqual(plan['peak_memory_per_rank'], plugin['peak_memory'])
+        self.assertEqual(plan['peak_memory_per_node'],
+                         3*plugin['peak_memory'])
+        # the plugin list has not been processed
+        self.assertFalse(os.path.exists(exp.meta_data.get('nxs_filename')))
+        tu.cleanup(options)
+
+    def test_plan_processes(self):
+        frames = []
+        for names in ['CPU0', 'CPU0,CPU1', 'CPU0,CPU1,CPU2,CPU3']:
+            options, exp, plan = self.__plan(names)
+            tu.cleanup(options)
+            d = plan['plugins'][0]['in_datasets'][0]
+            frames.append(d['max_frames_transfer'])
+            # each of the 4*3*4 frames is transferred by one of the processes
+            self.assertGreaterEqual(d['n_transfers']*d['max_frames_transfer']
+                                    * plan['n_processes'], 48)
+        self.assertEqual(frames, sorted(frames, reverse=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
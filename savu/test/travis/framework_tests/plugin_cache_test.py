@@ -0,0 +1,141 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: plugin_cache_test
+   :platform: Unix
+   :synopsis: unittest test class for the plugin index and docstring cache
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import savu.plugins.utils as pu
+import savu.plugins.plugin_cache as pc
+import scripts.config_generator.config_utils as cu
+
+
+class PluginCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.env = os.environ.get("SAVU_CACHE_DIR")
+        self.cache_dir = tempfile.mkdtemp()
+        os.environ["SAVU_CACHE_DIR"] = self.cache_dir
+
+    def tearDown(self):
+        if self.env is None:
+            del os.environ["SAVU_CACHE_DIR"]
+        else:
+            os.environ["SAVU_CACHE_DIR"] = self.env
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_docstring_cache(self):
+        calls = []
+
+        def parser(doc):
+            calls.append(doc)
+            return {'param': {'default': [1, 2]}}
+
+        doc = "param:\n    default: [1, 2]\n"
+        first = pc.get_cached_docstring(doc, parser)
+        first['param']['default'].append(3)
+        pc._docstrings.clear()  # force a read from the cache folder
+        second = pc.get_cached_docstring(doc, parser)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second, {'param': {'default': [1, 2]}})
+
+        # docstrings are parsed again by a new Savu version or parser
+        with mock.patch.object(pc, '__version__', 'new'):
+            pc.get_cached_docstring(doc, parser)
+        self.assertEqual(len(calls), 2)
+
+        def other_parser(doc):
+            calls.append(doc)
+            return {'param': {'default': None}}
+
+        self.assertEqual(pc.get_cached_docstring(doc, other_parser),
+                         {'param': {'default': None}})
+        self.assertEqual(len(calls), 3)
+
+    def test_plugin_index(self):
+        mod_dir = tempfile.mkdtemp(dir=self.cache_dir)
+        path = os.path.join(mod_dir, 'cache_test_module.py')
+        with open(path, 'w') as f:
+            f.write("class CacheTestModule(object):\n    pass\n")
+        sys.path.insert(0, mod_dir)
+        try:
+            __import__('cache_test_module')
+            index = pc.PluginIndex()
+            registers = {'dawn_plugins': {'CacheTestModule': {'rank': 2},
+                                          'Other': {'rank': 3}}}
+            index.add('cache_test_module', ['CacheTestModule'], registers)
+            index.save()
+
+            index = pc.PluginIndex()
+            self.assertEqual(index.get_plugins('cache_test_module'),
+                             ['CacheTestModule'])
+            self.assertEqual(index.get_registers('cache_test_module'),
+                             {'dawn_plugins': {'CacheTestModule': {'rank': 2}}})
+            # there is a separate index for each interpreter
+            with mock.patch.object(sys, 'executable', 'other'):
+                self.assertIsNone(
+                    pc.PluginIndex().get_plugins('cache_test_module'))
+            # a new modification time with the same contents is still valid
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(index.get_plugins('cache_test_module'),
+                             ['CacheTestModule'])
+            with open(path, 'a') as f:
+                f.write("\n\nclass Other(object):\n    pass\n")
+            self.assertIsNone(index.get_plugins('cache_test_module'))
+        finally:
+            sys.path.remove(mod_dir)
+            sys.modules.pop('cache_test_module', None)
+
+    def test_lazy_plugin(self):
+        plugins = pc.PluginRegister()
+        plugins.add_lazy('Plugin', 'savu.plugins.plugin')
+        self.assertFalse(plugins.is_loaded('Plugin'))
+        self.assertEqual(plugins.get_module('Plugin'), 'savu.plugins.plugin')
+
+        from savu.plugins.plugin import Plugin
+        self.assertIs(plugins['Plugin'], Plugin)
+        self.assertTrue(plugins.is_loaded('Plugin'))
+
+    def test_lazy_plugin_registers(self):
+        # the registers filled by the plugin decorators are restored from the
+        # index for plugins whose modules are not imported
+        registers = {'plugins': pu.plugins, 'dawn_plugins': pu.dawn_plugins}
+        for reg in list(registers.values()) + [sys.modules]:
+            self.addCleanup(reg.update, dict.copy(reg))
+            self.addCleanup(reg.clear)
+        cu.populate_plugins()
+        dawn_plugins = dict(pu.dawn_plugins)
+        self.assertIn('ImageInterpolation', dawn_plugins)
+
+        for reg in registers.values():
+            reg.clear()
+        cu.populate_plugins()
+        self.assertFalse(pu.plugins.is_loaded('ImageInterpolation'))
+        self.assertEqual(pu.dawn_plugins, dawn_plugins)
+
+
+if __name__ == "__main__":
+    unittest.main()
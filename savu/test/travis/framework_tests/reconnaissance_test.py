@@ -0,0 +1,65 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: reconnaissance_test
+   :platform: Unix
+   :synopsis: unittest test class for the strided previews of the \
+       reconnaissance mode
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+import savu.test.test_utils as tu
+
+
+class ReconnaissanceTest(unittest.TestCase):
+
+    def setUp(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+        self.in_file = tu.write_nxtomo_file(os.path.join(folder, 'raw.nxs'))
+
+    def __run(self, **kwargs):
+        return tu.run_nxtomo_dark_flat_correction(self.in_file, **kwargs)
+
+    def test_reconnaissance(self):
+        result, angles = self.__run()
+        self.assertEqual(result.shape, (21, 8, 12))
+
+        recon, recon_angles = self.__run(reconnaissance=3)
+        self.assertEqual(recon.shape, (21, 3, 12))
+        np.testing.assert_array_equal(recon, result[:, ::3])
+
+        recon, recon_angles = self.__run(reconnaissance=3,
+                                         reconnaissance_angles=5)
+        self.assertEqual(recon.shape, (5, 3, 12))
+        np.testing.assert_array_equal(recon, result[::5, ::3])
+        np.testing.assert_array_equal(recon_angles, angles[::5])
+
+    def test_within_budget(self):
+        result, _ = self.__run()
+        recon, _ = self.__run(reconnaissance=8, reconnaissance_angles=30)
+        np.testing.assert_array_equal(recon, result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: resident_data_test
+   :platform: Unix
+   :synopsis: unittest test class for datasets held in memory between \
+       iterations
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import time
+import h5py
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from mpi4py import MPI
+
+from savu.data.meta_data import MetaData
+from savu.data.data_structures.resident_data import ResidentData
+from savu.plugins.driver.iterative_plugin import IterativePlugin
+
+
+class ResidentDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.f = h5py.File(os.path.join(self.tmpdir, 'test.h5'), 'w')
+        self.f.create_dataset('data', data=np.zeros((10, 4, 6), np.float32))
+        self.data = ResidentData(self.f['data'])
+
+    def tearDown(self):
+        self.f.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_resident_blocks(self):
+        block = np.random.rand(5, 4, 6)
+        self.data[0:5] = block
+        self.data[5:10, :, :] = block + 1
+        # nothing is written to file until the data is flushed
+        self.assertFalse(self.f['data'][...].any())
+        self.assertTrue(self.data._is_resident([slice(-2, 4), slice(None)]))
+        self.assertFalse(self.data._is_resident([slice(3, 7)]))
+        np.testing.assert_allclose(self.data[1:3, 2], block[1:3, 2])
+
+        # a partial overwrite updates the existing block
+        self.data[4:6] = np.full((2, 4, 6), 7)
+        np.testing.assert_array_equal(self.data[4], np.full((4, 6), 7))
+        self.assertRaises(Exception, self.data.__getitem__, slice(3, 7))
+
+        self.data._flush()
+        expected = np.concatenate([block, block + 1]).astype(np.float32)
+        expected[4:6] = 7
+        np.testing.assert_array_equal(self.f['data'][...], expected)
+        np.testing.assert_array_equal(self.data[3:7], expected[3:7])
+
+    def test_not_resident(self):
+        self.data[0:5] = np.ones((5, 4, 6))
+        self.data._set_resident(False)
+        self.data[5:10] = np.full((5, 4, 6), 2)
+        self.assertEqual(self.data._blocks, {})
+        np.testing.assert_array_equal(self.f['data'][4:6, 0, 0], [1, 2])
+
+    def test_write_through_is_independent(self):
+        # a write that cannot be held in memory is made by this process
+        # alone, so must not flush the (possibly mpio) backing file
+        self.data[0:5] = np.ones((5, 4, 6))
+        with mock.patch.object(h5py.File, 'flush') as flush:
+            self.data[5:10:2] = np.full((3, 4, 6), 2)
+            flush.assert_not_called()
+        self.assertFalse(self.data.resident)
+        np.testing.assert_array_equal(self.f['data'][4:7, 0, 0], [1, 2, 0])
+
+
+class ResidentCheckpointTest(unittest.TestCase):
+    """ The collective parts of the iterative plugin driver, with a
+    communicator standing in for the other processes. """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.f = h5py.File(os.path.join(self.tmpdir, 'test.h5'), 'w')
+        self.addCleanup(self.f.close)
+        self.datasets = []
+        for name in ['data', 'data_itr_clone']:
+            data = mock.Mock()
+            data.data = self.f.create_dataset(name, (10, 4, 6), np.float32)
+            self.datasets.append(data)
+
+        self.plugin = IterativePlugin()
+        self.plugin.exp = mock.Mock(meta_data=MetaData())
+        self.plugin.exp.meta_data.set('checkpoint', 'plugin')
+        self.plugin.exp.meta_data.set(
+            'system_params', {'checkpoint_interval': 600})
+        self.plugin._ip_data_dict['iterating'] = \
+            {self.datasets[0]: self.datasets[1]}
+        self.comm = mock.Mock(size=1)
+        self.comm.allreduce.return_value = True
+        self.comm.Split_type.return_value.size = 1
+        self.plugin._communicator = self.comm
+
+    def test_set_resident_datasets(self):
+        self.plugin._IterativePlugin__set_resident_datasets()
+        self.assertTrue(all(isinstance(d.data, ResidentData)
+                            for d in self.datasets))
+        self.comm.allreduce.assert_called_once_with(True, op=MPI.LAND)
+        # the node communicator is released
+        self.comm.Split_type.return_value.Free.assert_called_once_with()
+
+    def test_checkpoint_decided_collectively(self):
+        self.plugin._IterativePlugin__set_resident_datasets()
+        self.comm.reset_mock()
+        data = self.datasets[0].data
+        data[0:5] = np.ones((5, 4, 6))
+
+        # this process is not due to checkpoint, but another process is
+        self.plugin._ip_flush_time = time.time()
+        with mock.patch.object(h5py.File, 'flush') as flush:
+            self.plugin._IterativePlugin__checkpoint_resident_datasets()
+            self.assertEqual(flush.call_count, 2)
+        self.comm.allreduce.assert_called_once_with(False, op=MPI.LOR)
+        np.testing.assert_array_equal(self.f['data'][0:5], 1)
+
+        # no process is due to checkpoint
+        self.comm.allreduce.return_value = False
+        data[5:10] = np.ones((5, 4, 6))
+        with mock.patch.object(h5py.File, 'flush') as flush:
+            self.plugin._IterativePlugin__checkpoint_resident_datasets()
+            flush.assert_not_called()
+        self.assertFalse(self.f['data'][5:10].any())
+
+
+if __name__ == "__main__":
+    unittest.main()
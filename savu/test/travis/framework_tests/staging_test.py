@@ -0,0 +1,71 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: staging_test
+   :platform: Unix
+   :synopsis: unittest test class for the node-local staging of the raw \
+       input data
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+
+import savu.test.test_utils as tu
+from savu.plugins.corrections.dark_flat_field_correction import \
+    DarkFlatFieldCorrection
+
+
+class StagingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        self.in_file = tu.write_nxtomo_file(
+            os.path.join(self.folder, 'raw.nxs'))
+
+    def __run(self, stage_dir=None, **kwargs):
+        result, _ = tu.run_nxtomo_dark_flat_correction(
+            self.in_file, stage_dir=stage_dir, **kwargs)
+        return result
+
+    def test_staging(self):
+        stage_dir = os.path.join(self.folder, 'stage')
+        result = self.__run(stage_dir)
+        self.assertEqual(result.shape, (21, 8, 12))
+        np.testing.assert_array_equal(result, self.__run())
+        # the staged files are removed at the end of the run
+        self.assertEqual(os.listdir(stage_dir), [])
+
+    def test_staging_failed_run(self):
+        stage_dir = os.path.join(self.folder, 'stage')
+        out_path = os.path.join(self.folder, 'out')
+        os.makedirs(out_path)
+        with mock.patch.object(DarkFlatFieldCorrection, 'pre_process',
+                               side_effect=RuntimeError("failed")):
+            self.assertRaises(RuntimeError, self.__run, stage_dir,
+                              out_path=out_path)
+        # the staged files are also removed if the run fails
+        self.assertEqual(os.listdir(stage_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
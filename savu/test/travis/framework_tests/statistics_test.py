@@ -0,0 +1,80 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: statistics_test
+   :platform: Unix
+   :synopsis: unittest test class for the running statistics accumulated by\
+       the transport layer
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import h5py
+import unittest
+import numpy as np
+
+import savu.test.test_utils as tu
+from savu.data.data_structures.statistics import Statistics
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+
+class StatisticsTest(unittest.TestCase):
+
+    def __assert_stats(self, stats, data):
+        values = data[np.isfinite(data)].astype(np.float64)
+        self.assertEqual(stats['count'], values.size)
+        self.assertEqual(stats['min'], values.min())
+        self.assertEqual(stats['max'], values.max())
+        self.assertAlmostEqual(stats['mean'], values.mean())
+        self.assertAlmostEqual(stats['std'], values.std())
+        hist = np.histogram(values, bins=stats['bin_edges'])[0]
+        np.testing.assert_array_equal(stats['histogram'], hist)
+
+    def test_merge_blocks(self):
+        data = np.random.normal(10, 3, (60, 40)).astype(np.float32)
+        data[20:40] *= 1e-3
+        data[3, 4] = np.nan
+        data[5, 6] = -np.inf
+
+        stats = [Statistics(n_bins=64), Statistics(n_bins=64)]
+        stats[0].update(data[:20])
+        stats[1].update(data[20:40])
+        stats[1].update(data[40:])
+        stats[0].merge(stats[1])
+
+        result = stats[0].get_dictionary()
+        self.assertEqual(result['nan_count'], 1)
+        self.assertEqual(result['inf_count'], 1)
+        self.__assert_stats(result, data)
+
+    def test_statistics_in_metadata(self):
+        process_list = 'loaders/random_hdf5_loader_test.nxs'
+        options = tu.initialise_options(
+            'kinematics_data.nxs', None, process_list)
+        options['stats'] = True
+        exp = run_protected_plugin_runner(options)
+
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            entry = f['entry/final_result_tomo']
+            stats = {k: v['global/global'][...]
+                     for k, v in entry['meta_data/stats'].items()}
+            self.__assert_stats(stats, entry['data'][...])
+        tu.cleanup(options)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: timings_test
+   :platform: Unix
+   :synopsis: unittest test class for the plugin timings recorded by the \
+       plugin runner and the benchmark comparison
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import copy
+import json
+import tempfile
+import unittest
+
+import savu.test.test_utils as tu
+from scripts.benchmarks.savu_benchmark import compare, load_cases, CASES, \
+    BASELINE
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+
+class TimingsTest(unittest.TestCase):
+
+    def test_timings_file(self):
+        process_list = 'loaders/random_hdf5_loader_test.nxs'
+        options = tu.initialise_options(
+            'kinematics_data.nxs', None, process_list)
+        fd, filename = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        options['timings'] = filename
+        run_protected_plugin_runner(options)
+
+        with open(filename, 'r') as f:
+            timings = json.load(f)
+        os.remove(filename)
+        tu.cleanup(options)
+
+        self.assertEqual(timings['n_processes'], 1)
+        self.assertGreaterEqual(timings['total'], timings['setup'])
+        self.assertEqual(len(timings['plugins']), 1)
+        plugin = timings['plugins'][0]
+        for phase in ['transfer', 'process', 'return']:
+            self.assertIn(phase, plugin['phases'])
+        for phase in ['transfer', 'return']:
+            self.assertGreater(plugin['bytes'][phase], 0)
+        self.assertGreater(plugin['max_rss'], 0)
+        self.assertGreaterEqual(plugin['max_rss_increase'], 0)
+        self.assertLessEqual(plugin['max_rss_increase'], plugin['max_rss'])
+
+    def test_compare(self):
+        run = {'size': [10, 10, 10], 'total': 10.0, 'setup': 1.0,
+               'plugins': [{'name': 'A', 'time': 5.0, 'max_rss': 1e8,
+                            'max_rss_increase': 0, 'phases': {'process': 4.0}, 'bytes': {}}]}
+        baseline = {'cases': {'case': {'1': run}}}
+        results = copy.deepcopy(baseline)
+        self.assertEqual(compare(results, baseline), [])
+
+        plugin = results['cases']['case']['1']['plugins'][0]
+        plugin['phases']['process'] = 6.0
+        plugin['max_rss'] = 2e8
+        regressions = compare(results, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('case (1 processes) A'))
+
+        # small absolute differences and different sizes are ignored
+        plugin['phases']['process'] = 4.4
+        self.assertEqual(len(compare(results, baseline, min_time=0.5)), 1)
+        results['cases']['case']['1']['size'] = [20, 10, 10]
+        self.assertEqual(compare(results, baseline), [])
+
+    def test_baseline(self):
+        # the reference baseline covers the cases that can run anywhere
+        with open(BASELINE, 'r') as f:
+            baseline = json.load(f)
+        cases = load_cases(CASES)
+        for name, runs in baseline['cases'].items():
+            self.assertIn(name, cases)
+            self.assertEqual(runs['1']['size'], cases[name]['size'])
+            self.assertEqual(compare(baseline, baseline), [])
+
+    def test_load_cases(self):
+        cases = load_cases(CASES)
+        for case in cases.values():
+            self.assertEqual(len(case['size']), 3)
+            self.assertTrue(case['plugins'])
+        self.assertRaises(Exception, load_cases, CASES, ['missing'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,8 +18,14 @@
    :synopsis: Tests for correction plugins
 
 """
+import os
+import h5py
 import unittest
+import numpy as np
+
 from savu.test import test_utils as tu
+from savu.plugins.corrections.time_based_correction import \
+    TimeBasedCorrection
 from savu.test.travis.framework_tests.plugin_runner_test import \
     run_protected_plugin_runner
 
@@ -57,6 +63,59 @@ class CorrectionsTest(unittest.TestCase):
         run_protected_plugin_runner(options)
         tu.cleanup(options)
 
+    def __nearest_frames(self, split_idx, idx_list, value):
+        """ The original frame-by-frame search for the bracketing groups. """
+        list_idx = [value in i for i in split_idx].index(True)
+        val_list = split_idx[list_idx]
+        length = len(val_list)
+        pos = np.where(val_list == value)[0][0]
+        dist = [(length-pos)/float(length), pos/float(length)]
+        new_list = list(np.sort(np.append(idx_list, list_idx)))
+        new_idx = new_list.index(list_idx)
+        entry1 = new_idx-1 if new_idx != 0 else new_idx+1
+        entry2 = new_idx+1 if new_idx != len(new_list)-1 else new_idx-1
+        return [idx_list.index(new_list[entry1]),
+                idx_list.index(new_list[entry2])], dist
+
+    def test_time_based_find_nearest_frames(self):
+        plugin = TimeBasedCorrection()
+        image_key = np.zeros(30, dtype=int)
+        image_key[[3, 4, 17, 29]] = 1
+        image_key[[0, 1, 2, 12, 13]] = 2
+        changes = np.where(np.diff(image_key) != 0)[0] + 1
+        plugin.split_key = np.split(image_key, changes)
+        plugin.split_idx = np.split(np.arange(len(image_key)), changes)
+        values = np.where(image_key == 0)[0]
+
+        for key in [1, 2]:
+            idx_list = list(np.where([key in i for i in plugin.split_key])[0])
+            frames, weights = plugin.find_nearest_frames(idx_list, values)
+            for i, v in enumerate(values):
+                expected = self.__nearest_frames(plugin.split_idx, idx_list, v)
+                self.assertEqual(list(frames[i]), expected[0])
+                np.testing.assert_allclose(weights[i], expected[1])
+
+    def test_time_based_correction_multiple_frames(self):
+        options = tu.set_options(tu.get_test_data_path('kinematics_data.nxs'))
+        options['loader'] = \
+            'savu.plugins.loaders.full_field_loaders.random_3d_tomo_loader'
+        dark, flat = [0, 1, 14, 15], [2, 3, 16, 23, 24]
+        loader = {'size': [25, 6, 7], 'image_key': [dark, flat],
+                  'dtype_': 'int16', 'range': [1, 10]}
+        plugin = 'savu.plugins.corrections.time_based_correction'
+        tu.set_plugin_list(options, plugin, [loader, {}, {}])
+        exp = run_protected_plugin_runner(options)
+
+        # the darks and flats are set to zero and one by the loader
+        in_file = os.path.join(options['out_path'], 'input_array.h5')
+        with h5py.File(in_file, 'r') as f:
+            data = f['test'][...]
+        proj = np.delete(data, dark + flat, axis=0)
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            result = f['entry/final_result_tomo/data'][...]
+        np.testing.assert_allclose(result, proj, rtol=1e-6)
+        tu.cleanup(options)
+
     def test_mtf_deconvolution(self):
         process_list = 'corrections/mtf_deconvolution_test.nxs'
         options = tu.initialise_options(self.data_file, self.experiment,
@@ -20,7 +20,12 @@
 .. moduleauthor:: Mark Basham <scientificsoftware@diamond.ac.uk>
 
 """
+import os
+import h5py
 import unittest
+import numpy as np
+from scipy.ndimage import map_coordinates
+
 from savu.test import test_utils as tu
 from savu.test.travis.framework_tests.plugin_runner_test import \
     run_protected_plugin_runner
@@ -37,6 +42,37 @@ class PluginRunnerDistortionCorrectionTest(unittest.TestCase):
         options = tu.initialise_options(data_file, experiment, process_list)
         run_protected_plugin_runner(options)
         tu.cleanup(options)
-        
+
+    def test_distortion_correction_multiple_frames(self):
+        options, loader = tu.set_random_data_options([12, 30, 40])
+        yc, xc, crop, coeffs = 14.5, 20.2, 2, [1.0, 1e-3, 2e-5]
+        params = {'center_from_top': yc, 'center_from_left': xc,
+                  'polynomial_coeffs': coeffs, 'crop_edges': crop}
+        plugin = 'savu.plugins.corrections.distortion_correction'
+        tu.set_plugin_list(options, plugin, [loader, params, {}])
+        exp = run_protected_plugin_runner(options)
+
+        in_file = os.path.join(options['out_path'], 'input_array.h5')
+        with h5py.File(in_file, 'r') as f:
+            raw = f['test'][...].astype(np.float32)
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            result = f['entry/final_result_tomo/data'][...]
+
+        # the per-frame interpolation that the sparse operator replaces
+        height, width = raw.shape[1:]
+        xu, yu = np.meshgrid(np.arange(width) - xc, np.arange(height) - yc)
+        ru = np.sqrt(xu**2 + yu**2)
+        fact = sum(c*ru**i for i, c in enumerate(coeffs))
+        xd = np.float32(np.clip(xc + fact*xu, 0, width - 1))
+        yd = np.float32(np.clip(yc + fact*yu, 0, height - 1))
+        for frame, res in zip(raw, result):
+            expected = map_coordinates(
+                frame, (yd.reshape(-1, 1), xd.reshape(-1, 1)), order=1,
+                mode='reflect').reshape(height, width)
+            np.testing.assert_allclose(
+                res, expected[crop:-crop, crop:-crop], rtol=1e-5, atol=1e-5)
+        tu.cleanup(options)
+
+
 if __name__ == "__main__":
     unittest.main()
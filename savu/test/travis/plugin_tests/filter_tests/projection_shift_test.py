@@ -0,0 +1,77 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: projection_shift_test
+   :platform: Unix
+   :synopsis: unittest test class for the projection shift plugin
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import unittest
+import numpy as np
+from scipy import ndimage
+
+import savu.test.test_utils as tu
+from savu.plugins.alignment.projection_shift import ProjectionShift
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+
+class ProjectionShiftTest(unittest.TestCase):
+
+    def __get_frames(self, n_frames=10):
+        """ Frames cut from a smooth random image at random (sub-pixel)
+        positions. """
+        state = np.random.RandomState(0)
+        image = ndimage.gaussian_filter(state.rand(160, 180), 1.5)
+        positions = np.cumsum(state.uniform(-2, 2, (n_frames, 2)), axis=0)
+        frames = np.array([ndimage.shift(image, p)[40:120, 40:140]
+                           for p in positions])
+        return frames, positions
+
+    def test_phase_correlation_shifts(self):
+        frames, positions = self.__get_frames()
+        plugin = ProjectionShift()
+        pairs = np.array([(0, 5), (2, 3), (4, 9), (1, 8), (7, 6)])
+        shifts = plugin._phase_correlation_shifts(frames, pairs)
+        expected = positions[pairs[:, 1]] - positions[pairs[:, 0]]
+        np.testing.assert_allclose(shifts, expected, atol=0.25)
+
+    def test_shift_adjustment(self):
+        frames, positions = self.__get_frames()
+        plugin = ProjectionShift()
+        plugin.parameters = {'method': 'phase_correlation'}
+        plugin.A = plugin._calculate_frame_matrix()
+        shifts = plugin._sub_pixel_shift_adjustment(frames)
+        # the shift of each of the middle 8 frames from the previous frame
+        np.testing.assert_allclose(shifts, np.diff(positions, axis=0)[:-1],
+                                   atol=0.25)
+
+    def test_projection_shift(self):
+        options, loader = tu.set_random_data_options([20, 32, 40])
+        plugin = 'savu.plugins.alignment.projection_shift'
+        tu.set_plugin_list(options, plugin, [loader, {}, {}])
+        exp = run_protected_plugin_runner(options)
+
+        meta_data = exp.index['in_data']['tomo'].meta_data
+        self.assertEqual(meta_data.get('proj_align_shift').shape, (20, 2))
+        self.assertTrue(np.isfinite(meta_data.get('proj_align_shift')).all())
+        tu.cleanup(options)
+
+
+if __name__ == "__main__":
+    unittest.main()
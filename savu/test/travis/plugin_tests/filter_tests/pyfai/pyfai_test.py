@@ -21,6 +21,12 @@
 
 """
 import unittest
+import numpy as np
+try:
+    from pyFAI.azimuthalIntegrator import AzimuthalIntegrator
+except ImportError:
+    AzimuthalIntegrator = None
+
 from savu.test import test_utils as tu
 from savu.test.travis.framework_tests.plugin_runner_test import \
     run_protected_plugin_runner
@@ -49,5 +55,31 @@ class PyfaiTest(unittest.TestCase):
         run_protected_plugin_runner(options)
         tu.cleanup(options)
 
+    def test_sparse_integrator(self):
+        process_list = 'pyfai/sparse_azimuthal_integrator_test.nxs'
+        options = tu.initialise_options(data_file, experiment, process_list)
+        run_protected_plugin_runner(options)
+        tu.cleanup(options)
+
+    @unittest.skipUnless(AzimuthalIntegrator, "pyFAI is not installed")
+    def test_sparse_integrator_matches_pyfai(self):
+        from savu.plugins.azimuthal_integrators.sparse_azimuthal_integrator \
+            import SparseAzimuthalIntegrator
+        ai = AzimuthalIntegrator()
+        ai.setFit2D(100, 40, 60, 0, 0, 172, 172, None)
+        ai.set_wavelength(1e-10)
+        shape = (100, 120)
+        frames = np.random.RandomState(0).rand(3, *shape)
+        q_axis, expected = ai.integrate1d(
+            frames[0], 50, unit='q_A^-1', correctSolidAngle=False,
+            method=('no', 'histogram', 'cython'))
+
+        plugin = SparseAzimuthalIntegrator()
+        plugin.parameters = {'solid_angle': False,
+                             'polarisation_factor': None}
+        matrix = plugin._build_integrator(ai, np.zeros(shape), q_axis)
+        remapped = matrix.dot(frames.reshape(3, -1).T).T
+        np.testing.assert_allclose(remapped[0], expected, rtol=1e-4)
+
 if __name__ == "__main__":
     unittest.main()
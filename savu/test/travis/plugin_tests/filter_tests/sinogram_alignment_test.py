@@ -22,13 +22,22 @@
 
 """
 
+import h5py
 import unittest
+import numpy as np
+from scipy import ndimage
+from scipy.optimize import curve_fit
 
 import savu.test.test_utils as tu
+from savu.plugins.alignment.sinogram_alignment import SinogramAlignment
 from savu.test.travis.framework_tests.plugin_runner_test import \
     run_protected_plugin_runner
 
 
+def _sinfunc(x, a, b, c):
+    return a*np.sin(np.deg2rad(x - b)) + c
+
+
 class SinogramAlignmentTest(unittest.TestCase):
     global data_file, experiment
     data_file = '24737.nxs'
@@ -40,5 +49,50 @@ class SinogramAlignmentTest(unittest.TestCase):
         run_protected_plugin_runner(options)
         tu.cleanup(options)
 
+    def __get_sinograms(self, angles, n_frames=3, width=96):
+        """ A gaussian on a sine path, with random jitter in each row. """
+        state = np.random.RandomState(0)
+        cols = np.arange(width)
+        sinos = []
+        for f in range(n_frames):
+            pos = width/2. + 20*np.sin(np.deg2rad(angles - 30*f)) + \
+                state.uniform(-2, 2, angles.size)
+            sinos.append(np.exp(-(cols - pos[:, np.newaxis])**2/20.))
+        return np.array(sinos)
+
+    def test_matches_row_by_row(self):
+        angles = np.linspace(0, 180, 61)
+        sinos = self.__get_sinograms(angles)
+        plugin = SinogramAlignment()
+        com_y = plugin._com_y(sinos)
+        residual = plugin._fit(angles, com_y)
+        shifted = plugin._shift(sinos, residual)
+
+        for i, sino in enumerate(sinos):
+            com = [ndimage.center_of_mass(row)[0] for row in sino]
+            pars = curve_fit(_sinfunc, angles, com, p0=(1, 1, 1))[0]
+            res = _sinfunc(angles, *pars) - com
+            expected = np.vstack([ndimage.shift(row, [r], mode='nearest')
+                                  for row, r in zip(sino, res)])
+            np.testing.assert_allclose(com_y[i], com, atol=1e-10)
+            np.testing.assert_allclose(residual[i], res, atol=1e-5)
+            np.testing.assert_allclose(shifted[i], expected, atol=1e-3)
+
+        # the aligned rows lie on the fitted sine
+        aligned = plugin._fit(angles, plugin._com_y(shifted))
+        np.testing.assert_allclose(aligned, 0, atol=1e-6)
+
+    def test_sinogram_alignment_multiple_frames(self):
+        options, loader = tu.set_random_data_options([61, 4, 48])
+        plugin = 'savu.plugins.alignment.sinogram_alignment'
+        tu.set_plugin_list(options, plugin, [loader, {}, {}])
+        exp = run_protected_plugin_runner(options)
+
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            data = f['entry/final_result_tomo/data'][...]
+        self.assertEqual(data.shape, (61, 4, 48))
+        self.assertTrue(np.isfinite(data).all())
+        tu.cleanup(options)
+
 if __name__ == "__main__":
     unittest.main()
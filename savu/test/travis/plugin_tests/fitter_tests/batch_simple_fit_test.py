@@ -0,0 +1,75 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: batch_simple_fit_test
+   :platform: Unix
+   :synopsis: Test for the batch_simple_fit xrd plugin
+
+.. moduleauthor:: Aaron Parsons <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import unittest
+import numpy as np
+from scipy.optimize import leastsq
+
+from savu.test import test_utils as tu
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+from savu.plugins.fitters.batch_simple_fit import BatchSimpleFit
+
+
+class BatchSimpleFitTest(unittest.TestCase):
+
+    def test_batch_simple_fit(self):
+        data_file = tu.get_test_data_path('mm.nxs')
+        process_file = \
+            tu.get_test_process_path('fitters/batch_simple_fit_test_XRD.nxs')
+        run_protected_plugin_runner(tu.set_options(data_file,
+                                                   process_file=process_file))
+
+    def _fit_synthetic(self, shape):
+        plugin = BatchSimpleFit()
+        plugin.parameters = {'max_iterations': 200, 'tolerance': 1.49012e-08}
+        plugin.axis = np.linspace(0, 1, 200)
+        plugin.positions = np.array([0.3, 0.7])
+        plugin.model = plugin.get_batch_fit_function(shape)
+
+        rng = np.random.RandomState(0)
+        nspectra = 20
+        truth = np.hstack([rng.uniform(1, 5, (nspectra, 2)),
+                           rng.uniform(0.02, 0.08, (nspectra, 2))])
+        spectra = plugin._batch_spectrum(truth)
+        start = np.hstack([spectra[:, [60, 139]], np.full((nspectra, 2), 0.05)])
+        fitted = plugin.batch_leastsq(start, spectra)
+        return plugin, truth, spectra, start, fitted
+
+    def test_batch_leastsq_gaussian(self):
+        plugin, truth, spectra, start, fitted = \
+            self._fit_synthetic('gaussian')
+        np.testing.assert_allclose(np.abs(fitted), truth, rtol=1e-5)
+
+    def test_batch_leastsq_matches_leastsq(self):
+        plugin, truth, spectra, start, fitted = \
+            self._fit_synthetic('lorentzian')
+        resid = lambda p, y: y - plugin._batch_spectrum(p[None])[0]
+        for i in range(spectra.shape[0]):
+            single = leastsq(resid, start[i], args=(spectra[i],))[0]
+            np.testing.assert_allclose(np.abs(fitted[i]), np.abs(single),
+                                       rtol=1e-4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: nxtomo_stream_loader_test
+   :platform: Unix
+   :synopsis: testing the nxtomo_stream_loader with a file that is written \
+       while the data is processed
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import sys
+import time
+import h5py
+import shutil
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+import numpy as np
+
+from savu.test import test_utils as tu
+from savu.plugins.loaders.utils.growing_file import GrowingFile
+from savu.plugins.loaders.full_field_loaders.nxtomo_stream_loader import \
+    NxtomoStreamLoader
+from savu.test.travis.framework_tests.plugin_runner_test import \
+    run_protected_plugin_runner
+
+# writes 2 darks, 2 flats and the first projection, then the remaining
+# projections (frame value i+2 for projection i) one at a time
+WRITER = """
+import sys, time, h5py, numpy as np
+n_proj = int(sys.argv[2])
+with h5py.File(sys.argv[1], 'w', libver='latest') as f:
+    data = f.create_dataset('entry1/tomo_entry/data/data', (5, 4, 6),
+                            maxshape=(None, 4, 6), chunks=(1, 4, 6),
+                            dtype=np.float32)
+    key = f.create_dataset('entry1/tomo_entry/instrument/detector/image_key',
+                           data=[2, 2, 1, 1, 0], maxshape=(None,), chunks=(8,))
+    done = f.create_dataset('entry1/scan_finished', data=0)
+    data[0:2] = 1
+    data[2:4] = 11
+    data[4] = 2
+    f.swmr_mode = True
+    open(sys.argv[1] + '.ready', 'w').close()
+    for i in range(1, n_proj):
+        time.sleep(0.05)
+        data.resize(5 + i, axis=0)
+        data[4 + i] = i + 2
+        key.resize(5 + i, axis=0)
+        key[4 + i] = 0
+        data.flush()
+        key.flush()
+    done[()] = 1
+    done.flush()
+"""
+
+
+class NxtomoStreamLoaderTest(unittest.TestCase):
+
+    def __start_writer(self, data_file, n_proj):
+        writer = subprocess.Popen(
+            [sys.executable, '-c', WRITER, data_file, str(n_proj)])
+        while not os.path.exists(data_file + '.ready'):
+            self.assertIsNone(writer.poll())
+            time.sleep(0.01)
+        return writer
+
+    def __get_data_file(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir, ignore_errors=True)
+        return os.path.join(tmpdir, 'stream.nxs')
+
+    def __run(self, data_file, n_proj, **kwargs):
+        options = tu.set_options(data_file)
+        self.addCleanup(tu.cleanup, options)
+        options['loader'] = \
+            'savu.plugins.loaders.full_field_loaders.nxtomo_stream_loader'
+        loader = {'n_projections': n_proj, 'poll_interval': 0.01,
+                  'timeout': 60.0, 'complete_path': 'entry1/scan_finished'}
+        loader.update(kwargs)
+        plugin = 'savu.plugins.corrections.dark_flat_field_correction'
+        tu.set_plugin_list(options, plugin, [loader, {}, {}])
+        exp = run_protected_plugin_runner(options)
+
+        with h5py.File(exp.meta_data.get('nxs_filename'), 'r') as f:
+            data = f['entry/final_result_tomo/data'][...]
+        expected = (np.arange(n_proj, dtype=np.float32) + 1)/10.
+        np.testing.assert_allclose(data[:, 0, 0], expected, rtol=1e-6)
+
+    def test_nxtomo_stream_loader(self):
+        n_proj = 20
+        data_file = self.__get_data_file()
+        writer = self.__start_writer(data_file, n_proj)
+        try:
+            self.__run(data_file, n_proj)
+        finally:
+            writer.wait()
+
+    def test_nxtomo_stream_loader_polling(self):
+        # without SWMR the file is reopened each time it is polled, and the
+        # writer adds a projection between polls
+        n_proj = 6
+        data_file = self.__get_data_file()
+        with h5py.File(data_file, 'w') as f:
+            data = f.create_dataset('entry1/tomo_entry/data/data', (5, 4, 6),
+                                    maxshape=(None, 4, 6), dtype=np.float32)
+            data[0:2] = 1
+            data[2:4] = 11
+            data[4] = 2
+            f.create_dataset(
+                'entry1/tomo_entry/instrument/detector/image_key',
+                data=[2, 2, 1, 1, 0], maxshape=(None,))
+            f.create_dataset('entry1/tomo_entry/control/data',
+                             data=np.ones(4 + n_proj))
+            f.create_dataset('entry1/scan_finished', data=0)
+
+        refresh = GrowingFile.refresh
+
+        def write_and_refresh(gfile):
+            gfile.file.close()
+            with h5py.File(data_file, 'a') as f:
+                data = f['entry1/tomo_entry/data/data']
+                key = f['entry1/tomo_entry/instrument/detector/image_key']
+                i = data.shape[0] - 4
+                if i < n_proj:
+                    data.resize(5 + i, axis=0)
+                    data[4 + i] = i + 2
+                    key.resize(5 + i, axis=0)
+                    key[4 + i] = 0
+                f['entry1/scan_finished'][()] = i + 1 >= n_proj
+            refresh(gfile)
+
+        with mock.patch.object(GrowingFile, 'refresh', autospec=True,
+                               side_effect=write_and_refresh) as polls, \
+                mock.patch.object(NxtomoStreamLoader, 'log_warning') as warn:
+            self.__run(data_file, n_proj, swmr=False)
+        self.assertGreaterEqual(polls.call_count, n_proj - 1)
+        # the control data is read through the reopened file
+        self.assertNotIn(mock.call("No Control information available"),
+                         warn.call_args_list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,7 +21,10 @@
 
 """
 import unittest
+import numpy as np
+
 from savu.test import test_utils as tu
+import savu.plugins.loaders.utils.synthetic_data_utils as synth
 from savu.test.travis.framework_tests.plugin_runner_test import \
     run_protected_plugin_runner
 
@@ -36,5 +39,31 @@ class RandomHdf5LoaderTest(unittest.TestCase):
         run_protected_plugin_runner(options)
         tu.cleanup(options)
 
+    def __generate(self, shape, chunks, slice_dims, n_processes):
+        data = np.zeros(shape, dtype=np.int16)
+        sub_size = [1 if i in slice_dims else shape[i]
+                    for i in range(len(shape))]
+        blocks = synth.get_blocks(shape, chunks, slice_dims, 2, max_bytes=200)
+        for rank in range(n_processes):
+            for sl in synth.get_process_blocks(blocks, n_processes, rank):
+                self.assertFalse(data[tuple(sl)].any())
+                for local, state in synth.get_frame_seeds(
+                        sl, shape, slice_dims, 5):
+                    data[tuple(sl)][local] = state.randint(
+                        1, 10, size=sub_size, dtype=np.int16)
+        return data
+
+    def test_parallel_generation(self):
+        shape = (7, 6, 5)
+        data = self.__generate(shape, (2, 6, 5), (0,), 1)
+        self.assertTrue(data.all())
+        # independent of the chunking and the number of processes
+        np.testing.assert_array_equal(
+            data, self.__generate(shape, (3, 6, 5), (0,), 4))
+        data = self.__generate(shape, (2, 6, 1), (0, 2), 3)
+        self.assertTrue(data.all())
+        np.testing.assert_array_equal(
+            data, self.__generate(shape, (7, 6, 2), (0, 2), 2))
+
 if __name__ == "__main__":
     unittest.main()
@@ -23,7 +23,13 @@
 
 """
 
+import os
+import glob
+import h5py
 import unittest
+import numpy as np
+import tifffile as tf
+
 import savu.test.test_utils as tu
 from savu.test.travis.framework_tests.plugin_runner_test import \
         run_protected_plugin_runner
@@ -39,5 +45,33 @@ class TiffSaverTest(unittest.TestCase):
         run_protected_plugin_runner(options)
         tu.cleanup(options)
 
+    def __run_random(self, params):
+        options, loader = tu.set_random_data_options([6, 10, 8], 'volume')
+        plugin = 'savu.plugins.savers.tiff_saver'
+        tu.set_plugin_list(options, plugin, [loader, params, {}])
+        exp = run_protected_plugin_runner(options)
+        out_path = exp.meta_data.get('out_path')
+        with h5py.File(os.path.join(out_path, 'input_array.h5'), 'r') as f:
+            data = np.moveaxis(f['test'][...], 1, 0)
+        files = sorted(glob.glob(os.path.join(out_path, 'TiffSaver_*', '*')))
+        images = [tf.imread(f) for f in files]
+        tu.cleanup(options)
+        return data, images
+
+    def test_tiff_saver_frames(self):
+        data, images = self.__run_random({'pattern': 'VOLUME_XZ'})
+        self.assertEqual(len(images), 10)
+        np.testing.assert_array_equal(np.array(images), data)
+
+    def test_tiff_saver_multipage(self):
+        params = {'pattern': 'VOLUME_XZ', 'multipage': True, 'bigtiff': True,
+                  'num_bit': 16, 'min': 0.0, 'max': 10.0}
+        data, images = self.__run_random(params)
+        self.assertLess(len(images), 10)
+        images = np.concatenate([im.reshape(-1, 6, 8) for im in images])
+        self.assertEqual(images.dtype, np.uint16)
+        np.testing.assert_array_equal(
+            images, (data/10.*65535).astype(np.uint16))
+
 if __name__ == "__main__":
     unittest.main()
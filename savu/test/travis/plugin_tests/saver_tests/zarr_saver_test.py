@@ -0,0 +1,89 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: zarr_saver_test
+   :platform: Unix
+   :synopsis: unittest for the zarr saver
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import glob
+import json
+import h5py
+import unittest
+import numpy as np
+
+import savu.test.test_utils as tu
+import savu.plugins.savers.utils.zarr_utils as zarr
+from savu.test.travis.framework_tests.plugin_runner_test import \
+        run_protected_plugin_runner
+
+
+class ZarrSaverTest(unittest.TestCase):
+
+    def __read_array(self, path):
+        with open(os.path.join(path, '.zarray'), 'r') as f:
+            meta = json.load(f)
+        compressor = meta['compressor']['id'] if meta['compressor'] else None
+        array = zarr.ZarrArray(path, meta['shape'], meta['chunks'],
+                               meta['dtype'], compressor=compressor)
+        return array[[slice(None)]*len(meta['shape'])]
+
+    def test_zarr_saver(self):
+        options, loader = tu.set_random_data_options([6, 11, 8], 'volume')
+        params = {'pattern': 'VOLUME_XZ', 'compression': 'zlib',
+                  'pyramid_levels': 1, 'core_chunks': 4}
+        plugin = 'savu.plugins.savers.zarr_saver'
+        tu.set_plugin_list(options, plugin, [loader, params, {}])
+        exp = run_protected_plugin_runner(options)
+
+        out_path = exp.meta_data.get('out_path')
+        with h5py.File(os.path.join(out_path, 'input_array.h5'), 'r') as f:
+            data = f['test'][...]
+        store = glob.glob(os.path.join(out_path, '*.zarr'))[0]
+        with open(os.path.join(store, '.zattrs'), 'r') as f:
+            datasets = json.load(f)['multiscales'][0]['datasets']
+        self.assertEqual([d['path'] for d in datasets], ['0', '1'])
+
+        np.testing.assert_array_equal(
+            self.__read_array(os.path.join(store, '0')), data)
+        pad = np.pad(data, [(0, 0), (0, 1), (0, 0)], mode='edge')
+        mean = pad.reshape(3, 2, 6, 2, 4, 2).mean(axis=(1, 3, 5))
+        np.testing.assert_allclose(
+            self.__read_array(os.path.join(store, '1')), mean)
+        tu.cleanup(options)
+
+    def test_zarr_saver_strided_preview(self):
+        options, loader = tu.set_random_data_options(
+            [6, 11, 8], 'volume', params={'preview': ['1:6:2', '1:11:3', ':']})
+        params = {'pattern': 'VOLUME_XZ', 'pyramid_levels': 0,
+                  'core_chunks': 4}
+        plugin = 'savu.plugins.savers.zarr_saver'
+        tu.set_plugin_list(options, plugin, [loader, params, {}])
+        exp = run_protected_plugin_runner(options)
+
+        out_path = exp.meta_data.get('out_path')
+        with h5py.File(os.path.join(out_path, 'input_array.h5'), 'r') as f:
+            data = f['test'][1:6:2, 1:11:3, :]
+        store = glob.glob(os.path.join(out_path, '*.zarr'))[0]
+        np.testing.assert_array_equal(
+            self.__read_array(os.path.join(store, '0')), data)
+        tu.cleanup(options)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -108,6 +108,58 @@ def __option_parser(doc=True):
                         dest="dosna_connection_options", help=hide,
                         nargs='+', default=[])
 
+    stats_help = "Accumulate global statistics (min, max, sum, sum of "\
+        "squares, NaN count and a histogram) for each output dataset as it is "\
+        "written, and store them in the dataset metadata."
+    parser.add_argument("--stats", action="store_true", dest="stats",
+                        help=stats_help, default=False)
+
+    timings_help = "Record the time spent in each plugin and processing "\
+        "phase, the bytes moved and the peak memory, in this json file."
+    parser.add_argument("--timings", dest="timings", help=timings_help,
+                        default=None)
+
+    plan_help = "Run the plugin list check only, and write the predicted "\
+        "transfer blocks, peak memory per rank and node, and bytes read and "\
+        "written by each plugin to this json file.  The processes are given "\
+        "by the process names (per node) and --plan_nodes."
+    parser.add_argument("--plan", dest="plan", help=plan_help, default=None)
+    parser.add_argument("--plan_nodes", dest="plan_nodes", type=int,
+                        help="The number of nodes to plan for.", default=1)
+
+    stage_help = "Copy the region of the raw input data read by the process "\
+        "list to this node-local directory (e.g. an SSD or tmpfs) before "\
+        "processing, read it from there and remove it at the end. Every "\
+        "node copies the whole region, so the directory must have room for "\
+        "it on each node."
+    parser.add_argument("--stage", dest="stage_dir", help=stage_help,
+                        default=None)
+
+    nexus_batch_help = "Populate the NeXus file entries and links of each "\
+        "dataset in memory, on a single process and without barriers, and "\
+        "write them to the NeXus file in one batch, in the background, after "\
+        "each plugin."
+    parser.add_argument("--nexus_batch", action="store_true",
+                        dest="nexus_batch", help=nexus_batch_help,
+                        default=False)
+
+    pin_help = "Pin each process, and its threads, to a disjoint set of "\
+        "cores in one memory (NUMA) domain of its node, prefer memory from "\
+        "that domain, and report the placement."
+    parser.add_argument("--pin", action="store_true", dest="pin",
+                        help=pin_help, default=False)
+
+    recon_help = "Reconnaissance mode: process at most this many detector "\
+        "rows (slices), evenly strided within the loader preview, of every "\
+        "dataset in the process list, to check the parameters quickly."
+    parser.add_argument("--reconnaissance", dest="reconnaissance", type=int,
+                        help=recon_help, default=None)
+    recon_angles_help = "In reconnaissance mode, also process at most this "\
+        "many projections, evenly strided within the loader preview."
+    parser.add_argument("--reconnaissance_angles",
+                        dest="reconnaissance_angles", type=int,
+                        help=recon_angles_help, default=None)
+
     check_help = "Continue Savu processing from a checkpoint."
     choices = ['plugin', 'subplugin']
     parser.add_argument("--checkpoint", nargs="?", choices=choices,
@@ -181,6 +233,16 @@ def _set_options(args):
     options["dosna_connection"] = args.dosna_connection
     options["dosna_connection_options"] = args.dosna_connection_options
     options['checkpoint'] = args.checkpoint
+    options['stats'] = args.stats
+    options['timings'] = args.timings
+    options['plan'] = args.plan
+    options['plan_nodes'] = args.plan_nodes
+    options['stage_dir'] = args.stage_dir
+    options['nexus_batch'] = args.nexus_batch
+    options['pin'] = args.pin
+    options['reconnaissance'] = args.reconnaissance
+    options['reconnaissance_angles'] = args.reconnaissance_angles \
+        if args.reconnaissance else None
 
     command_str = " ".join([str(i) for i in sys.argv[1:]])
     command_full = f"savu {command_str}"
@@ -221,7 +283,7 @@ def main(input_args=None):
     try:
         plugin_runner = pRunner(options)
         plugin_runner._run_plugin_list()
-        if options['process'] == 0:
+        if options['process'] == 0 and not options['plan']:
             in_file = plugin_runner.exp.meta_data['nxs_filename']
             citation_extractor.main(in_file=in_file, quiet=True)
     except Exception:
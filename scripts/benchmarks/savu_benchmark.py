@@ -0,0 +1,271 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: savu_benchmark
+   :platform: Unix
+   :synopsis: Run the benchmark process lists on synthetic data, record the \
+       time spent in each plugin and processing phase, and compare the \
+       results with a stored baseline.
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import sys
+import json
+import time
+import yaml
+import shutil
+import socket
+import argparse
+import tempfile
+import importlib
+import subprocess
+
+import h5py
+import numpy as np
+
+from savu.version import __version__
+
+CASES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                     'benchmarks.yml')
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+
+
+def __option_parser(doc=True):
+    parser = argparse.ArgumentParser(
+        prog='savu_benchmark',
+        description='Run the Savu benchmark process lists on synthetic data.')
+    parser.add_argument('-c', '--cases', default=CASES,
+                        help='The yaml file of benchmark cases.')
+    parser.add_argument('-r', '--run', nargs='+', default=None,
+                        help='Only run these cases.')
+    parser.add_argument('-s', '--size', default=None,
+                        help='Override the data size of every case, e.g. '
+                        '1801,128,2560.')
+    parser.add_argument('-n', '--nprocs', default='1',
+                        help='Comma separated list of the number of MPI '
+                        'processes to run each case with.')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Run each case this many times and keep the '
+                        'fastest.')
+    parser.add_argument('--mpirun', default='mpirun',
+                        help='The MPI launcher used for more than one '
+                        'process.')
+    parser.add_argument('-o', '--out', default='benchmark_results.json',
+                        help='The results file.')
+    parser.add_argument('-b', '--baseline', default=BASELINE,
+                        help='A results file to compare against (default: '
+                        'the reference results in %(default)s).  Pass an '
+                        'empty string to skip the comparison.')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.2,
+                        help='The fractional increase over the baseline that '
+                        'is reported as a regression.')
+    parser.add_argument('--min_time', type=float, default=0.5,
+                        help='Ignore time differences smaller than this '
+                        '(seconds).')
+    parser.add_argument('-d', '--tmp', default=None,
+                        help='The folder for the (temporary) data.')
+    return parser if doc else parser.parse_args()
+
+
+def load_cases(filename, names=None):
+    with open(filename, 'r') as f:
+        cases = yaml.safe_load(f)
+    if names:
+        missing = set(names).difference(cases)
+        if missing:
+            raise Exception("Unknown benchmark cases %s" % list(missing))
+        cases = {k: v for k, v in cases.items() if k in names}
+    return cases
+
+
+def get_missing_modules(case):
+    missing = []
+    for module in case.get('requires', []):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            missing.append(module)
+    return missing
+
+
+def create_process_list(case, size, in_file, filename):
+    """ Create a process list file from the case plugin entries, using the
+    configurator, so that unset parameters take their default values. """
+    from scripts.config_generator import config_utils
+    from scripts.config_generator.content import Content
+    content = Content(level='advanced')
+    content.failed = config_utils.populate_plugins()
+    for pos, entry in enumerate(case['plugins']):
+        (name, params), = entry.items()
+        content.add(name, str(pos + 1))
+        for key, value in (params or {}).items():
+            value = str(value).replace('$size', str(list(size)))
+            value = value.replace('$in_file', in_file)
+            content.modify(str(pos + 1), key, value)
+    content.save(filename, check='y')
+
+
+def create_nxtomo_file(filename, size, n_darks=10, n_flats=10, seed=0):
+    """ Create a raw NXtomo file of random projections, with the darks and
+    flats stored in separate datasets. """
+    n_angles, y, x = size
+    state = np.random.RandomState(seed)
+    entry = 'entry1/tomo_entry/'
+    with h5py.File(filename, 'w') as f:
+        f[entry + 'data/rotation_angle'] = np.linspace(0, 180, n_angles)
+        # darks ~100, flats ~10000 and projections in between
+        for path, n, (low, high) in \
+                [('data/data', n_angles, (1000, 9000)),
+                 ('instrument/detector/dark', n_darks, (90, 110)),
+                 ('instrument/detector/flat', n_flats, (9000, 11000))]:
+            dset = f.create_dataset(entry + path, (n, y, x),
+                                    dtype=np.uint16, chunks=(1, y, x))
+            for i in range(n):
+                dset[i] = state.randint(low, high, size=(y, x),
+                                        dtype=np.uint16)
+
+
+def run_case(name, case, size, nprocs, args, tmp):
+    """ Run a case with Savu and return the timings. """
+    folder = tempfile.mkdtemp(dir=tmp, prefix=name + '_')
+    try:
+        process_list = os.path.join(folder, 'process_list.nxs')
+        if case.get('input') == 'nxtomo':
+            in_file = os.path.join(folder, 'raw.nxs')
+            create_nxtomo_file(in_file, size)
+        else:
+            in_file = process_list  # ignored by the loader
+        create_process_list(case, size, in_file, process_list)
+        timings = os.path.join(folder, 'timings.json')
+        names = ','.join('CPU%i' % i for i in range(nprocs))
+        cmd = [sys.executable, '-m', 'savu.tomo_recon', in_file,
+               process_list, folder, '-f', 'out', '-n', names, '-q',
+               '--timings', timings]
+        if nprocs > 1:
+            cmd = args.mpirun.split() + ['-np', str(nprocs)] + cmd
+        start = time.time()
+        subprocess.check_call(cmd, stdout=subprocess.DEVNULL)
+        with open(timings, 'r') as f:
+            results = json.load(f)
+        results['wall'] = time.time() - start
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance=0.2, min_time=0.5):
+    """ Compare results with a baseline and return a list of regressions.
+    Times are regressions if they exceed the baseline by a fraction greater
+    than tolerance and by more than min_time seconds.  The peak memory of
+    the process at the end of a plugin (max_rss) is a regression if it exceeds
+    the baseline by more than the tolerance. """
+    regressions = []
+
+    def check(key, new, old, is_time=True):
+        if old is None or new is None:
+            return
+        if new > old*(1 + tolerance) and (not is_time or new - old > min_time):
+            unit = 's' if is_time else ' bytes'
+            regressions.append("%s: %.3g%s (baseline %.3g%s)"
+                               % (key, new, unit, old, unit))
+
+    for case, runs in results['cases'].items():
+        base_runs = baseline.get('cases', {}).get(case, {})
+        for nprocs, run in runs.items():
+            base = base_runs.get(nprocs)
+            if not base or base.get('size') != run.get('size'):
+                continue
+            key = "%s (%s processes)" % (case, nprocs)
+            check(key + ' total', run['total'], base['total'])
+            check(key + ' setup', run['setup'], base['setup'])
+            for plugin, base_plugin in zip(run['plugins'], base['plugins']):
+                if plugin['name'] != base_plugin['name']:
+                    break
+                pkey = "%s %s" % (key, plugin['name'])
+                check(pkey, plugin['time'], base_plugin['time'])
+                for phase, value in plugin['phases'].items():
+                    check("%s %s" % (pkey, phase), value,
+                          base_plugin['phases'].get(phase))
+                check(pkey + ' max_rss', plugin.get('max_rss'),
+                      base_plugin.get('max_rss'), is_time=False)
+    return regressions
+
+
+def print_results(results):
+    for case, runs in results['cases'].items():
+        for nprocs, run in runs.items():
+            print("\n%s, %s processes: total %.2fs, setup %.2fs"
+                  % (case, nprocs, run['total'], run['setup']))
+            for p in run['plugins']:
+                phases = ', '.join("%s %.2fs" % (k, v)
+                                   for k, v in p['phases'].items())
+                moved = sum(p['bytes'].values())/1e6
+                print("    %-35s %8.2fs (%s), %.1f MB moved, max_rss %.0f MB "
+                      "(+%.0f MB)" % (p['name'], p['time'], phases, moved,
+                                      p['max_rss']/1e6,
+                                      p['max_rss_increase']/1e6))
+
+
+def main():
+    args = __option_parser(doc=False)
+    cases = load_cases(args.cases, args.run)
+    nprocs_list = [int(n) for n in args.nprocs.split(',')]
+
+    results = {'savu_version': __version__, 'host': socket.gethostname(),
+               'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+               'nprocs': nprocs_list, 'cases': {}}
+    for name, case in cases.items():
+        missing = get_missing_modules(case)
+        if missing:
+            print("Skipping %s: %s not available" % (name, missing))
+            continue
+        size = [int(s) for s in args.size.split(',')] if args.size \
+            else case['size']
+        results['cases'][name] = {}
+        for nprocs in nprocs_list:
+            print("Running %s %s with %i processes" % (name, size, nprocs))
+            runs = [run_case(name, case, size, nprocs, args, args.tmp)
+                    for i in range(args.repeat)]
+            run = min(runs, key=lambda r: r['total'])
+            run['size'] = size
+            results['cases'][name][str(nprocs)] = run
+
+    with open(args.out, 'w') as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print("\nResults written to %s" % args.out)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('host') != results['host']:
+            print("\nThe baseline %s was recorded on %s, so differences may "
+                  "be due to the machine." % (args.baseline,
+                                              baseline.get('host')))
+        regressions = compare(results, baseline, tolerance=args.tolerance,
+                              min_time=args.min_time)
+        if regressions:
+            print("\nRegressions compared with %s:" % args.baseline)
+            print('\n'.join("    " + r for r in regressions))
+            sys.exit(1)
+        print("\nNo regressions compared with %s" % args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,7 @@ import importlib.util
 from functools import wraps
 import savu.plugins.utils as pu
 import savu.data.data_structures.utils as du
+from savu.plugins.plugin_cache import PluginIndex
 
 if os.name == "nt":
     from . import win_readline as readline
@@ -114,31 +115,60 @@ def error_catcher(function):
     return error_catcher_wrap_function
 
 
+def _get_plugin_registers():
+    """ The registers, other than pu.plugins, filled by the plugin decorators
+    when a plugin module is imported. """
+    return {'plugins_path': pu.plugins_path, 'dawn_plugins': pu.dawn_plugins}
+
+
 def populate_plugins(error_mode=False, examples=False):
     # load all the plugins
     plugins_paths = pu.get_plugins_paths(examples=examples)
     failed_imports = {}
+    # modules that are unchanged since they were last indexed are not
+    # imported until one of their plugins is used
+    index = PluginIndex()
+    registers = _get_plugin_registers()
 
     for path, name in plugins_paths.items():
         for finder, module_name, is_pkg in pkgutil.walk_packages([path], name):
             if not is_pkg:
-                failed_imports = _load_module(finder, module_name, failed_imports, error_mode)
+                indexed = index.get_plugins(module_name)
+                if indexed is not None:
+                    for clazz in indexed:
+                        pu.plugins.add_lazy(clazz, module_name)
+                    # as if the decorators had run
+                    for reg, entries in \
+                            index.get_registers(module_name).items():
+                        registers[reg].update(entries)
+                else:
+                    failed_imports = _load_module(
+                        finder, module_name, failed_imports, error_mode, index)
+    index.save()
     return failed_imports
 
 
-def _load_module(finder, module_name, failed_imports, error_mode):
+def _load_module(finder, module_name, failed_imports, error_mode, index=None):
+    mod = None
     try:
         # need to ignore loading of plugin.utils as it is emptying the list
         spec = finder.find_spec(module_name)
         mod = importlib.util.module_from_spec(spec)
         sys.modules[spec.name] = mod
         spec.loader.exec_module(mod)
-        # Load the plugin class and ensure the tools file is present
-        plugin = pu.load_class(module_name)()
-        if not plugin.get_plugin_tools():
-            raise OSError(f"Tools file not found.")
-    except Exception as e:
         if _is_registered_plugin(mod):
+            # Load the plugin class and ensure the tools file is present
+            plugin = pu.load_class(module_name)()
+            if not plugin.get_plugin_tools():
+                raise OSError(f"Tools file not found.")
+        if index:
+            index.add(module_name, [k for k in pu.plugins.keys() if
+                                    pu.plugins.is_loaded(k) and
+                                    pu.plugins[k].__module__ == module_name],
+                      _get_plugin_registers())
+    except Exception as e:
+        logging.info("Unable to import %s: %s", module_name, e)
+        if mod is not None and _is_registered_plugin(mod):
             clazz = pu._get_cls_name(module_name)
             failed_imports[clazz] = e
             if error_mode:
@@ -210,17 +240,18 @@ def __get_filtered_plugins(pfilter):
     star_search = \
         pfilter.split("*")[0] if pfilter and "*" in pfilter else False
 
-    for key, value in pu.plugins.items():
+    for key in list(pu.plugins.keys()):
+        # use the module name so that unused plugins are not imported
+        module = pu.plugins.get_module(key)
         if star_search:
             search = '(?i)^' + star_search
-            if re.match(search, value.__name__) or \
-                    re.match(search, value.__module__):
+            if re.match(search, key) or re.match(search, module):
                 key_list.append(key)
-        elif pfilter in value.__module__ or pfilter in value.__name__:
+        elif pfilter in module or pfilter in key:
             key_list.append(key)
         else:
             # Check if the word is present in the file
-            if _search_plugin_file(value.__module__, pfilter):
+            if _search_plugin_file(module, pfilter):
                 key_list.append(key)
 
     key_list.sort()
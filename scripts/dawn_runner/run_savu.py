@@ -6,11 +6,10 @@ It is currently very early in development and will be subject to massive refacto
 '''
 from savu.data.experiment_collection import Experiment
 from savu.data.meta_data import MetaData
-from savu.plugins.utils import get_plugin
+from savu.plugins.utils import load_class
 import savu.plugins.loaders.utils.yaml_utils as yaml
 import os, sys
 import numpy as np
-from copy import deepcopy as copy
 import time
 from collections import OrderedDict
 
@@ -19,19 +18,13 @@ def get_output_rank(path2plugin, inputs, params, persistence):
     sys_path_0_lock = persistence['sys_path_0_lock']
     sys_path_0_lock.acquire()
     try:
-        parameters = {}
-        # slight repack here
-        for key in list(params.keys()):
-            val = params[key]["value"]
-            if type(val)==type(''):
-                val = val.replace('\n','').strip()
-                parameters[key] = val
-        plugin = _savu_setup(path2plugin, inputs, parameters)
-        persistence['plugin_object'] = plugin
+        worker = persistence.setdefault('worker', SavuWorker())
+        rank = worker.get_output_rank(path2plugin, inputs, params)
+        persistence['plugin_object'] = worker.plugin
     finally:
         sys_path_0_lock.release()
 
-    return len(plugin.get_plugin_out_datasets()[0].get_core_dimensions())
+    return rank
 
 
 def runSavu(path2plugin, params, metaOnly, inputs, persistence):
@@ -40,20 +33,14 @@ def runSavu(path2plugin, params, metaOnly, inputs, persistence):
     params - are the savu parameters
     metaOnly - a boolean for whether the data is kept in metadata or is passed as data
     inputs      - is a dictionary of input objects 
+    persistence - is a dictionary that is kept between calls, which holds the
+                  SavuWorker with the plugin that was set up by the last call
     '''
     t1 = time.time()
     sys_path_0_lock = persistence['sys_path_0_lock']
     sys_path_0_set = persistence['sys_path_0_set']
-    plugin_object = persistence['plugin_object']
-    axis_labels = persistence['axis_labels']
-    axis_values = persistence['axis_values']
-    string_key = persistence['string_key']
-    parameters = persistence['parameters']
-    aux = persistence['aux']
     sys_path_0_lock.acquire()
     try:
-        result = copy(inputs)
-
         scriptDir = os.path.dirname(path2plugin)
         sys_path_0 = sys.path[0]
         if sys_path_0_set and scriptDir != sys_path_0:
@@ -63,88 +50,143 @@ def runSavu(path2plugin, params, metaOnly, inputs, persistence):
         else:
             sys.path[0] = scriptDir
             sys_path_0_set = True
-        
-        if not plugin_object:
-            parameters = {}
-                # slight repack here
-            for key in list(params.keys()):
-#                 print "here"
-                val = params[key]["value"]
-                if type(val)==type(''):
-                    val = val.replace('\n','').strip()
-#                 print val
-                parameters[key] = val
-                print(("val: {}".format(val)))
-#             print "initialising the object"
-            plugin_object = _savu_setup(path2plugin, inputs, parameters)
-            persistence['plugin_object'] = plugin_object
-            axis_labels, axis_values = process_init(plugin_object)
-#             print "I did the initialisation"
-#             print "axis labels",axis_labels
-#             print "axis_values", axis_values
-#             print plugin_object
-            chkstring =  [any(isinstance(ix, str) for ix in axis_values[label]) for label in axis_labels]
-            if any(chkstring): # are any axis values strings we instead make this an aux out
-                metaOnly = True
-#                 print "AXIS LABELS"+str(axis_values)
-                string_key = axis_labels[chkstring.index(True)]
-                aux = OrderedDict.fromkeys(axis_values[string_key])
-#                 print aux.keys()
-            else:
-                string_key = axis_labels[0]# will it always be the first one?
-            if not metaOnly:
-                if len(axis_labels) == 1:
-                    result['xaxis']=axis_values[axis_labels[0]]
-                    result['xaxis_title']=axis_labels[0]
-                if len(axis_labels) == 2:
-#                     print "set the output axes"
-                    x = axis_labels[0]
-                    result['xaxis_title']=x
-                    y = axis_labels[1]
-                    result['yaxis_title']=y
-                    result['yaxis']=axis_values[y]
-                    result['xaxis']=axis_values[x]
-        else:
-            pass
+
+        # the worker and its plugin are shared by the calling threads
+        worker = persistence.setdefault('worker', SavuWorker())
+        result = worker.run(path2plugin, params, metaOnly, inputs)
+        persistence['plugin_object'] = worker.plugin
     finally:
         sys_path_0_lock.release()
 
-    if plugin_object.get_max_frames()>1: # we need to get round this since we are frame independant
-        data = np.expand_dims(inputs['data'], 0)
-    else:
-        data = inputs['data']
+    t2 = time.time()
+    print("time to runSavu = "+str((t2-t1)))
+    return result
 
-    print(("metaOnly: {}".format(metaOnly)))
 
-    if not metaOnly: 
+class SavuWorker(object):
+    '''
+    Keeps a plugin set up, with its pre_process state, between calls so that
+    repeated requests on new data only call process_frames.  Each level is
+    only rebuilt when something it depends on has changed:
 
-        out = plugin_object.process_frames([data])
-#         print "ran the plugin"
+    - the plugin class is imported once for each plugin file
+    - the experiment, plugin setup and pre_process are rebuilt if the
+      parameters or the shape, type and axes of the input data change
+    '''
 
-        result['data'] = out
-    elif metaOnly:
-        result['data'] = inputs['data']
-#         print type(result['data'])
-        out_array = plugin_object.process_frames([inputs['data']])
+    def __init__(self):
+        self.classes = {}
+        self.plugin = None
+        self.key = None
+        self.output_rank = None
+        self.axis_labels = None
+        self.axis_values = None
 
-#         print aux.keys()
+    def get_plugin(self, path2plugin, params, inputs):
+        """ The plugin, set up for these parameters and inputs. """
+        path2plugin = path2plugin.split('.py')[0]+'.py'
+        parameters = _get_parameters(params)
+        key = (path2plugin, repr(sorted(parameters.items())),
+               _get_signature(inputs))
+        if key != self.key:
+            if path2plugin not in self.classes:
+                # the plugin tools are imported from the plugin directory
+                if os.path.dirname(path2plugin) not in sys.path:
+                    sys.path.append(os.path.dirname(path2plugin))
+                self.classes[path2plugin] = load_class(path2plugin)
+            plugin_class = self.classes[path2plugin]
+            self.plugin = _savu_setup(plugin_class, dict(inputs), parameters)
+            # the plugin data is cleared by process_init
+            self.output_rank = len(self.plugin.get_plugin_out_datasets()[0]
+                                   .get_core_dimensions())
+            self.axis_labels, self.axis_values = process_init(self.plugin)
+            self.key = key
+        return self.plugin
 
-        for k,key in enumerate(aux.keys()):
-            aux[key]=np.array([out_array[k]])# wow really
+    def get_output_rank(self, path2plugin, inputs, params):
+        """ The number of core dimensions of the plugin output. """
+        self.get_plugin(path2plugin, params, inputs)
+        return self.output_rank
 
-        result['auxiliary'] = aux
-    t2 = time.time()
-    print("time to runSavu = "+str((t2-t1)))
-    return result
+    def run(self, path2plugin, params, metaOnly, inputs):
+        """ Process the input data with the plugin. """
+        result = dict(inputs)
+        plugin_object = self.get_plugin(path2plugin, params, inputs)
+        axis_labels, axis_values = self.axis_labels, self.axis_values
+
+        chkstring = [any(isinstance(ix, str) for ix in axis_values[label])
+                     for label in axis_labels]
+        if any(chkstring): # are any axis values strings we instead make this an aux out
+            metaOnly = True
+            string_key = axis_labels[chkstring.index(True)]
+        else:
+            string_key = axis_labels[0]# will it always be the first one?
+
+        print(("metaOnly: {}".format(metaOnly)))
+
+        if not metaOnly:
+            if len(axis_labels) == 1:
+                result['xaxis'] = axis_values[axis_labels[0]]
+                result['xaxis_title'] = axis_labels[0]
+            if len(axis_labels) == 2:
+                x = axis_labels[0]
+                result['xaxis_title'] = x
+                y = axis_labels[1]
+                result['yaxis_title'] = y
+                result['yaxis'] = axis_values[y]
+                result['xaxis'] = axis_values[x]
+
+            if _is_multi_frame(plugin_object): # we need to get round this since we are frame independant
+                data = np.expand_dims(inputs['data'], 0)
+            else:
+                data = inputs['data']
+            result['data'] = plugin_object.process_frames([data])
+        else:
+            result['data'] = inputs['data']
+            out_array = plugin_object.process_frames([inputs['data']])
+            aux = OrderedDict.fromkeys(axis_values[string_key])
+            for k, key in enumerate(aux.keys()):
+                aux[key] = np.array([out_array[k]])
+            result['auxiliary'] = aux
+        return result
+
+
+def _get_parameters(params):
+    parameters = {}
+    # slight repack here
+    for key in list(params.keys()):
+        val = params[key]["value"]
+        if type(val)==type(''):
+            val = val.replace('\n','').strip()
+        parameters[key] = val
+    return parameters
+
+
+def _get_signature(inputs):
+    """ The properties of the inputs that the plugin setup depends on. """
+    axes = []
+    for name in ['xaxis', 'yaxis']:
+        axis = inputs.get(name)
+        axes.append(None if axis is None else np.asarray(axis).tobytes())
+    return (inputs['dataset_name'], inputs['data'].shape,
+            inputs['data'].dtype.str, inputs.get('xaxis_title'),
+            inputs.get('yaxis_title'), tuple(axes))
+
+
+def _is_multi_frame(plugin):
+    max_frames = plugin.get_max_frames()
+    if isinstance(max_frames, str):
+        return max_frames == 'multiple'
+    return max_frames > 1
 
 
-def _savu_setup(path2plugin, inputs, parameters):
+def _savu_setup(plugin_class, inputs, parameters):
     print("running _savu_setup")
     parameters['in_datasets'] = [inputs['dataset_name']]
     parameters['out_datasets'] = [inputs['dataset_name']]
-    plugin = get_plugin(path2plugin.split('.py')[0]+'.py')
+    plugin = plugin_class()
     plugin.exp = setup_exp_and_data(inputs, inputs['data'], plugin)
-    plugin.set_parameters(parameters)
+    plugin.get_plugin_tools().initialise(parameters)
     plugin._set_plugin_datasets()
     plugin.setup()
     return plugin
@@ -205,6 +247,9 @@ class DawnExperiment(Experiment):
         self.index={"in_data": {}, "out_data": {}, "mapping": {}}
         self.meta_data = MetaData(get_options())
         self.nxs_file = None
+        self.nxs_batch = None
+        # the dataset names are given in the plugin parameters
+        self._dataset_names_complete = True
 
 def get_options():
     options = {}
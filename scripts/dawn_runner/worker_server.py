@@ -0,0 +1,128 @@
+'''
+worker_server
+A long-lived local worker process for the DAWN runner.  The worker keeps the
+plugin, and its pre_process state, set up between requests (see SavuWorker in
+run_savu), so that repeated requests on in-memory arrays only run
+process_frames.
+
+Start a worker with start_worker() or from the command line with
+    SAVU_WORKER_AUTHKEY=<key> python -m scripts.dawn_runner.worker_server
+and send it requests through a WorkerClient.
+'''
+import os
+import sys
+import logging
+import argparse
+import traceback
+import multiprocessing
+from multiprocessing.connection import Listener, Client
+
+from scripts.dawn_runner.run_savu import SavuWorker
+
+
+def serve(address=('localhost', 0), authkey=None, ready=None):
+    '''
+    Serve requests until a client sends 'shutdown'.
+
+    address - the (host, port) to listen on, where port 0 is any free port
+    authkey - the key (bytes) clients must use to connect
+    ready   - called with the address once the worker is listening
+    '''
+    worker = SavuWorker()
+    with Listener(address, authkey=authkey) as listener:
+        if ready:
+            ready(listener.address)
+        running = True
+        while running:
+            with listener.accept() as conn:
+                running = _handle(worker, conn)
+
+
+def _handle(worker, conn):
+    ''' Reply to the requests on a connection until it is closed.  Returns
+    False if the worker should shut down. '''
+    requests = {'run_savu': worker.run,
+                'get_output_rank': worker.get_output_rank}
+    while True:
+        try:
+            name, args = conn.recv()
+        except EOFError:
+            return True
+        if name == 'shutdown':
+            conn.send(('ok', None))
+            return False
+        try:
+            conn.send(('ok', requests[name](*args)))
+        except Exception:
+            logging.error("Worker request %s failed", name)
+            conn.send(('error', traceback.format_exc()))
+
+
+class WorkerClient(object):
+    '''
+    A connection to a worker, with the same requests as run_savu (without the
+    persistence dictionary, which is held by the worker).
+    '''
+
+    def __init__(self, address, authkey):
+        self.conn = Client(address, authkey=authkey)
+
+    def __request(self, name, *args):
+        self.conn.send((name, args))
+        status, value = self.conn.recv()
+        if status == 'error':
+            raise RuntimeError("The worker request %s failed:\n%s"
+                               % (name, value))
+        return value
+
+    def run_savu(self, path2plugin, params, metaOnly, inputs):
+        return self.__request('run_savu', path2plugin, params, metaOnly,
+                              inputs)
+
+    def get_output_rank(self, path2plugin, inputs, params):
+        return self.__request('get_output_rank', path2plugin, inputs, params)
+
+    def shutdown(self):
+        self.__request('shutdown')
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+
+def start_worker(authkey=None, address=('localhost', 0)):
+    '''
+    Start a worker in a new process.
+
+    Returns the process and a connected WorkerClient.
+    '''
+    authkey = authkey or os.urandom(32)
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve, args=(address, authkey, queue.put), daemon=True)
+    process.start()
+    return process, WorkerClient(queue.get(), authkey)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="A persistent worker for the Savu DAWN runner.")
+    parser.add_argument("--host", default='localhost',
+                        help="The host name to listen on.")
+    parser.add_argument("--port", type=int, default=0,
+                        help="The port to listen on (default: any free port).")
+    args = parser.parse_args()
+    authkey = os.environ.get('SAVU_WORKER_AUTHKEY')
+    if not authkey:
+        parser.error("Set the SAVU_WORKER_AUTHKEY environment variable to "
+                     "the key the clients will use.")
+
+    def ready(address):
+        print("Savu worker listening on %s:%i" % address)
+        sys.stdout.flush()
+
+    serve((args.host, args.port), authkey.encode(), ready)
+
+
+if __name__ == '__main__':
+    main()
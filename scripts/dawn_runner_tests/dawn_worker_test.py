@@ -0,0 +1,107 @@
+# Copyright 2014 Diamond Light Source Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+.. module:: dawn_worker_test
+   :platform: Unix
+   :synopsis: unittest test class for the persistent DAWN runner worker
+
+.. moduleauthor:: Nicola Wadeson <scientificsoftware@diamond.ac.uk>
+
+"""
+
+import os
+import threading
+import unittest
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+import savu
+import scripts.dawn_runner.run_savu as rs
+from scripts.dawn_runner.worker_server import start_worker
+
+PLUGIN = os.path.join(os.path.dirname(savu.__file__), 'plugins', 'filters',
+                      'band_pass.py')
+
+
+class DawnWorkerTest(unittest.TestCase):
+
+    def __inputs(self, shape=(20, 30), seed=0):
+        data = np.random.RandomState(seed).rand(*shape).astype(np.float32)
+        return {'data': data, 'dataset_name': 'tomo', 'xaxis_title': None,
+                'yaxis_title': None, 'xaxis': None, 'yaxis': None}
+
+    def __params(self, width):
+        return {'blur_width': {'value': [0, width, width]},
+                'type': {'value': 'Low'}}
+
+    def __expected(self, inputs, width):
+        return gaussian_filter(inputs['data'][np.newaxis], (0, width, width))
+
+    def test_warm_plugin(self):
+        persistence = {'sys_path_0_lock': threading.Lock(),
+                       'sys_path_0_set': False}
+        inputs = self.__inputs()
+        result = rs.runSavu(PLUGIN, self.__params(3), False, inputs,
+                            persistence)
+        np.testing.assert_allclose(result['data'],
+                                   self.__expected(inputs, 3), rtol=1e-6)
+        plugin = persistence['plugin_object']
+
+        # new data of the same shape reuses the plugin
+        inputs = self.__inputs(seed=1)
+        result = rs.runSavu(PLUGIN, self.__params(3), False, inputs,
+                            persistence)
+        self.assertIs(persistence['plugin_object'], plugin)
+        np.testing.assert_allclose(result['data'],
+                                   self.__expected(inputs, 3), rtol=1e-6)
+
+        # a parameter or shape change rebuilds it
+        result = rs.runSavu(PLUGIN, self.__params(2), False, inputs,
+                            persistence)
+        self.assertIsNot(persistence['plugin_object'], plugin)
+        np.testing.assert_allclose(result['data'],
+                                   self.__expected(inputs, 2), rtol=1e-6)
+        plugin = persistence['plugin_object']
+        rs.runSavu(PLUGIN, self.__params(2), False, self.__inputs((10, 30)),
+                   persistence)
+        self.assertIsNot(persistence['plugin_object'], plugin)
+
+    def test_worker_server(self):
+        process, client = start_worker()
+        try:
+            inputs = self.__inputs()
+            self.assertEqual(client.get_output_rank(
+                PLUGIN, inputs, self.__params(3)), 2)
+            for seed in range(3):
+                inputs = self.__inputs(seed=seed)
+                result = client.run_savu(PLUGIN, self.__params(3), False,
+                                         inputs)
+                np.testing.assert_allclose(
+                    result['data'], self.__expected(inputs, 3), rtol=1e-6)
+            # errors are returned to the client and the worker continues
+            self.assertRaises(RuntimeError, client.run_savu,
+                              os.path.join(os.path.dirname(PLUGIN),
+                                           'missing_plugin.py'),
+                              {}, False, inputs)
+            result = client.run_savu(PLUGIN, self.__params(3), False, inputs)
+            self.assertEqual(result['data'].shape, (1, 20, 30))
+        finally:
+            client.shutdown()
+            process.join(10)
+        self.assertFalse(process.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -109,10 +109,12 @@ setup(name='savu',
           'savu_profile=scripts.log_evaluation.GraphicalThreadProfiler:main',
           'savu_param_extractor=scripts.savu_config.parameter_extractor:main',
           'savu_template_extractor=scripts.savu_config.hdf5_template_extractor:main',
+          'savu_benchmark=scripts.benchmarks.savu_benchmark:main',
       ], },
 
       package_data={
            'savu.test.travis.framework_tests': ['*.yml'],
+           'scripts.benchmarks': ['*.yml', '*.json'],
       },
 
       data_files=[('htmls', ['scripts/log_evaluation/string_single.html']),